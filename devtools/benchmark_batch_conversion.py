@@ -0,0 +1,134 @@
+"""
+Benchmark da conversão em lote (`BatchConverter`) comparada à conversão
+documento a documento (`Document.generate_body_and_back_from_html` e
+`Document.generate_full_xml`), com documentos sintéticos.
+
+O ganho depende do número de núcleos disponíveis (`os.cpu_count()`).
+
+`--cache` (pasta) mede também uma segunda execução com o cache dos XML
+(`XMLOutputCache`), em que nenhum documento é convertido novamente.
+
+Uso (na raiz do repositório):
+
+    python devtools/benchmark_batch_conversion.py [--documents 200]
+        [--paragraphs 100] [--workers 4] [--chunksize 4] [--cache /tmp/xml_cache]
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scielo_classic_website.models.batch_converter import BatchConverter
+from scielo_classic_website.models.document import Document
+
+JOURNAL = {
+    "v068": [{"_": "abc"}],
+    "v100": [{"_": "Journal"}],
+    "v150": [{"_": "J"}],
+    "v435": [{"_": "1234-5678", "t": "PRINT"}],
+    "v310": [{"_": "BR"}],
+    "v320": [{"_": "SP"}],
+    "v490": [{"_": "São Paulo"}],
+    "v480": [{"_": "Society"}],
+}
+
+PARAGRAPH = (
+    "<p><font face='Verdana' size='2'>Texto do parágrafo {k} do documento {i}, "
+    "com <i>itálico</i>, <b>negrito</b> e citação (<a href='#nt{k}'>{k}</a>)."
+    "<br>Segunda linha.</font></p>"
+)
+
+
+def doc_records(total, paragraphs):
+    for i in range(total):
+        pid = f"S1234-5678199900030{i:04d}"
+        record = {
+            "v880": [{"_": pid}],
+            "v702": [{"_": "abc/v49n3/a01.htm"}],
+            "v040": [{"_": "pt"}],
+            "v012": [{"_": f"Título {i}", "l": "pt"}],
+        }
+        p_records = [{"v706": [{"_": "p"}], "v704": [{"_": "<p><b>Introdução</b></p>"}]}]
+        p_records.extend(
+            {"v706": [{"_": "p"}], "v704": [{"_": PARAGRAPH.format(i=i, k=k)}]}
+            for k in range(paragraphs)
+        )
+        yield {
+            "issue_id": pid[1:18],
+            "doc_id": pid,
+            "issue": {
+                "v706": [{"_": "i"}],
+                "v031": [{"_": "49"}],
+                "v032": [{"_": "3"}],
+                "v065": [{"_": "19990900"}],
+                "v880": [{"_": pid[1:18]}],
+            },
+            "article": [
+                dict(record, v706=[{"_": "o"}]),
+                dict(record, v706=[{"_": "f"}]),
+            ]
+            + p_records,
+        }
+
+
+def one_by_one(items):
+    results = []
+    for item in items:
+        document = Document(
+            {"article": item["article"], "issue": item["issue"], "title": JOURNAL}
+        )
+        document.generate_body_and_back_from_html()
+        results.append((item["doc_id"], document.generate_full_xml()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunksize", type=int, default=4)
+    parser.add_argument("--cache")
+    args = parser.parse_args()
+
+    items = list(doc_records(args.documents, args.paragraphs))
+    print(f"cpus:       {os.cpu_count()}")
+
+    start = time.perf_counter()
+    expected = one_by_one(items)
+    sequential = time.perf_counter() - start
+    print(f"sequential: {sequential:.2f}s ({args.documents} documents)", flush=True)
+
+    converter = BatchConverter(
+        journal=JOURNAL, max_workers=args.workers, chunksize=args.chunksize
+    )
+    start = time.perf_counter()
+    results = [(pid, xml) for pid, xml, exceptions in converter.convert(iter(items))]
+    batch = time.perf_counter() - start
+    print(f"batch:      {batch:.2f}s ({args.workers} workers)")
+    print(f"speedup:    {sequential / batch:.1f}x")
+    print(f"identical:  {results == expected}")
+
+    if args.cache:
+        shutil.rmtree(args.cache, ignore_errors=True)
+        for label in ("cold cache", "warm cache"):
+            converter = BatchConverter(
+                journal=JOURNAL,
+                max_workers=args.workers,
+                chunksize=args.chunksize,
+                cache=args.cache,
+            )
+            start = time.perf_counter()
+            results = [
+                (pid, xml) for pid, xml, exceptions in converter.convert(iter(items))
+            ]
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed:.2f}s {converter.cache.stats}")
+            print(f"identical:  {results == expected}")
+
+
+if __name__ == "__main__":
+    main()
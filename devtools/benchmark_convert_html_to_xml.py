@@ -0,0 +1,77 @@
+"""
+Benchmark da conversão HTML => XML (body e back) de ponta a ponta.
+
+Também fornece o documento (`BenchmarkDocument`) usado pelos demais
+benchmarks da conversão.
+
+A passagem da árvore (lxml) em memória entre as etapas, sem serializar e
+refazer o parsing a cada etapa, foi avaliada com este benchmark e não foi
+adotada: 29.3 ms/documento contra 31.4 ms/documento (1.07x). Para manter o
+resultado idêntico, a árvore precisava ser normalizada a cada etapa, e uma
+falha repetia a conversão inteira. O custo das etapas está nas pipes (por
+exemplo, as expressões regulares da etapa 80), não nos parsings.
+
+Uso (na raiz do repositório):
+
+    python devtools/benchmark_convert_html_to_xml.py [repeticoes]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import MAIN_HTML_PARAGRAPHS, TRANSLATED_HTML_BY_LANG
+from scielo_classic_website.spsxml.sps_xml_body_pipes import convert_html_to_xml
+
+
+def _join(value):
+    if isinstance(value, list):
+        return "".join(item["text"] if isinstance(item, dict) else item for item in value)
+    return value
+
+
+class Journal:
+    acronym = "abc"
+
+
+class BenchmarkDocument:
+    def __init__(self):
+        self.main_html_paragraphs = {
+            "before references": _join(MAIN_HTML_PARAGRAPHS["before references"]),
+            "references": MAIN_HTML_PARAGRAPHS["references"],
+            "after references": _join(MAIN_HTML_PARAGRAPHS["after references"]),
+        }
+        self.translated_html_by_lang = {
+            lang: {part: _join(text) for part, text in texts.items()}
+            for lang, texts in TRANSLATED_HTML_BY_LANG.items()
+        }
+        self.journal = Journal()
+        self.pretty_print = False
+        self.exceptions = None
+        self.xml_body_and_back = None
+
+    def add_exception(self, action, exception_type, message, detail=None):
+        self.exceptions = (self.exceptions or []) + [action]
+
+
+def run(repeat, **kwargs):
+    results = None
+    start = time.perf_counter()
+    for i in range(repeat):
+        document = BenchmarkDocument()
+        convert_html_to_xml(document, **kwargs)
+        results = document
+    return time.perf_counter() - start, results
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    elapsed, document = run(repeat)
+    print(f"documents: {repeat}")
+    print(f"elapsed:   {elapsed:.3f}s ({elapsed / repeat * 1000:.1f} ms/doc)")
+    print(f"exceptions: {len(document.exceptions or [])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark dos detectores de tipo de seção / nota / xref sobre um corpus de
+títulos de seção (um por linha).
+
+Compara:
+- padrões em texto: iteração de `re.match` / `re.search` sobre os padrões
+  (em texto) de todas as configurações, como era feito
+- compilados: padrões compilados no carregamento, cache (LRU) vazio
+- cache: mesmas chamadas com o cache (LRU) preenchido
+
+Uso (na raiz do repositório):
+
+    python devtools/benchmark_detector.py [arquivo_de_titulos] [repeticoes]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scielo_classic_website.spsxml import detector, detector_title_parent
+from scielo_classic_website.spsxml.detector_config_fn import FN_TYPE_PATTERNS, NOT_FN_INDICATORS
+from scielo_classic_website.spsxml.detector_config_sec import (
+    AGRADECIMENTOS_PATTERNS,
+    COMBINED_PATTERNS,
+    REFERENCIAS_PATTERNS,
+    SEC_TYPE_PATTERNS,
+)
+from scielo_classic_website.spsxml.detector_config_xref import TEXT_PATTERNS
+from scielo_classic_website.spsxml.detector_title_parent import PATTERNS
+
+TITLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "section_titles.txt")
+
+
+def read_titles(path):
+    with open(path, encoding="utf-8") as fp:
+        return [line.strip() for line in fp if line.strip()]
+
+
+def _flatten(patterns_by_value):
+    return [pattern for patterns in patterns_by_value.values() for pattern in patterns]
+
+
+STRING_PATTERNS = (
+    (re.search, REFERENCIAS_PATTERNS),
+    (re.search, AGRADECIMENTOS_PATTERNS),
+    (re.match, NOT_FN_INDICATORS),
+    (re.search, _flatten(FN_TYPE_PATTERNS)),
+    (re.search, [pattern for pattern, sec_types in COMBINED_PATTERNS]),
+    (re.match, _flatten(SEC_TYPE_PATTERNS)),
+    (re.match, _flatten(TEXT_PATTERNS)),
+    (re.search, list(PATTERNS)),
+)
+
+
+def string_patterns(title):
+    return [
+        next((pattern for pattern in patterns if func(pattern, title)), None)
+        for func, patterns in STRING_PATTERNS
+    ]
+
+
+def compiled_patterns(title):
+    return (
+        detector.detect_sec_type(title),
+        detector.detect_element_type(title),
+        detector.detect_from_text(title),
+        detector_title_parent.identify_parent_by_title(title),
+    )
+
+
+def clear_caches():
+    detector._detect_sec_type.cache_clear()
+    detector._detect_element_type.cache_clear()
+    detector._detect_from_text.cache_clear()
+    detector_title_parent._identify_parent_by_title.cache_clear()
+
+
+def timeit(func, titles, repeat, before=None):
+    start = time.perf_counter()
+    for i in range(repeat):
+        if before:
+            before()
+        for title in titles:
+            func(title)
+    return time.perf_counter() - start
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else TITLES_PATH
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    titles = read_titles(path)
+    calls = len(titles) * repeat
+
+    string_time = timeit(string_patterns, titles, repeat)
+    compiled_time = timeit(compiled_patterns, titles, repeat, before=clear_caches)
+    cached_time = timeit(compiled_patterns, titles, repeat)
+
+    print(f"titles: {len(titles)} x {repeat}")
+    print(f"string patterns:     {string_time:.3f}s ({string_time / calls * 1000:.3f} ms/title)")
+    print(f"compiled, no cache:  {compiled_time:.3f}s ({compiled_time / calls * 1000:.3f} ms/title)")
+    print(f"compiled, cache:     {cached_time:.3f}s ({cached_time / calls * 1000:.3f} ms/title)")
+    print(f"cache: {detector._detect_element_type.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
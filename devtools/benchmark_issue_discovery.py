@@ -0,0 +1,137 @@
+"""
+Benchmark da obtenção dos arquivos de muitos fascículos
+(`ClassicWebsite.get_issue_files_and_exceptions`), um por vez e em
+paralelo (`ClassicWebsite.get_issues_files_and_exceptions`), em uma árvore
+sintética (bases/xml, bases/pdf, bases/translation e htdocs/img/revistas).
+
+`--latency` (ms) acrescenta uma espera a cada `os.stat` e `os.scandir`,
+simulando um sistema de arquivos em rede (NFS).
+
+`--inventory` usa o inventário (`FileInventory`, criado antes da medição).
+Sem ele, a busca dos caminhos fbpe percorre htdocs inteiro a cada fascículo
+e domina o tempo (use `--issues` menor).
+
+Uso (na raiz do repositório):
+
+    python devtools/benchmark_issue_discovery.py [--issues 10000] [--workers 16]
+        [--latency 0.5] [--inventory] [--root /tmp/classic_website_tree]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scielo_classic_website.classic_ws import ClassicWebsite
+from scielo_classic_website.utils.fs_cache import PATH_CACHE
+
+FILES = {
+    ("bases", "xml"): ("a01.xml", "a02.xml"),
+    ("bases", "pdf"): ("a01.pdf", "en_a01.pdf", "a02.pdf"),
+    ("bases", "translation"): ("en_a01.htm", "en_ba01.htm"),
+    ("htdocs", "img", "revistas"): ("a01f1.jpg", "a01f2.jpg", "a02f1.gif"),
+}
+
+
+def issues_list(total):
+    for i in range(total):
+        yield f"j{i // 50:03d}", f"v{i % 50 // 10 + 1}n{i % 10 + 1}"
+
+
+def create_tree(root, total):
+    marker = os.path.join(root, f".issues_{total}")
+    if os.path.exists(marker):
+        return
+    for acron, issue_folder in issues_list(total):
+        for folder, names in FILES.items():
+            path = os.path.join(root, *folder, acron, issue_folder)
+            os.makedirs(path, exist_ok=True)
+            for name in names:
+                with open(os.path.join(path, name), "wb") as fp:
+                    fp.write(b"x" * 100)
+    open(marker, "w").close()
+
+
+def add_latency(seconds):
+    def slow(func):
+        def wrapper(*args, **kwargs):
+            time.sleep(seconds)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    os.stat = slow(os.stat)
+    os.scandir = slow(os.scandir)
+
+
+def classic_website(root, inventory_path=None):
+    bases = os.path.join(root, "bases")
+    return ClassicWebsite(
+        bases_path=bases,
+        bases_work_path=os.path.join(root, "bases-work"),
+        bases_translation_path=os.path.join(bases, "translation"),
+        bases_pdf_path=os.path.join(bases, "pdf"),
+        bases_xml_path=os.path.join(bases, "xml"),
+        htdocs_img_revistas_path=os.path.join(root, "htdocs", "img", "revistas"),
+        serial_path=os.path.join(root, "serial"),
+        cisis_path=None,
+        title_path=None,
+        issue_path=None,
+        inventory_path=inventory_path,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--issues", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--inventory", action="store_true")
+    parser.add_argument("--root", default="/tmp/classic_website_tree")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    create_tree(args.root, args.issues)
+    print(f"tree:       {args.issues} issues ({time.perf_counter() - start:.1f}s)")
+
+    inventory_path = None
+    if args.inventory:
+        inventory_path = os.path.join(args.root, "inventory.db")
+        start = time.perf_counter()
+        website = classic_website(args.root, inventory_path)
+        stats = website.classic_website_paths.inventory.refresh()
+        print(f"inventory:  {stats} ({time.perf_counter() - start:.1f}s)")
+
+    if args.latency:
+        add_latency(args.latency / 1000)
+
+    website = classic_website(args.root, inventory_path)
+    if args.inventory:
+        website.classic_website_paths.inventory.refresh()
+    issues = list(issues_list(args.issues))
+
+    PATH_CACHE.clear()
+    start = time.perf_counter()
+    files = sum(
+        len(website.get_issue_files_and_exceptions(acron, issue_folder)["files"])
+        for acron, issue_folder in issues
+    )
+    sequential = time.perf_counter() - start
+    print(f"sequential: {sequential:.2f}s ({files} files)", flush=True)
+
+    PATH_CACHE.clear()
+    start = time.perf_counter()
+    files = sum(
+        len(response.get("files") or [])
+        for response in website.get_issues_files_and_exceptions(
+            issues, max_workers=args.workers
+        )
+    )
+    parallel = time.perf_counter() - start
+    print(f"parallel:   {parallel:.2f}s ({files} files, {args.workers} workers)")
+    print(f"speedup:    {sequential / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
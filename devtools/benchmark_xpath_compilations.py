@@ -0,0 +1,64 @@
+"""
+Benchmark do número de compilações de expressões XPath por documento na
+conversão HTML => XML (body e back).
+
+- antes: o registro `XPATH` é desabilitado (cada avaliação compila a
+  expressão, como `node.xpath(expr)`) e as compilações são contadas
+- depois: o registro compila cada expressão uma única vez
+
+Considera somente as pipes de spsxml, que usam o registro.
+
+Uso (na raiz do repositório):
+
+    python devtools/benchmark_xpath_compilations.py [documentos]
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree
+
+from benchmark_convert_html_to_xml import BenchmarkDocument
+from scielo_classic_website.spsxml.sps_xml_body_pipes import convert_html_to_xml
+from scielo_classic_website.spsxml.xpaths import XPATH
+
+
+def compile_every_time(expr, namespaces=None):
+    # registro desabilitado: compila a cada avaliação
+    XPATH.compilations += 1
+    return etree.XPath(expr, namespaces=namespaces)
+
+
+def run(documents):
+    XPATH.reset_counters()
+    start = time.perf_counter()
+    for i in range(documents):
+        convert_html_to_xml(BenchmarkDocument())
+    return time.perf_counter() - start, XPATH.compilations
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with patch.object(XPATH, "get", compile_every_time):
+        before_elapsed, before = run(documents)
+    # compilações feitas em execuções anteriores não são contadas
+    XPATH._local.items = {}
+    after_elapsed, after = run(documents)
+
+    print(f"documents:            {documents}")
+    print(
+        f"compilations before:  {before} ({before / documents:.1f}/doc) "
+        f"{before_elapsed:.3f}s"
+    )
+    print(
+        f"compilations after:   {after} ({after / documents:.1f}/doc) "
+        f"{after_elapsed:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -36,7 +36,7 @@ def save_file(filename, result):
 def main():
     document = IncompleteDocument()
 
-    convert_html_to_xml(document)
+    convert_html_to_xml(document, retention="all")
 
     result = document.xml_body_and_back
 
@@ -1,9 +1,10 @@
 import logging
 import os
-import glob
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from scielo_classic_website.iid2json import id2json3
 from scielo_classic_website.isisdb.isis_cmd import ISISCommader
+from scielo_classic_website.models.batch_converter import BatchConverter
 # manter Document, Issue, Journal imports para evitar quebra em outras partes do sistema
 from scielo_classic_website.models.document import Document
 from scielo_classic_website.models.issue import Issue
@@ -15,6 +16,29 @@ from scielo_classic_website.models.issue_files import (
 )
 from scielo_classic_website.models.issue_folder import IssueFolder
 from scielo_classic_website.models.journal import Journal
+from scielo_classic_website.utils.asset_digests import AssetDigests
+from scielo_classic_website.utils.fbpe_paths import FbpePathMap
+from scielo_classic_website.utils.fs_inventory import (
+    INVENTORY_PATH,
+    FileInventory,
+    inventory_glob,
+)
+from scielo_classic_website.utils.html_encoding import read_html
+
+ISSUES_MAX_WORKERS = int(os.environ.get("CLASSIC_WEBSITE_ISSUES_MAX_WORKERS") or 8)
+
+
+def _get_file_key(records):
+    """
+    Nome do arquivo HTML do documento (v702), sem extensão: a01
+    """
+    for record in records:
+        if id2json3._get_value(record, "v706") in ("f", "h", "o"):
+            file_code = id2json3._get_value(record, "v702")
+            if file_code:
+                name = os.path.basename(file_code.replace("\\", "/"))
+                return os.path.splitext(name)[0]
+    return None
 
 
 class ClassicWebsitePaths:
@@ -30,6 +54,7 @@ class ClassicWebsitePaths:
         cisis_path,
         title_path,
         issue_path,
+        inventory=None,
     ):
         self.bases_path = bases_path
         self.bases_work_path = bases_work_path
@@ -42,6 +67,21 @@ class ClassicWebsitePaths:
         self.title_path = title_path
         self.issue_path = issue_path
         self.BASES_ARTIGO_PATH = os.path.join(self.bases_path, "artigo", "artigo")
+        self.inventory = inventory
+
+    @property
+    def htdocs_path(self):
+        return os.path.dirname(os.path.dirname(self.htdocs_img_revistas_path))
+
+    @property
+    def inventory_roots(self):
+        # diretórios percorridos pelo inventário (FileInventory)
+        return [
+            self.bases_xml_path,
+            self.bases_pdf_path,
+            self.bases_translation_path,
+            self.htdocs_path,
+        ]
 
     def get_paragraphs_id_file_path(self, article_pid):
         if article_pid and len(article_pid) == 23:
@@ -92,6 +132,7 @@ class ClassicWebsite:
         title_path,
         issue_path,
         alternative_paths=None,
+        inventory_path=None,
     ):
         self.classic_website_paths = ClassicWebsitePaths(
             bases_path,
@@ -106,24 +147,52 @@ class ClassicWebsite:
             issue_path,
         )
         self.alternative_paths = alternative_paths
+        inventory_path = inventory_path or INVENTORY_PATH
+        if inventory_path:
+            self.classic_website_paths.inventory = FileInventory(
+                inventory_path, self.classic_website_paths.inventory_roots
+            )
         self.isis_commander = ISISCommader(self.classic_website_paths)
         self.data = {}
+        # compartilhado entre os fascículos para identificar arquivos repetidos
+        self.asset_digests = AssetDigests(self.classic_website_paths.inventory)
+        # caminhos alternativos (fbpe) de todos os fascículos, obtidos uma vez
+        self.fbpe_paths = FbpePathMap(
+            self.classic_website_paths.htdocs_path,
+            self.classic_website_paths.inventory,
+        )
 
-    def get_issue_folder_content(self, acron, issue_folder):
-        return IssueFolder(acron, issue_folder, self.classic_website_paths).files
+    def get_issue_folder_content(
+        self, acron, issue_folder, max_size=None, read_content=False
+    ):
+        """
+        read_content : bool
+            False: os arquivos não têm "content" (`FileItem.load_content`)
+        """
+        return IssueFolder(
+            acron,
+            issue_folder,
+            self.classic_website_paths,
+            max_size=max_size,
+            read_content=read_content,
+        ).files
 
     def get_issue_files(self, acron, issue_folder):
         classic_ws_fs = IssueFiles(acron, issue_folder, self.classic_website_paths)
         return classic_ws_fs.files
 
-    def get_issue_files_and_exceptions(self, acron, issue_folder):
+    def get_issue_files_and_exceptions(self, acron, issue_folder, digests=False):
+        """
+        digests : bool
+            adiciona "digest" aos arquivos e "duplicate_of" aos arquivos
+            cujo conteúdo já foi encontrado (neste ou em outro fascículo)
+        """
         issue_files = IssueFiles(acron, issue_folder, self.classic_website_paths)
         response = {"files": list(issue_files.files)}
 
-        htdocs_path = os.path.dirname(
-            os.path.dirname(self.classic_website_paths.htdocs_img_revistas_path)
+        fbpe_paths = self._find_fbpe_paths(
+            self.classic_website_paths.htdocs_path, acron, issue_folder
         )
-        fbpe_paths = self._find_fbpe_paths(htdocs_path, acron, issue_folder)
 
         for fbpe_path in fbpe_paths:
             fbpe_files = issue_files.get_files_from_path(
@@ -131,8 +200,95 @@ class ClassicWebsite:
             )
             response["files"].extend(fbpe_files)
 
+        if digests:
+            self.asset_digests.mark(response["files"])
         return response
 
+    def get_issues_files_and_exceptions(
+        self, issues, max_workers=None, max_pending=None, **kwargs
+    ):
+        """
+        `get_issue_files_and_exceptions` de vários fascículos, em paralelo
+        (threads)
+
+        Parameters
+        ----------
+        issues : iterable
+            (acron, issue_folder)
+        max_workers : int
+            número de threads (padrão: CLASSIC_WEBSITE_ISSUES_MAX_WORKERS)
+        max_pending : int
+            número máximo de fascículos em andamento ou com resultado ainda
+            não consumido (padrão: 2 * max_workers)
+
+        Yields
+        ------
+        dict
+            o resultado de `get_issue_files_and_exceptions` com "acron" e
+            "issue_folder", ou "error" e "error_type", na ordem de conclusão
+        """
+        yield from self._map_issues(
+            lambda acron, issue_folder: self.get_issue_files_and_exceptions(
+                acron, issue_folder, **kwargs
+            ),
+            issues,
+            max_workers,
+            max_pending,
+        )
+
+    def get_issues_folder_content(
+        self, issues, max_workers=None, max_pending=None, read=False, max_size=None
+    ):
+        """
+        `get_issue_folder_content` de vários fascículos, em paralelo (threads)
+
+        Parameters
+        ----------
+        read : bool
+            lê o conteúdo ("content") dos arquivos nas threads
+
+        Yields
+        ------
+        dict
+            {"acron", "issue_folder", "files"} ou "error" e "error_type",
+            na ordem de conclusão
+        """
+
+        def get_files(acron, issue_folder):
+            files = self.get_issue_folder_content(
+                acron, issue_folder, max_size, read_content=read
+            )
+            return {"files": list(files)}
+
+        yield from self._map_issues(get_files, issues, max_workers, max_pending)
+
+    def _map_issues(self, func, issues, max_workers=None, max_pending=None):
+        max_workers = max_workers or ISSUES_MAX_WORKERS
+        max_pending = max(max_pending or 2 * max_workers, 1)
+        issues = iter(issues)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            while True:
+                # novos fascículos somente quando há espaço (contrapressão)
+                for acron, issue_folder in issues:
+                    future = executor.submit(func, acron, issue_folder)
+                    pending[future] = (acron, issue_folder)
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    acron, issue_folder = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except Exception as e:
+                        logging.exception(e)
+                        response = {"error": str(e), "error_type": type(e).__name__}
+                    response["acron"] = acron
+                    response["issue_folder"] = issue_folder
+                    yield response
+
     def _find_fbpe_paths(self, root_path, acron, issue_folder):
         """
         Procura por caminhos que terminam com acron/issue_folder e que contenham 'fbpe'
@@ -141,9 +297,15 @@ class ClassicWebsite:
         if not os.path.exists(root_path):
             return
 
+        if os.path.normpath(root_path) == self.fbpe_paths.root:
+            yield from self.fbpe_paths.get(acron, issue_folder)
+            return
+
         # Padrão otimizado: busca diretamente por fbpe seguido de qualquer estrutura que termine em acron/issue_folder
         pattern = os.path.join(root_path, "**", "fbpe", "**", acron, issue_folder)
-        yield from glob.glob(pattern, recursive=True)
+        yield from inventory_glob(
+            self.classic_website_paths.inventory, pattern, recursive=True
+        )
 
     def get_journals_pids_and_records(self):
         id_file_path = self.isis_commander.get_id_file_path(
@@ -276,6 +438,80 @@ class ClassicWebsite:
             id_file_path = self.isis_commander.get_id_file_path(source_path)
             yield from id2json3.pids_and_their_records(id_file_path, "artigo")
 
+    def convert_issue_documents(
+        self, acron, issue_folder=None, issue_pid=None, journal=None, **kwargs
+    ):
+        """
+        Converte os documentos do fascículo em paralelo (`BatchConverter`)
+
+        Parameters
+        ----------
+        journal : dict
+            registro do periódico (title)
+        kwargs :
+            parâmetros de `BatchConverter`
+
+        Yields
+        ------
+        ConversionResult
+            (pid, xml, exceptions)
+        """
+        converter = BatchConverter(journal=journal, **kwargs)
+        yield from converter.convert(
+            self.get_issue_documents_to_convert(acron, issue_folder, issue_pid)
+        )
+
+    def get_issue_documents_to_convert(self, acron, issue_folder=None, issue_pid=None):
+        """
+        Itens de `get_issue_doc_records` com o que mais compõe o documento:
+        "paragraph", os registros p de artigo/p (se não estiverem nos
+        registros do documento), e "translations", o HTML das traduções de
+        bases/translation
+        """
+        translations = {}
+        if issue_folder:
+            translations = self.get_issue_translations(acron, issue_folder)
+        for item in self.get_issue_doc_records(acron, issue_folder, issue_pid):
+            if item.get("invalid_records"):
+                yield item
+                continue
+            records = item["article"]
+            if not any(id2json3._get_value(rec, "v706") == "p" for rec in records):
+                item["paragraph"] = self._get_paragraph_records(item["doc_id"])
+            item["translations"] = translations.get(_get_file_key(records)) or {}
+            yield item
+
+    def _get_paragraph_records(self, pid):
+        try:
+            response = self.get_p_records(pid)
+        except (FileNotFoundError, ValueError) as e:
+            logging.info(f"No paragraph records for {pid}: {e}")
+            return None
+        except Exception as e:
+            logging.exception(e)
+            return None
+        return response and response[1]
+
+    def get_issue_translations(self, acron, issue_folder):
+        """
+        HTML das traduções de bases/translation/acron/issue_folder por
+        documento (nome do arquivo sem extensão) e idioma
+
+        {"a01": {"en": {"before references": html, "after references": html}}}
+        """
+        parts = {"before": "before references", "after": "after references"}
+        translations = {}
+        issue_files = IssueFiles(acron, issue_folder, self.classic_website_paths)
+        for item in issue_files.bases_translation_files:
+            try:
+                text, encoding = read_html(item["path"], "iso-8859-1")
+            except Exception as e:
+                logging.exception(e)
+                continue
+            doc = translations.setdefault(item["key"], {})
+            doc.setdefault(item["lang"], {})[parts[item["part"]]] = text
+        return translations
+
     def get_issue_doc_records(
         self,
         acron,
@@ -32,3 +32,19 @@ class MissingConfigurationError(Exception):
 
 class MustBeDirectoryError(Exception):
     ...
+
+
+class DocumentBudgetExceeded(BaseException):
+    # BaseException: não deve ser capturada pelos `except Exception` das pipes
+    def __init__(self, budget, stage, limit, value):
+        super().__init__(budget, stage, limit, value)
+        self.budget = budget
+        self.stage = stage
+        self.limit = limit
+        self.value = value
+
+    def __str__(self):
+        return (
+            f"{self.budget} budget exceeded ({self.value:.1f} > {self.limit}) "
+            f"at {self.stage or 'unknown stage'}"
+        )
@@ -6,6 +6,11 @@ from lxml import etree
 
 from scielo_classic_website.htmlbody import html_fixer
 from scielo_classic_website.htmlbody.name2number import fix_pre_loading
+from scielo_classic_website.utils.fs_cache import PATH_CACHE
+from scielo_classic_website.utils.html_encoding import read_html
+
+
+BATCH_INDEX_ATTR = "data-batch-index"
 
 
 class UnableToGetHTMLTreeError(Exception): ...
@@ -25,6 +30,7 @@ class HTMLContent:
         self.score = 0
         self.fixed_html = None
         self._tree = None
+        self._old_and_new_links = None
 
         try:
             self.fixed_html = html_fixer.get_fixed_html(content)
@@ -45,12 +51,7 @@ class HTMLContent:
 
     @staticmethod
     def create(file_path):
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                text = f.read()
-        except Exception as e:
-            with open(file_path, encoding="iso-8859-1") as f:
-                text = f.read()
+        text, encoding = read_html(file_path)
         return HTMLContent(text)
 
     @property
@@ -73,6 +74,7 @@ class HTMLContent:
     @tree.setter
     def tree(self, content):
         self._tree = html_fixer.load_html(content)
+        self._old_and_new_links = None
 
     @property
     def asset_path_fixes(self):
@@ -82,7 +84,11 @@ class HTMLContent:
     def old_and_new_links(self):
         if self.tree is None:
             return []
+        if self._old_and_new_links is None:
+            self._old_and_new_links = list(self._get_old_and_new_links())
+        return self._old_and_new_links
 
+    def _get_old_and_new_links(self):
         for elem, attr in (("img", "src"), ("a", "href")):
             for node in self.tree.xpath(f"//{elem}[@{attr}]"):
                 old_link = node.get(attr)
@@ -90,8 +96,8 @@ class HTMLContent:
                     continue
                 if ":" in old_link:
                     continue
-                new_link = os.path.realpath(old_link)
-                if not os.path.isfile(new_link):
+                new_link = PATH_CACHE.realpath(old_link)
+                if not PATH_CACHE.isfile(new_link):
                     continue
 
                 for folder in ("htdocs", "bases"):
@@ -105,19 +111,21 @@ class HTMLContent:
     def fix_asset_paths(self):
         if self.tree is None:
             return
-        for change in self.old_and_new_links:
-            old_link = change.get("old_link")
-            new_link = change.get("new_link")
-            for node in self.tree.xpath(
-                f'.//a[@href="{old_link}"]|.//img[@src="{old_link}"]'
-            ):
-                if node.get("href"):
-                    attr = "href"
-                elif node.get("src"):
-                    attr = "src"
-                logging.info(f"old {old_link} => new {new_link}")
-                node.set("data-old-link", old_link)
-                node.set(attr, new_link)
+        changes = self.asset_path_fixes
+        if not changes:
+            return
+        # percorre a árvore uma única vez atualizando todos os links
+        for node in self.tree.iter("a", "img"):
+            attr = "href" if node.tag == "a" else "src"
+            old_link = node.get(attr)
+            new_link = changes.get(old_link)
+            if not old_link or new_link is None:
+                continue
+            logging.info(f"old {old_link} => new {new_link}")
+            node.set("data-old-link", old_link)
+            node.set(attr, new_link)
+        # os links mudaram, recalcula sob demanda
+        self._old_and_new_links = None
 
 
 class BodyFromISIS:
@@ -247,14 +255,20 @@ def fix_paragraphs(p_records):
 
 
 def fix_references(p_records):
-    index = 0
+    items = []
     for item in p_records:
         # item.data (dict which keys: text, index, reference_index)
         text = (item.paragraph_text or "").strip()
         if not text:
             continue
-        node = html_to_node("mixed-citation", text)
-        node_text = etree.tostring(node, encoding="utf-8").decode("utf-8")
+        items.append((item, text))
+
+    # corrige e converte todas as referências de uma vez
+    nodes = html_to_nodes("mixed-citation", [text for item, text in items])
+
+    index = 0
+    for (item, text), node in zip(items, nodes):
+        node_text = etree.tostring(node, encoding="utf-8", with_tail=False).decode("utf-8")
         fixed_text = node_text.replace("<mixed-citation>", "").replace("</mixed-citation>", "").strip()
         if not fixed_text:
             continue
@@ -282,6 +296,98 @@ def html_to_node(element_name, children_data_as_text):
         return get_node_from_standardized_html(element_name, xml)
 
 
+def html_to_nodes(element_name, children_data_as_texts):
+    """
+    Converte vários textos HTML em nós `element_name`, fazendo a correção
+    de entidades, a correção do HTML e o parsing uma única vez para todos.
+
+    Cada texto é envolvido por `element_name` identificado pelo seu índice.
+    Os itens que não puderem ser separados com segurança do resultado
+    (por exemplo, uma tag não fechada que engloba os textos seguintes) e
+    os itens para os quais, individualmente, o HTML original seria a melhor
+    escolha (`get_best_choice_between_original_and_fixed`) são convertidos
+    individualmente por `html_to_node`.
+
+    Parameters
+    ----------
+    element_name : str
+        nome do elemento que envolverá cada texto
+    children_data_as_texts : list of str
+        textos HTML
+
+    Returns
+    -------
+    list
+        nós na mesma ordem de `children_data_as_texts`
+    """
+    if not element_name:
+        raise ValueError("element_name cannot be empty")
+
+    texts = list(children_data_as_texts or [])
+    nodes = [None] * len(texts)
+
+    wrapped = []
+    originals = {}
+    for i, text in enumerate(texts):
+        if not text:
+            nodes[i] = etree.Element(element_name)
+            continue
+        text = fix_pre_loading(text)
+        wrapped.append(
+            f'<{element_name} {BATCH_INDEX_ATTR}="{i}">{text}</{element_name}>'
+        )
+        # como em get_node_from_standardized_html
+        originals[i] = f"<{element_name}>{text}</{element_name}>"
+
+    if wrapped and element_name != "body":
+        try:
+            # um item por linha preserva o comportamento de
+            # html_fixer.avoid_mismatched_tags, que trabalha por linha
+            batch = "\n".join(wrapped)
+            for i, node in get_nodes_from_batch(element_name, batch, originals):
+                nodes[i] = node
+        except Exception as e:
+            logging.exception(f"html_to_nodes: {e}")
+
+    for i, text in enumerate(texts):
+        if nodes[i] is None:
+            nodes[i] = html_to_node(element_name, text)
+    return nodes
+
+
+def get_nodes_from_batch(element_name, batch, originals):
+    """
+    Obtém de `batch` os pares (índice, nó) dos elementos `element_name`
+    que permaneceram íntegros após a correção e o parsing e cujo HTML
+    corrigido seria a escolha de `HTMLContent` para o item isolado
+
+    originals : dict
+        {índice: texto do item, como seria convertido por `html_to_node`}
+    """
+    # a escolha entre o original e o corrigido é feita por item, não pelo lote
+    tree = html_fixer.load_html(html_fixer.get_fixed_html(batch))
+    body = tree.find(".//body")
+    if body is None:
+        return
+    for node in body.findall(element_name):
+        index = node.attrib.pop(BATCH_INDEX_ATTR, None)
+        if index is None:
+            continue
+        if node.find(f".//{element_name}[@{BATCH_INDEX_ATTR}]") is not None:
+            # o conteúdo mal formado englobou os itens seguintes
+            continue
+        node.tail = None
+        original = originals.get(int(index))
+        fixed_html = etree.tostring(node, encoding="unicode", with_tail=False)
+        score = html_fixer.get_fixed_similarity_rate(original, fixed_html)
+        choice = html_fixer.get_best_choice_between_original_and_fixed(
+            score, original, fixed_html
+        )
+        if choice == "original":
+            continue
+        yield int(index), node
+
+
 def get_node_from_standardized_html(element_name, fixed_html_entities):
     if element_name != "body":
         fixed_html_entities = f"<{element_name}>{fixed_html_entities}</{element_name}>"
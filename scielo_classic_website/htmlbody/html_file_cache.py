@@ -0,0 +1,94 @@
+"""
+Cache de arquivos HTML já lidos, decodificados e analisados (parsing).
+
+Deve ter o escopo de um fascículo ou de um lote de documentos: documentos
+do mesmo fascículo costumam referenciar os mesmos anexos e tabelas em HTML,
+que assim são lidos do disco uma única vez.
+"""
+
+import logging
+import os
+import threading
+from copy import deepcopy
+
+
+class HTMLFileCache:
+    """
+    Guarda a árvore (lxml) de cada arquivo HTML.
+
+    A entrada é validada a cada acesso pela assinatura do arquivo
+    (`mtime` e tamanho, ver `get_file_signature`). Sem assinatura, a
+    árvore não é guardada: não haveria como perceber mudanças no arquivo.
+    Como quem usa a árvore a modifica, cada acesso retorna uma cópia.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._items = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items)}
+
+    def get_tree(self, key, loader, path=None, signature=None):
+        """
+        Retorna uma cópia da árvore associada a `key`
+
+        Parameters
+        ----------
+        key : hashable
+            identifica o arquivo (por exemplo, leitor, caminho e encoding)
+        loader : callable
+            sem argumentos, lê e faz o parsing do arquivo; retorna a árvore
+            ou None em caso de falha (falhas não são guardadas)
+        path : str
+            caminho no sistema de arquivos usado para validar a entrada
+        signature : hashable
+            assinatura do arquivo, se já obtida (dispensa `path`)
+        """
+        if signature is None:
+            signature = get_file_signature(path)
+        if signature is None:
+            with self._lock:
+                self.misses += 1
+            return loader()
+
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == signature:
+                self.hits += 1
+                return deepcopy(item[1])
+
+        tree = loader()
+        with self._lock:
+            self.misses += 1
+            if tree is None:
+                return None
+            if self.maxsize and len(self._items) >= self.maxsize:
+                self._items.pop(next(iter(self._items)))
+            self._items[key] = (signature, tree)
+        return deepcopy(tree)
+
+
+def get_file_signature(path):
+    """
+    (mtime, tamanho) do arquivo `path` ou None se não for possível obtê-los
+    """
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except (OSError, ValueError) as e:
+        logging.debug(f"HTMLFileCache: unable to stat {path}: {e}")
+        return None
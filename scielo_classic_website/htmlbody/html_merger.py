@@ -8,6 +8,12 @@ from lxml import etree, html
 from typing import Dict, Set, Optional, Callable, Tuple
 from urllib.parse import urlparse
 
+from scielo_classic_website.htmlbody.html_file_cache import (
+    HTMLFileCache,
+    get_file_signature,
+)
+from scielo_classic_website.utils.html_encoding import read_html
+
 
 def normalize_path(file_path: str, base_path: str = None) -> str:
     """Normaliza o caminho combinando com base_path se fornecido."""
@@ -26,11 +32,20 @@ def normalize_path(file_path: str, base_path: str = None) -> str:
     return file_path
 
 
-def default_file_reader(file_path: str, encoding: str = 'utf-8', base_path: str = None) -> str:
-    """Lê arquivo do sistema de arquivos."""
+def default_file_reader(file_path: str, encoding: str = None, base_path: str = None) -> str:
+    """
+    Lê arquivo do sistema de arquivos, detectando o encoding a partir dos bytes.
+    `encoding` é usado apenas quando os bytes não permitem detectá-lo.
+    """
     path = normalize_path(file_path, base_path)
-    with open(path, 'r', encoding=encoding) as f:
-        return f.read()
+    text, detected = read_html(path, encoding)
+    return text
+
+
+def default_file_signature(file_path: str, encoding: str = None, base_path: str = None):
+    """Assinatura (mtime, tamanho) do arquivo lido por `default_file_reader`."""
+    return get_file_signature(normalize_path(file_path, base_path))
+
 
 
 class HTMLMerger:
@@ -39,12 +54,19 @@ class HTMLMerger:
     def __init__(
         self, 
         journal_acron_folder: str = None, 
-        encoding: str = 'utf-8',
-        content_reader: Callable = None
+        encoding: str = None,
+        content_reader: Callable = None,
+        cache: HTMLFileCache = None,
+        content_signature: Callable = None
     ):
         self.journal_acron_folder = journal_acron_folder
         self.encoding = encoding
         self.content_reader = content_reader or default_file_reader
+        if content_signature is None and content_reader is None:
+            content_signature = default_file_signature
+        # assinatura do conteúdo lido por content_reader (mesmos argumentos)
+        self.content_signature = content_signature
+        self.cache = cache  # cache de árvores compartilhado (fascículo / lote)
         self.embedded_files: Set[str] = set()  # arquivos já processados
         self.processing_stack: Set[str] = set()  # evita recursão circular
         # Parser HTML do lxml
@@ -101,6 +123,44 @@ class HTMLMerger:
             print(f"Erro ao ler {file_path}: {e}")
             return None
 
+    def parse(self, html_content: str) -> etree.Element:
+        """Faz o parsing do conteúdo HTML."""
+        return html.fromstring(html_content, parser=self.parser)
+
+    def get_signature(self, file_path: str, base_path: str = None):
+        """
+        Assinatura do arquivo, obtida por `content_signature`;
+        None se não houver `content_signature` ou se falhar.
+        """
+        if self.content_signature is None:
+            return None
+        try:
+            return self.content_signature(
+                file_path, self.encoding, self.journal_acron_folder or base_path
+            )
+        except Exception:
+            return None
+
+    def read_tree(self, file_path: str, base_path: str = None) -> Optional[etree.Element]:
+        """Lê e faz o parsing do arquivo, reutilizando o cache se houver."""
+
+        def loader():
+            content = self.read_content(file_path, base_path)
+            if content is None:
+                return None
+            return self.parse(content)
+
+        if self.cache is None:
+            return loader()
+
+        # sem assinatura, o cache não guarda a árvore
+        base = self.journal_acron_folder or base_path
+        return self.cache.get_tree(
+            (self.content_reader, file_path, base, self.encoding),
+            loader,
+            signature=self.get_signature(file_path, base_path),
+        )
+
     def create_embed_element(self, file_path: str, anchor: str, 
                            label: str, embed: etree.Element) -> etree.Element:
         """Cria elemento html-to-embed com conteúdo."""
@@ -162,13 +222,13 @@ class HTMLMerger:
         
         try:
             # Lê conteúdo - passa base_path para o reader
-            content = self.read_content(file_path, base_path)
-            if content is None:
+            tree = self.read_tree(file_path, base_path)
+            if tree is None:
                 return None
             
             # Processa recursivamente
             # Para recursão, o novo base é o diretório do arquivo atual
-            processed = self.process_html_internal(content, base_path)
+            processed = self.process_html_internal(tree, base_path)
             
             # Marca como processado
             self.embedded_files.add(file_key)
@@ -201,25 +261,33 @@ class HTMLMerger:
             # Erro ao processar ou circular ou já processado - cria xref
             return self.create_xref_element(file_path, anchor, link_element)
     
-    def process_html_internal(self, html_content: str, base_path: str = None) -> etree.Element:
-        """Processa HTML internamente (para recursão)."""
+    def process_links(self, root: etree.Element, base_path: str = None) -> etree.Element:
+        """Processa os links de `root`, modificando a própria árvore."""
+        # Encontra todos os links
+        links = root.xpath('.//a[@href]')
+        
+        # Processa cada link
+        for link in links:
+            new_element = self.process_single_link(link, base_path)
+            if new_element is not None:
+                # Substitui o link pelo novo elemento
+                parent = link.getparent()
+                if parent is not None:
+                    parent.replace(link, new_element)
+        return root
+
+    def process_html_internal(self, html_content, base_path: str = None) -> etree.Element:
+        """Processa HTML (texto ou árvore já carregada) internamente (para recursão)."""
         try:
             # Parse do HTML
-            doc = html.fromstring(html_content, parser=self.parser)
-            
-            # Encontra todos os links
-            links = doc.xpath('//a[@href]')
+            if isinstance(html_content, str):
+                doc = self.parse(html_content)
+            else:
+                doc = html_content
             
-            # Processa cada link
-            for link in links:
-                new_element = self.process_single_link(link, base_path)
-                if new_element is not None:
-                    # Substitui o link pelo novo elemento
-                    parent = link.getparent()
-                    if parent is not None:
-                        parent.replace(link, new_element)
+            self.process_links(doc, base_path)
             
-            # Retorna HTML serializado
+            # Retorna o body
             return doc.find(".//body")
             
         except Exception as e:
@@ -233,23 +301,42 @@ class HTMLMerger:
         self.processing_stack.clear()
         return self.process_html_internal(html_content, base_path)
 
+    def process_element(self, root: etree.Element, base_path: str = None) -> etree.Element:
+        """
+        Processa um elemento já carregado (API pública), incorporando as
+        referências locais na própria árvore, sem serializar e refazer o parsing.
+        """
+        # Limpa estado para novo processamento
+        self.embedded_files.clear()
+        self.processing_stack.clear()
+        return self.process_links(root, base_path)
+
 
 def merge_html(
-    input_html: str,
+    input_html,
     journal_acron_folder: str = None,
-    encoding: str = 'utf-8',
-    content_reader: Callable = None
+    encoding: str = None,
+    content_reader: Callable = None,
+    cache: HTMLFileCache = None,
+    content_signature: Callable = None
 ) -> etree.Element:
     """
     Mescla referências HTML, processando cada arquivo uma única vez.
     
     Args:
-        input_html: HTML string ou caminho do arquivo
+        input_html: HTML string ou elemento lxml (processado na própria árvore)
         journal_acron_folder: Diretório base para resolver paths
         output_file: Arquivo de saída (opcional)
-        encoding: Encoding dos arquivos
+        encoding: Encoding dos arquivos (None: detectado a partir dos bytes)
         content_reader: Função para ler conteúdo
                        Assinatura: (file_path: str, encoding: str, journal_acron_folder: str) -> str
+        cache: HTMLFileCache compartilhado pelos documentos do fascículo / lote;
+               usado somente com content_signature
+        content_signature: Função que identifica a versão do conteúdo lido
+                       por content_reader, por exemplo, (mtime, tamanho)
+                       Assinatura: a mesma de content_reader
+                       (padrão: default_file_signature, se content_reader
+                       não for informado)
     
     Returns:
         HTML processado com elementos html-to-embed e xref
@@ -261,8 +348,14 @@ def merge_html(
         ...     return get_content(full_path)
         >>> result = merge_html(html, content_reader=my_reader)
     """
-    merger = HTMLMerger(journal_acron_folder, encoding, content_reader)
+    merger = HTMLMerger(
+        journal_acron_folder, encoding, content_reader, cache, content_signature
+    )
     
+    if not isinstance(input_html, str):
+        # Processa a árvore já carregada
+        return merger.process_element(input_html)
+
     # Processa string
     return merger.process_html(input_html)
 
@@ -0,0 +1,661 @@
+"""
+Conversão em lote dos documentos (registros ISIS => XML SPS).
+
+Consome os itens de `ClassicWebsite.get_issue_doc_records`, distribui os
+documentos, em blocos (`chunksize`), entre processos e retorna
+`(pid, xml, exceptions)` na ordem de entrada (`ordered=True`) ou à medida
+que são concluídos.
+
+Cada processo mantém o seu estado entre os documentos: os caches dos
+módulos (detector, sec-type, XPath, idiomas), os perfis de idioma, já
+carregados na inicialização, e um `HTMLFileCache` compartilhado pelos
+documentos que o processo converte.
+
+Cada documento tem limites de tempo e de memória (`Watchdog`), que valem
+para o documento inteiro (conversão do HTML e geração do XML). Se um limite
+for excedido, o XML é gerado sem body e back, com um tempo adicional de
+`FALLBACK_TIME_FACTOR` vezes o limite; a etapa é registrada em
+`Document.exceptions`.
+
+Se um processo for encerrado (limite de CPU, falta de memória), todo o
+conjunto de processos é encerrado. Cada processo registra em um arquivo
+(`progress_dir`) o documento em conversão; assim, os blocos afetados voltam,
+sem esses documentos, para um novo conjunto de processos, e os documentos
+que estavam em conversão são convertidos, um a um, em um conjunto de um
+processo (isolamento), ao mesmo tempo. O documento que encerrar também o
+processo do isolamento é convertido sem body e back.
+
+Com `cache` (`XMLOutputCache`), os documentos cujas entradas não mudaram
+não são convertidos novamente: o XML e as exceções guardados são
+retornados.
+"""
+
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import traceback
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from scielo_classic_website.exceptions import DocumentBudgetExceeded
+from scielo_classic_website.htmlbody.html_file_cache import HTMLFileCache
+from scielo_classic_website.models.document import Document
+from scielo_classic_website.spsxml.language_id import LANGUAGE_ID
+from scielo_classic_website.spsxml.xml_snapshots import remove_spill
+from scielo_classic_website.utils.watchdog import Watchdog
+from scielo_classic_website.utils.xml_output_cache import (
+    XMLOutputCache,
+    get_document_key,
+    get_library_version,
+)
+
+BATCH_MAX_WORKERS = int(
+    os.environ.get("CLASSIC_WEBSITE_BATCH_MAX_WORKERS") or os.cpu_count() or 1
+)
+BATCH_CHUNK_SIZE = int(os.environ.get("CLASSIC_WEBSITE_BATCH_CHUNK_SIZE") or 4)
+BATCH_HTML_CACHE_SIZE = int(
+    os.environ.get("CLASSIC_WEBSITE_BATCH_HTML_CACHE_SIZE") or 1000
+)
+# limites por documento: segundos e MiB (crescimento da memória); 0: sem limite
+BATCH_TIME_LIMIT = float(os.environ.get("CLASSIC_WEBSITE_BATCH_TIME_LIMIT") or 300)
+BATCH_MEMORY_LIMIT = int(os.environ.get("CLASSIC_WEBSITE_BATCH_MEMORY_LIMIT") or 0)
+
+# tempo concedido ao XML sem body, depois de excedido o limite, em frações
+# de `time_limit`
+FALLBACK_TIME_FACTOR = 0.25
+# envios de um bloco a conjuntos de processos encerrados, no máximo
+MAX_ATTEMPTS = 3
+
+ConversionResult = namedtuple("ConversionResult", "pid xml exceptions")
+
+# estado do processo, criado por `init_worker`
+_WORKER = {}
+
+
+def init_worker(html_cache_size=None, kill=False, progress_dir=None):
+    """
+    Prepara o processo para converter vários documentos
+
+    kill : bool
+        encerra o processo se um documento usar a CPU por muito mais tempo
+        que o limite (somente em processos do `BatchConverter`)
+    progress_dir : str
+        pasta em que o processo registra o documento em conversão
+    """
+    _WORKER["kill"] = kill
+    _WORKER["progress"] = progress_dir and os.path.join(
+        progress_dir, str(os.getpid())
+    )
+    _WORKER["html_file_cache"] = HTMLFileCache(
+        maxsize=html_cache_size or BATCH_HTML_CACHE_SIZE
+    )
+    try:
+        # perfis de idioma carregados uma vez, antes do primeiro documento
+        LANGUAGE_ID.factory
+    except Exception as e:
+        logging.exception(e)
+
+
+def convert_document(
+    item,
+    journal=None,
+    params_for_xml_creation=None,
+    retention="last",
+    time_limit=None,
+    memory_limit=None,
+    cache=None,
+    html_reader=None,
+    html_file_cache=None,
+    without_body=False,
+    html_signature=None,
+):
+    """
+    Converte um item de `ClassicWebsite.get_issue_doc_records`
+
+    Parameters
+    ----------
+    item : dict
+        {"doc_id", "issue", "article"} e, opcionalmente, "paragraph"
+        (registros p de artigo/p), "title" (registro do periódico) e
+        "translations" ({lang: {"before references": html,
+        "after references": html}})
+    journal : dict
+        registro do periódico, se o item não tiver "title"
+    time_limit : float
+        segundos, para o documento (conversão do HTML e geração do XML)
+    memory_limit : int
+        crescimento máximo da memória (bytes), para o documento
+    cache : XMLOutputCache
+        XML já gerados, por conteúdo das entradas
+    html_reader : callable
+        lê os arquivos HTML a serem embedados:
+        html_reader(file_path, encoding, journal_acron_folder)
+    html_signature : callable
+        versão (por exemplo, (mtime, tamanho)) do arquivo lido por
+        `html_reader`, com os mesmos argumentos; sem ela, as árvores dos
+        arquivos não são guardadas em `html_file_cache`
+    html_file_cache : HTMLFileCache
+        padrão: o do processo (`init_worker`)
+    without_body : bool
+        gera o XML sem body e back, sem converter o HTML; para o documento
+        que encerrou o processo em que era convertido
+
+    Returns
+    -------
+    ConversionResult
+        (pid, xml, exceptions)
+    """
+    if item.get("invalid_records"):
+        return ConversionResult(
+            item.get("id"),
+            None,
+            [
+                {
+                    "action": "convert_document",
+                    "type": "invalid_records",
+                    "message": f"Invalid records {item.get('id')}",
+                    "detail": None,
+                }
+            ],
+        )
+
+    pid = item.get("doc_id")
+    if cache is not None:
+        key = get_document_key(item, journal, params_for_xml_creation, html_reader)
+        cached = cache.get(key)
+        if cached is not None:
+            return ConversionResult(pid, *cached)
+
+    document = Document(
+        {
+            "article": item["article"],
+            "paragraph": item.get("paragraph"),
+            "issue": item.get("issue"),
+            "title": item.get("title") or journal,
+        }
+    )
+    document.params_for_xml_creation = params_for_xml_creation or {}
+    document.html_file_cache = html_file_cache or _WORKER.get("html_file_cache")
+    translations = item.get("translations") or {}
+    document._translated_html_by_lang = translations
+    if html_reader is not None:
+        document.html_reader = html_reader
+        document.html_signature = html_signature
+
+    watchdog = Watchdog(time_limit, memory_limit, kill=_WORKER.get("kill"))
+    xml = None
+    try:
+        if without_body:
+            _add_terminated_exception(document)
+        else:
+            try:
+                with watchdog:
+                    document.generate_body_and_back_from_html(
+                        translations, retention=retention
+                    )
+            except DocumentBudgetExceeded as e:
+                _add_budget_exception(
+                    document, "Convert HTML to XML", e, "without body"
+                )
+                _remove_body(document, watchdog)
+        xml = _generate_full_xml(document, watchdog)
+    except Exception as e:
+        logging.exception(f"convert_document {pid}: {e}")
+        document.add_exception("convert_document", str(type(e)), traceback.format_exc())
+    if cache is not None and xml is not None and not _budget_exceeded(document):
+        # resultados de limites excedidos dependem do ambiente: não são guardados;
+        # nem os de entradas (arquivos HTML) alteradas durante a conversão
+        if key == get_document_key(item, journal, params_for_xml_creation, html_reader):
+            cache.set(key, pid, xml, document.exceptions)
+        else:
+            logging.info(f"convert_document {pid}: inputs changed, not cached")
+    # o resultado não inclui os arquivos das etapas (retention="spill")
+    remove_spill(document)
+    return ConversionResult(pid, xml, document.exceptions)
+
+
+def _budget_exceeded(document):
+    return any(
+        item.get("type") == DocumentBudgetExceeded.__name__
+        for item in document.exceptions or []
+    )
+
+
+def _generate_full_xml(document, watchdog):
+    try:
+        with watchdog:
+            return document.generate_full_xml()
+    except DocumentBudgetExceeded as e:
+        if not document.xml_body_and_back:
+            _add_budget_exception(document, "Generate XML", e)
+            return None
+        _add_budget_exception(document, "Generate XML", e, "without body")
+    _remove_body(document, watchdog)
+    try:
+        with watchdog:
+            return document.generate_full_xml()
+    except DocumentBudgetExceeded as e:
+        _add_budget_exception(document, "Generate XML without body", e)
+        return None
+
+
+def _remove_body(document, watchdog):
+    # o XML sem body tem um tempo próprio, pequeno, além do limite
+    document.xml_body_and_back = None
+    watchdog.grant((watchdog.time_limit or 0) * FALLBACK_TIME_FACTOR)
+
+
+def _add_terminated_exception(document):
+    message = "process terminated (CPU or memory limit)"
+    logging.error(f"Convert HTML to XML: {message}")
+    document.add_exception(
+        f"Convert HTML to XML - {message}",
+        DocumentBudgetExceeded.__name__,
+        message,
+        {
+            "budget": "process",
+            "stage": None,
+            "limit": None,
+            "value": None,
+            "fallback": "without body",
+        },
+    )
+
+
+def _add_budget_exception(document, action, error, fallback=None):
+    logging.error(f"{action}: {error}")
+    document.add_exception(
+        f"{action} - {error.budget} budget exceeded at {error.stage}",
+        type(error).__name__,
+        str(error),
+        {
+            "budget": error.budget,
+            "stage": error.stage,
+            "limit": error.limit,
+            "value": error.value,
+            "fallback": fallback,
+        },
+    )
+
+
+def _set_progress(value):
+    # gravado a cada documento: o processo pode ser encerrado a qualquer momento
+    path = _WORKER.get("progress")
+    if path:
+        with open(path, "w") as fp:
+            fp.write(value)
+
+
+def _read_progress(progress_dir):
+    """
+    {(id do bloco, índice do documento)} em conversão nos processos
+    """
+    found = set()
+    for name in os.listdir(progress_dir):
+        try:
+            with open(os.path.join(progress_dir, name)) as fp:
+                part_id, index = fp.read().split()
+            found.add((int(part_id), int(index)))
+        except (OSError, ValueError):
+            continue
+    return found
+
+
+def _convert_chunk(items, options, part_id=None):
+    if not _WORKER:
+        init_worker()
+    cache = options.get("cache")
+    before = cache and cache.stats
+    results = []
+    for index, item in enumerate(items):
+        _set_progress(f"{part_id} {index}")
+        results.append(convert_document(item, **options))
+    _set_progress("")
+    # estatísticas do cache neste processo, agregadas pelo BatchConverter
+    cache_stats = cache and {
+        name: value - before[name] for name, value in cache.stats.items()
+    }
+    return results, cache_stats
+
+
+class BatchConverter:
+    """
+    Converte documentos em paralelo (processos)
+
+    >>> converter = BatchConverter(journal=title_record)
+    >>> for pid, xml, exceptions in converter.convert(
+    ...         classic_website.get_issue_doc_records(acron, issue_folder)):
+    ...     ...
+    """
+
+    def __init__(
+        self,
+        journal=None,
+        params_for_xml_creation=None,
+        max_workers=None,
+        chunksize=None,
+        max_pending=None,
+        ordered=True,
+        retention="last",
+        time_limit=None,
+        memory_limit=None,
+        cache=None,
+        html_reader=None,
+        html_signature=None,
+    ):
+        """
+        max_workers : int
+            número de processos; 1 converte no próprio processo
+        chunksize : int
+            documentos enviados de uma vez a um processo
+        max_pending : int
+            blocos em processamento ou aguardando, no máximo; limita a
+            leitura antecipada dos registros
+        ordered : bool
+            True: resultados na ordem de entrada; False: à medida que são
+            concluídos
+        time_limit : float
+            segundos por documento; 0: sem limite
+        memory_limit : int
+            crescimento máximo da memória (bytes) por documento;
+            0: sem limite
+        cache : XMLOutputCache or str
+            cache (ou a sua pasta) dos XML gerados; `cache.stats` informa
+            hits e misses de todos os processos
+        html_reader : callable
+            lê os arquivos HTML a serem embedados; deve ser uma função
+            de módulo (enviada aos processos)
+        html_signature : callable
+            versão do arquivo lido por `html_reader` (ver `convert_document`);
+            deve ser uma função de módulo
+        """
+        self.max_workers = max_workers or BATCH_MAX_WORKERS
+        self.chunksize = chunksize or BATCH_CHUNK_SIZE
+        self.max_pending = max_pending or self.max_workers * 2
+        self.ordered = ordered
+        if time_limit is None:
+            time_limit = BATCH_TIME_LIMIT
+        if memory_limit is None:
+            memory_limit = BATCH_MEMORY_LIMIT * 1024 * 1024
+        if isinstance(cache, (str, os.PathLike)):
+            cache = XMLOutputCache(cache)
+        self.cache = cache
+        if cache is not None:
+            # calculada antes de criar os processos, que a herdam
+            get_library_version()
+        self.options = {
+            "journal": journal,
+            "params_for_xml_creation": params_for_xml_creation,
+            "retention": retention,
+            "time_limit": time_limit,
+            "memory_limit": memory_limit,
+            "cache": cache,
+            "html_reader": html_reader,
+            "html_signature": html_signature,
+        }
+        self._executor = None
+        self._isolation = None
+        self._progress_dirs = {}
+        self._tasks = deque()
+
+    def convert(self, items):
+        """
+        Converte os itens de `ClassicWebsite.get_issue_doc_records`
+
+        Yields
+        ------
+        ConversionResult
+            (pid, xml, exceptions)
+        """
+        if self.max_workers == 1:
+            # no próprio processo, o cache vale somente para esta chamada
+            html_file_cache = HTMLFileCache(maxsize=BATCH_HTML_CACHE_SIZE)
+            for item in items:
+                yield convert_document(
+                    item, html_file_cache=html_file_cache, **self.options
+                )
+            return
+
+        try:
+            if self.ordered:
+                yield from self._ordered(items)
+            else:
+                yield from self._as_completed(items)
+        finally:
+            for executor, progress_dir in self._progress_dirs.items():
+                executor.shutdown(cancel_futures=True)
+                shutil.rmtree(progress_dir, ignore_errors=True)
+            self._executor = None
+            self._isolation = None
+            self._progress_dirs = {}
+            self._tasks = deque()
+
+    def _new_executor(self, max_workers):
+        progress_dir = tempfile.mkdtemp(prefix="batch_converter.")
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(None, True, progress_dir),
+        )
+        self._progress_dirs[executor] = progress_dir
+        return executor
+
+    def _get_executor(self, isolated):
+        if isolated:
+            if self._isolation is None:
+                self._isolation = self._new_executor(1)
+            return self._isolation
+        if self._executor is None:
+            self._executor = self._new_executor(self.max_workers)
+        return self._executor
+
+    def _chunks(self, items):
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunksize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _submit(self, part):
+        options = self.options
+        if part.without_body:
+            options = dict(options, without_body=True)
+        executor = self._get_executor(part.isolated)
+        try:
+            part.future = executor.submit(_convert_chunk, part.items, options, part.id)
+        except BrokenProcessPool as e:
+            # tratado com os demais resultados do conjunto (`_recover`)
+            part.future = Future()
+            part.future.set_exception(e)
+        part.executor = executor
+        return part
+
+    def _new_task(self, chunk):
+        # um bloco: lista das partes enviadas, na ordem dos documentos
+        self._tasks.append([self._submit(_Part(chunk))])
+
+    def _ordered(self, items):
+        for chunk in self._chunks(items):
+            self._new_task(chunk)
+            if len(self._tasks) >= self.max_pending:
+                yield from self._next_results()
+        while self._tasks:
+            yield from self._next_results()
+
+    def _next_results(self):
+        # o bloco continua pendente (e é reenviado por `_recover`) até
+        # que todos os seus resultados sejam obtidos
+        results = self._task_results(self._tasks[0])
+        self._tasks.popleft()
+        return results
+
+    def _as_completed(self, items):
+        for chunk in self._chunks(items):
+            self._new_task(chunk)
+            if len(self._tasks) >= self.max_pending:
+                yield from self._completed()
+        while self._tasks:
+            yield from self._completed()
+
+    def _completed(self):
+        wait(
+            [
+                part.future
+                for task in self._tasks
+                for part in task
+                if part.results is None
+            ],
+            return_when=FIRST_COMPLETED,
+        )
+        for task in list(self._tasks):
+            if all(part.done for part in task):
+                results = self._task_results(task)
+                self._tasks.remove(task)
+                yield from results
+
+    def _task_results(self, task):
+        while True:
+            try:
+                results = []
+                for part in task:
+                    results.extend(self._part_results(part))
+                return results
+            except BrokenProcessPool:
+                # `task` passa a ter as partes reenviadas
+                self._recover(part.executor)
+
+    def _part_results(self, part):
+        if part.results is None:
+            try:
+                results, cache_stats = part.future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logging.exception(e)
+                results, cache_stats = [_failed(item, e) for item in part.items], None
+            self._merge_cache_stats(cache_stats)
+            part.results = results
+        return part.results
+
+    def _merge_cache_stats(self, cache_stats):
+        if cache_stats:
+            self.cache.merge(cache_stats)
+
+    def _recover(self, executor):
+        """
+        Um processo de `executor` foi encerrado e, com ele, todo o conjunto:
+        reenvia as partes afetadas de todos os blocos pendentes, sem esperar
+        pelos seus resultados
+        """
+        if executor is self._executor:
+            self._executor = None
+        if executor is self._isolation:
+            self._isolation = None
+        # o conjunto encerrado conclui todas as suas partes (com ou sem erro)
+        wait(
+            [
+                part.future
+                for task in self._tasks
+                for part in task
+                if part.executor is executor
+            ]
+        )
+        in_progress = _read_progress(self._progress_dirs[executor])
+        for task in self._tasks:
+            task[:] = [
+                new
+                for part in task
+                for new in self._resubmit(part, executor, in_progress)
+            ]
+
+    def _resubmit(self, part, executor, in_progress):
+        if part.executor is not executor or not isinstance(
+            part.future.exception(), BrokenProcessPool
+        ):
+            return [part]
+        indexes = {index for part_id, index in in_progress if part_id == part.id}
+        if part.isolated and indexes:
+            # o documento encerrou também o processo do isolamento
+            if part.without_body:
+                return [self._failed_part(part)]
+            return [self._submit(_Part(part.items, isolated=True, without_body=True))]
+        if not indexes and part.attempts + 1 >= MAX_ATTEMPTS:
+            return [self._failed_part(part)]
+
+        parts = []
+        groups = itertools.groupby(
+            enumerate(part.items), key=lambda pair: pair[0] in indexes
+        )
+        for was_in_progress, group in groups:
+            items = [item for index, item in group]
+            if was_in_progress:
+                # suspeitos: um a um, no isolamento
+                parts.extend(
+                    self._submit(_Part([item], isolated=True)) for item in items
+                )
+            else:
+                parts.append(
+                    self._submit(
+                        _Part(
+                            items,
+                            isolated=part.isolated,
+                            without_body=part.without_body,
+                            attempts=part.attempts + 1,
+                        )
+                    )
+                )
+        return parts
+
+    def _failed_part(self, part):
+        message = "process terminated (CPU or memory limit)"
+        for item in part.items:
+            logging.error(f"convert_document {item.get('doc_id')}: {message}")
+        failed = _Part(part.items)
+        failed.results = [
+            _failed(item, part.future.exception(), message) for item in part.items
+        ]
+        return failed
+
+
+class _Part:
+    """
+    Documentos de um bloco enviados juntos a um conjunto de processos
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, items, isolated=False, without_body=False, attempts=0):
+        self.id = next(self._ids)
+        self.items = items
+        self.isolated = isolated
+        self.without_body = without_body
+        # envios anteriores a conjuntos encerrados por outros documentos
+        self.attempts = attempts
+        self.executor = None
+        self.future = None
+        self.results = None
+
+    @property
+    def done(self):
+        return self.results is not None or self.future.done()
+
+
+def _failed(item, error, message=None):
+    return ConversionResult(
+        item.get("doc_id") or item.get("id"),
+        None,
+        [
+            {
+                "action": "convert_document",
+                "type": str(type(error)),
+                "message": message or str(error),
+                "detail": None,
+            }
+        ],
+    )
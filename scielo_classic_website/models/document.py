@@ -12,6 +12,7 @@ from scielo_classic_website.isisdb.p_record import ParagraphRecord
 from scielo_classic_website.models.issue import Issue
 from scielo_classic_website.models.journal import Journal
 from scielo_classic_website.spsxml import sps_xml_body_pipes
+from scielo_classic_website.spsxml.pipe_profiler import profile_document
 from scielo_classic_website.spsxml.sps_xml_pipes import get_xml_rsps
 from scielo_classic_website.exceptions import GetSectionTitleException
 
@@ -52,6 +53,7 @@ class Document:
             data : dict
                 keys:
                     article
+                    paragraph (registros p, se não estiverem em article)
                     title
                     issue
                     fulltexts (list of dict: uri, uri_text, lang, )
@@ -62,14 +64,24 @@ class Document:
         self._main_html_paragraphs = {}
         self._document_records = None
         self.xml_body_and_back = None
+        # arquivo zip com os resultados das etapas (retention="spill");
+        # quem converte o remove (xml_snapshots.remove_spill)
+        self.xml_body_and_back_spill = None
         self.xml_body = None
         self.exceptions = None
         self.pretty_print = False
+        # HTMLFileCache compartilhado pelos documentos do fascículo / lote
+        self.html_file_cache = None
         self.data = {}
         try:
             self.data["article"] = data["article"]
         except (TypeError, KeyError):
             self.data["article"] = data
+        try:
+            # registros p dos arquivos artigo/p/.../*.id
+            self.data["paragraph"] = data["paragraph"]
+        except (TypeError, KeyError):
+            pass
         try:
             self._journal = Journal(data["title"])
         except (TypeError, KeyError):
@@ -333,10 +345,13 @@ class Document:
     def citations(self):
         return self.document_records.get_record("c")
 
-    def generate_body_and_back_from_html(self, translated_texts=None):
+    def generate_body_and_back_from_html(self, translated_texts=None, retention=None):
         """
         Parameters
         ----------
+        retention : str
+            política de retenção dos resultados das etapas em
+            `xml_body_and_back` (last, failures, all, spill)
         translated_texts : {
             lang: {
                 "before references": before,
@@ -358,7 +373,8 @@ class Document:
                 break
 
         if main_text or translations:
-            sps_xml_body_pipes.convert_html_to_xml(self)
+            with profile_document(self):
+                sps_xml_body_pipes.convert_html_to_xml(self, retention=retention)
 
     def generate_full_xml(self, selected_xml_body=None):
         """
@@ -370,7 +386,8 @@ class Document:
             self.xml_body = selected_xml_body or self.xml_body_and_back[-1]
         except (TypeError, IndexError) as e:
             self.xml_body = None
-        return get_xml_rsps(self)
+        with profile_document(self):
+            return get_xml_rsps(self)
     
     def add_exception(self, action, exception_type, message, detail=None):
         if not self.exceptions:
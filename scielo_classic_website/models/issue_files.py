@@ -1,10 +1,13 @@
-import glob
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from scielo_classic_website.htmlbody.html_body import HTMLContent
 from scielo_classic_website.isisdb.isis_cmd import get_documents_by_issue_folder
 from scielo_classic_website.utils.files_utils import create_zip_file, sanitize_filename_surrogates
+from scielo_classic_website.utils.fs_cache import PATH_CACHE
+from scielo_classic_website.utils.fs_inventory import inventory_glob
+from scielo_classic_website.utils.issue_manifest import get_changes, get_manifest_dirs
 
 
 def _get_classic_website_rel_path(file_path):
@@ -17,6 +20,87 @@ def _get_classic_website_rel_path(file_path):
             return path
 
 
+def get_html_replacements(path):
+    """
+    Retorna as substituições dos links de ativos do arquivo HTML `path`
+    (old_link => new_link)
+    """
+    return HTMLContent.create(path).asset_path_fixes
+
+
+class TranslationFile(dict):
+    """
+    Metadados de um arquivo HTML de bases/translation.
+
+    A chave "replacements" exige o parsing do HTML e, por isso,
+    é calculada somente quando necessária: ao ser acessada, ao percorrer,
+    copiar ou serializar o item (ou por `IssueFiles.compute_replacements`).
+    `"replacements" in item` é sempre verdadeiro, como era quando o valor
+    era calculado na listagem. Falhas são informadas a `on_error(item)`.
+    """
+
+    def __init__(self, data=None, on_error=None):
+        super().__init__(data or {})
+        self._on_error = on_error
+
+    @property
+    def has_replacements(self):
+        """True se "replacements" já foi calculado"""
+        return super().__contains__("replacements")
+
+    def __missing__(self, key):
+        if key != "replacements":
+            raise KeyError(key)
+        try:
+            value = get_html_replacements(self["path"])
+        except Exception as e:
+            logging.exception(e)
+            value = {}
+            self.set_replacements_error(e)
+        self["replacements"] = value
+        return value
+
+    def _load_replacements(self):
+        if not self.has_replacements:
+            self["replacements"]
+
+    def __contains__(self, key):
+        return key == "replacements" or super().__contains__(key)
+
+    def __iter__(self):
+        self._load_replacements()
+        return super().__iter__()
+
+    def __len__(self):
+        self._load_replacements()
+        return super().__len__()
+
+    def keys(self):
+        self._load_replacements()
+        return super().keys()
+
+    def values(self):
+        self._load_replacements()
+        return super().values()
+
+    def items(self):
+        self._load_replacements()
+        return super().items()
+
+    def copy(self):
+        return dict(self)
+
+    def get(self, key, default=None):
+        if key == "replacements":
+            return self[key]
+        return super().get(key, default)
+
+    def set_replacements_error(self, e):
+        self["replacements_error"] = {"message": str(e), "type": type(e).__name__}
+        if self._on_error:
+            self._on_error(self)
+
+
 class IssueFiles:
     def __init__(self, acron, issue_folder, classic_website_paths):
         self.acron = acron
@@ -27,12 +111,24 @@ class IssueFiles:
         self._bases_pdf_files = None
         self._bases_xml_files = None
         self._classic_website_paths = classic_website_paths
+        self._inventory = getattr(classic_website_paths, "inventory", None)
         self._exceptions = {}
 
     @property
     def exceptions(self):
         return self._exceptions
 
+    @property
+    def manifest_dirs(self):
+        return get_manifest_dirs(self._classic_website_paths, self._subdir_acron_issue)
+
+    def changes(self, store, quick=True, digests=None):
+        """
+        Arquivos novos, alterados e removidos desde o último manifesto
+        guardado em `store` (ver `issue_manifest.get_changes`)
+        """
+        return get_changes(self, store, quick=quick, digests=digests)
+
     @property
     def files(self):
         if self.bases_xml_files:
@@ -52,6 +148,10 @@ class IssueFiles:
 
         Returns
         -------
+        list of TranslationFile
+        "replacements" é calculado somente quando acessado
+        ou por `compute_replacements`
+
         dict which keys: paths, info
         "paths": [
             "/path/bases/translations/acron/volnum/pt_a01.htm",
@@ -65,12 +165,13 @@ class IssueFiles:
         }
         """
         if self._bases_translation_files is None:
-            paths = glob.glob(
+            paths = inventory_glob(
+                self._inventory,
                 os.path.join(
                     self._classic_website_paths.bases_translation_path,
                     self._subdir_acron_issue,
                     "*",
-                )
+                ),
             )
             files = []
             for path in paths:
@@ -85,16 +186,18 @@ class IssueFiles:
                         label = "after"
 
                     files.append(
-                        {
-                            "type": "html",
-                            "key": name,
-                            "path": path,
-                            "name": basename,
-                            "relative_path": _get_classic_website_rel_path(path),
-                            "lang": lang,
-                            "part": label,
-                            "replacements": HTMLContent.create(path).asset_path_fixes,
-                        }
+                        TranslationFile(
+                            {
+                                "type": "html",
+                                "key": name,
+                                "path": path,
+                                "name": basename,
+                                "relative_path": _get_classic_website_rel_path(path),
+                                "lang": lang,
+                                "part": label,
+                            },
+                            on_error=self._register_replacements_error,
+                        )
                     )
                 except Exception as e:
                     self._exceptions.setdefault("bases_translation_files", [])
@@ -104,6 +207,49 @@ class IssueFiles:
             self._bases_translation_files = files
         return self._bases_translation_files
 
+    def compute_replacements(self, max_workers=None):
+        """
+        Calcula "replacements" dos arquivos de tradução ainda não calculados,
+        em paralelo (processos)
+
+        Parameters
+        ----------
+        max_workers : int
+            número de processos; 1 calcula no próprio processo
+
+        Returns
+        -------
+        list of TranslationFile
+        """
+        pending = [
+            item for item in self.bases_translation_files if not item.has_replacements
+        ]
+        if max_workers == 1 or len(pending) < 2:
+            for item in pending:
+                # falhas registradas por on_error
+                item["replacements"]
+            return self.bases_translation_files
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(get_html_replacements, item["path"]): item
+                for item in pending
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    item["replacements"] = future.result()
+                except Exception as e:
+                    item["replacements"] = {}
+                    item.set_replacements_error(e)
+        return self.bases_translation_files
+
+    def _register_replacements_error(self, item):
+        self._exceptions.setdefault("bases_translation_files", [])
+        self._exceptions["bases_translation_files"].append(
+            {"path": item["path"], **item["replacements_error"]}
+        )
+
     @property
     def bases_pdf_files(self):
         """
@@ -121,12 +267,13 @@ class IssueFiles:
             }
         """
         if self._bases_pdf_files is None:
-            paths = glob.glob(
+            paths = inventory_glob(
+                self._inventory,
                 os.path.join(
                     self._classic_website_paths.bases_pdf_path,
                     self._subdir_acron_issue,
                     "*",
-                )
+                ),
             )
             files = []
             for path in paths:
@@ -195,18 +342,20 @@ class IssueFiles:
         Returns:
             list: Lista de arquivos encontrados
         """
-        if not base_path or not os.path.exists(base_path):
+        if not base_path or not PATH_CACHE.exists(base_path):
             return []
 
         files = []
         if base_path.endswith(self._subdir_acron_issue):
-            paths = glob.glob(os.path.join(base_path, "*"))
+            paths = inventory_glob(self._inventory, os.path.join(base_path, "*"))
         else:
-            paths = glob.glob(os.path.join(base_path, self._subdir_acron_issue, "*"))
+            paths = inventory_glob(
+                self._inventory, os.path.join(base_path, self._subdir_acron_issue, "*")
+            )
 
         for path in paths:
             try:
-                if os.path.isfile(path):
+                if PATH_CACHE.isfile(path):
                     # Arquivo direto
                     files.append(
                         {
@@ -216,10 +365,10 @@ class IssueFiles:
                             "name": sanitize_filename_surrogates(os.path.basename(path)),
                         }
                     )
-                elif os.path.isdir(path):
+                elif PATH_CACHE.isdir(path):
                     # Diretório - busca arquivos dentro
-                    for item in glob.glob(os.path.join(path, "*")):
-                        if os.path.isfile(item):
+                    for item in inventory_glob(self._inventory, os.path.join(path, "*")):
+                        if PATH_CACHE.isfile(item):
                             files.append(
                                 {
                                     "type": file_type,
@@ -243,12 +392,13 @@ class IssueFiles:
     @property
     def bases_xml_files(self):
         if self._bases_xml_files is None:
-            paths = glob.glob(
+            paths = inventory_glob(
+                self._inventory,
                 os.path.join(
                     self._classic_website_paths.bases_xml_path,
                     self._subdir_acron_issue,
                     "*.xml",
-                )
+                ),
             )
             files = []
             for path in paths:
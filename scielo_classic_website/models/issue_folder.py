@@ -1,9 +1,12 @@
-import glob
 import logging
 import os
 from datetime import datetime
 
 from scielo_classic_website.htmlbody.html_body import HTMLContent
+from scielo_classic_website.utils.file_content import FileContent
+from scielo_classic_website.utils.fs_inventory import inventory_glob
+from scielo_classic_website.utils.issue_manifest import get_changes, get_manifest_dirs
+from scielo_classic_website.utils.html_encoding import decode_html
 
 
 def try_to_fix_encoding(nome_original):
@@ -39,44 +42,95 @@ def _get_classic_website_rel_path(file_path):
     return None
 
 
-def fixed_glob(patterns, file_type, recursive):
+def fixed_glob(patterns, file_type, recursive, inventory=None):
     paths = set()
     for pattern in patterns:
         paths.update(
-            glob.glob(pattern, recursive=recursive)
+            inventory_glob(inventory, pattern, recursive=recursive)
         )
     return paths
 
 
-def get_files(patterns, file_type, recursive=False):
-    for path in fixed_glob(patterns, file_type, recursive):
+class FileItem(dict):
+    """
+    Arquivo de `IssueFolder.files`.
+
+    Por padrão, somente os metadados do arquivo; o conteúdo é lido por
+    `file` (`FileContent`: leitura em blocos, mmap, checksum) ou
+    adicionado ao item ("content", bytes) por `load_content`. O conteúdo de
+    arquivo maior que o limite (`max_size`) não é carregado: "content" é
+    None e "content_too_large" é True.
+    """
+
+    def __init__(self, data, file=None, fix_content=None):
+        super().__init__(data)
+        self._file = file
+        self._fix_content = fix_content
+
+    @property
+    def file(self):
+        if self._file is None:
+            self._file = FileContent(self["path"])
+        return self._file
+
+    def load_content(self):
+        """
+        Adiciona "content" (ou "content_too_large") ao item
+        """
         try:
-            item = {
-                "type": file_type,
-                "path": path,
-                "modified_date": modified_date(path),
-                "name": os.path.basename(path),
-                "relative_path": _get_classic_website_rel_path(path),
-            }
+            if self.file.too_large:
+                self["content"] = None
+                self["content_too_large"] = True
+                return
+            content = self.file.read()
+            if self._fix_content:
+                content = self._fix_content(content) or content
+            self["content"] = content
+        except Exception as e:
+            logging.exception(e)
+            self["error"] = str(e)
+            self["error_type"] = type(e).__name__
+
+
+def get_files(
+    patterns,
+    file_type,
+    recursive=False,
+    inventory=None,
+    max_size=None,
+    read_content=False,
+    fix_content=None,
+):
+    for path in fixed_glob(patterns, file_type, recursive, inventory):
+        try:
+            item = FileItem(
+                {
+                    "type": file_type,
+                    "path": path,
+                    "modified_date": modified_date(path),
+                    "name": os.path.basename(path),
+                    "relative_path": _get_classic_website_rel_path(path),
+                },
+                FileContent(path, max_size=max_size),
+                fix_content,
+            )
             item["key"], item["extension"] = os.path.splitext(item["name"])
-            with open(path, "rb") as f:
-                item["content"] = f.read()
         except Exception as e:
             logging.exception(e)
             item["error"] = str(e)
             item["error_type"] = type(e).__name__
+            yield item
+            continue
+        if read_content:
+            item.load_content()
         yield item
 
 
 def fix_html_content(content):
     if not content:
         return None
-    try:
-        content = content.decode("utf-8")
-        logging.info("HTML content decoded as utf-8")
-    except Exception as e:
-        content = content.decode("iso-8859-1")
-        logging.info("HTML content decoded as iso-8859-1")
+    content, encoding = decode_html(content)
+    logging.info(f"HTML content decoded as {encoding}")
     try:
         return HTMLContent(content).content
     except Exception as e:
@@ -85,17 +139,59 @@ def fix_html_content(content):
 
 
 class IssueFolder:
-    def __init__(self, acron, issue_folder, classic_website_paths):
+    def __init__(
+        self,
+        acron,
+        issue_folder,
+        classic_website_paths,
+        max_size=None,
+        read_content=False,
+    ):
+        """
+        max_size : int
+            tamanho máximo (bytes) do conteúdo carregado em memória
+            (padrão: CLASSIC_WEBSITE_FILE_CONTENT_MAX_SIZE)
+        read_content : bool
+            True: os itens têm "content"; False (padrão): somente os
+            metadados, o conteúdo é carregado por `FileItem.load_content`
+        """
         self.acron = acron
         self.issue_folder = issue_folder
         self._subdir_acron_issue = os.path.join(acron, issue_folder)
         self._classic_website_paths = classic_website_paths
+        self._inventory = getattr(classic_website_paths, "inventory", None)
+        self._max_size = max_size
+        self._read_content = read_content
         self._exceptions = {}
 
     @property
     def exceptions(self):
         return self._exceptions
 
+    @property
+    def manifest_dirs(self):
+        return get_manifest_dirs(self._classic_website_paths, self._subdir_acron_issue)
+
+    def changes(self, store, quick=True, digests=None):
+        """
+        Arquivos novos, alterados e removidos desde o último manifesto
+        guardado em `store` (ver `issue_manifest.get_changes`)
+
+        Somente o conteúdo dos arquivos novos e alterados é lido.
+        """
+        listing = IssueFolder(
+            self.acron,
+            self.issue_folder,
+            self._classic_website_paths,
+            max_size=self._max_size,
+            read_content=False,
+        )
+        changes = get_changes(listing, store, quick=quick, digests=digests)
+        if self._read_content:
+            for item in changes["added"] + changes["changed"]:
+                item.load_content()
+        return changes
+
     @property
     def files(self):
         yield from self.bases_xml_files
@@ -129,7 +225,14 @@ class IssueFolder:
             "**",
             "*.*",
         )
-        for item in get_files([pattern], "html"):
+        for item in get_files(
+            [pattern],
+            "html",
+            inventory=self._inventory,
+            max_size=self._max_size,
+            read_content=self._read_content,
+            fix_content=fix_html_content,
+        ):
             if item.get("error"):
                 yield item
                 continue
@@ -145,9 +248,6 @@ class IssueFolder:
                 item["key"] = key
                 item["lang"] = lang
                 item["part"] = part
-                content = fix_html_content(item["content"])
-                if content:
-                    item["content"] = content
                 yield item
 
             except Exception as e:
@@ -174,7 +274,13 @@ class IssueFolder:
             self._subdir_acron_issue,
             "*.*",
         )
-        for item in get_files([pattern], "pdf"):
+        for item in get_files(
+            [pattern],
+            "pdf",
+            inventory=self._inventory,
+            max_size=self._max_size,
+            read_content=self._read_content,
+        ):
             if item.get("error"):
                 yield item
                 continue
@@ -209,7 +315,14 @@ class IssueFolder:
             os.path.join(htdocs_path, "**", self._subdir_acron_issue, "**", "*.*"),
         ]
 
-        for item in get_files(patterns, "asset", True):
+        for item in get_files(
+            patterns,
+            "asset",
+            True,
+            self._inventory,
+            self._max_size,
+            read_content=self._read_content,
+        ):
             if item.get("error"):
                 yield item
                 continue
@@ -229,7 +342,13 @@ class IssueFolder:
                 "*.xml",
             )
         ]
-        for item in get_files(patterns, "xml"):
+        for item in get_files(
+            patterns,
+            "xml",
+            inventory=self._inventory,
+            max_size=self._max_size,
+            read_content=self._read_content,
+        ):
             try:
                 yield item
             except Exception as e:
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Dict, Optional, Tuple, List
 import unicodedata
 
@@ -21,6 +22,60 @@ from scielo_classic_website.spsxml.detector_config_fn import (
     FN_NUMBER_PATTERNS,
     NOT_FN_INDICATORS,
 )
+from scielo_classic_website.spsxml.detector_patterns import (
+    DETECTOR_CACHE_SIZE,
+    PatternSet,
+    from_lists,
+)
+
+# Padrões compilados no carregamento (ver detector_patterns)
+_ID_PATTERNS = PatternSet(ID_PATTERNS.items(), re.IGNORECASE)
+_TEXT_PATTERNS = from_lists(TEXT_PATTERNS)
+_SEC_TYPE_PATTERNS = from_lists(SEC_TYPE_PATTERNS)
+# padrões sem "^", aplicados a cada parte de títulos com conectores
+_SEC_TYPE_PART_PATTERNS = {
+    sec_type: PatternSet((pattern.replace("^", ""), sec_type) for pattern in patterns)
+    for sec_type, patterns in SEC_TYPE_PATTERNS.items()
+}
+_COMBINED_PATTERNS = PatternSet(
+    (pattern, "|".join(sec_types)) for pattern, sec_types in COMBINED_PATTERNS
+)
+_REFERENCIAS_PATTERNS = PatternSet((pattern, True) for pattern in REFERENCIAS_PATTERNS)
+_AGRADECIMENTOS_PATTERNS = PatternSet((pattern, True) for pattern in AGRADECIMENTOS_PATTERNS)
+_NOT_FN_INDICATORS = PatternSet((pattern, True) for pattern in NOT_FN_INDICATORS)
+_FN_TYPE_PATTERNS = from_lists(FN_TYPE_PATTERNS)
+_FN_NUMBER_PATTERNS = [re.compile(pattern) for pattern in FN_NUMBER_PATTERNS]
+
+# Palavras conectoras que indicam seções múltiplas
+_CONNECTORS = re.compile(r"\s+(and|&|e|y|et|und|en|com|avec|mit|met)\s+")
+
+_NUMBER_PATTERNS = [
+    re.compile(pattern)
+    for pattern in (
+        r"(\d+[A-Za-z]?)",  # Números com possível letra
+        r"\[(\d+)\]",  # Entre colchetes
+        r"\((\d+)\)",  # Entre parênteses
+        r"([A-Z])(?:\s|$)",  # Letra maiúscula (apêndices)
+        r"([a-z])(?:\s|$)",  # Letra minúscula (notas)
+        r"(\d+\.\d+)",  # Números hierárquicos
+        r"([*†‡§¶#]+)",  # Símbolos especiais
+        r"S(\d+)",  # Material suplementar
+    )
+]
+
+# Padrões para extrair número de seção
+_SEC_NUMBER_PATTERNS = [
+    re.compile(pattern)
+    for pattern in (
+        r"^(\d+(?:\.\d+)*)\s*\.?\s+",  # 2.1 ou 2.1.
+        r"^(\d+)\s*\.\s+",  # 3.
+        r"^(\d+)\s+",  # 3
+        r"^([A-Z])\s*\.\s+",  # A.
+        r"^([A-Z])\s+",  # A
+        r"^([IVX]+)\s*\.\s+",  # IV. (números romanos)
+        r"^([IVX]+)\s+",  # IV
+    )
+]
 
 
 def detect_from_id(rid: str) -> Tuple[Optional[str], Optional[str]]:
@@ -45,10 +100,10 @@ def detect_from_id(rid: str) -> Tuple[Optional[str], Optional[str]]:
         return None, None
 
     # Tenta identificar pelo padrão do ID
-    for pattern, ref_type in ID_PATTERNS.items():
-        if re.match(pattern, rid, re.IGNORECASE):
-            element_name = REF_TYPE_TO_ELEMENT.get(ref_type)
-            return ref_type, element_name
+    ref_type = _ID_PATTERNS.match(rid)
+    if ref_type:
+        element_name = REF_TYPE_TO_ELEMENT.get(ref_type)
+        return ref_type, element_name
 
     return None, None
 
@@ -79,13 +134,17 @@ def detect_from_text(
     if not text:
         return None, None, None, None
 
+    return _detect_from_text(text)
+
+
+@lru_cache(maxsize=DETECTOR_CACHE_SIZE)
+def _detect_from_text(text):
     # Verifica padrões de texto
-    for ref_type, patterns in TEXT_PATTERNS.items():
-        for pattern in patterns:
-            if re.match(pattern, text):
-                element_name = REF_TYPE_TO_ELEMENT.get(ref_type)
-                prefix, number = get_id_prefix_and_number(text, ref_type)
-                return ref_type, element_name, prefix, number
+    ref_type = _TEXT_PATTERNS.match(text)
+    if ref_type:
+        element_name = REF_TYPE_TO_ELEMENT.get(ref_type)
+        prefix, number = get_id_prefix_and_number(text, ref_type)
+        return ref_type, element_name, prefix, number
 
     return None, None, None, None
 
@@ -127,19 +186,8 @@ def extract_number_from_text(text: str) -> Optional[str]:
     if text.isdigit():
         return text
 
-    patterns = [
-        r"(\d+[A-Za-z]?)",  # Números com possível letra
-        r"\[(\d+)\]",  # Entre colchetes
-        r"\((\d+)\)",  # Entre parênteses
-        r"([A-Z])(?:\s|$)",  # Letra maiúscula (apêndices)
-        r"([a-z])(?:\s|$)",  # Letra minúscula (notas)
-        r"(\d+\.\d+)",  # Números hierárquicos
-        r"([*†‡§¶#]+)",  # Símbolos especiais
-        r"S(\d+)",  # Material suplementar
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in _NUMBER_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1)
 
@@ -293,26 +341,27 @@ def detect_sec_type(section_title: str) -> Optional[str]:
         return None
 
     # Normaliza o título
-    title = section_title.strip()
+    return _detect_sec_type(section_title.strip())
+
+
+@lru_cache(maxsize=DETECTOR_CACHE_SIZE)
+def _detect_sec_type(title):
     title_lower = title.lower()
 
     # Primeiro, verifica combinações comuns que devem retornar tipos múltiplos
 
     # Verifica padrões combinados
-    for pattern, sec_types in COMBINED_PATTERNS:
-        if re.search(pattern, title_lower):
-            return "|".join(sec_types)
+    sec_types = _COMBINED_PATTERNS.search(title_lower)
+    if sec_types:
+        return sec_types
 
     # Se não é uma combinação, tenta identificar tipos individuais
     detected_types = []
 
-    # Palavras conectoras que indicam seções múltiplas
-    connectors = r"\s+(and|&|e|y|et|und|en|com|avec|mit|met)\s+"
-
     # Verifica se tem conectores
-    if re.search(connectors, title_lower):
+    if _CONNECTORS.search(title_lower):
         # Divide o título pelos conectores
-        parts = re.split(connectors, title_lower)
+        parts = _CONNECTORS.split(title_lower)
 
         # Tenta detectar tipo para cada parte
         for part in parts:
@@ -329,24 +378,17 @@ def detect_sec_type(section_title: str) -> Optional[str]:
                 "mit",
                 "met",
             ]:
-                for sec_type, patterns in SEC_TYPE_PATTERNS.items():
-                    for pattern in patterns:
-                        if re.search(pattern.replace("^", ""), part.strip()):
-                            if sec_type not in detected_types:
-                                detected_types.append(sec_type)
-                            break
+                for sec_type, patterns in _SEC_TYPE_PART_PATTERNS.items():
+                    if patterns.any(part.strip()):
+                        if sec_type not in detected_types:
+                            detected_types.append(sec_type)
 
     # Se detectou múltiplos tipos através da divisão
     if len(detected_types) > 1:
         return "|".join(detected_types)
 
     # Caso contrário, tenta detecção simples
-    for sec_type, patterns in SEC_TYPE_PATTERNS.items():
-        for pattern in patterns:
-            if re.match(pattern, title):
-                return sec_type
-
-    return None
+    return _SEC_TYPE_PATTERNS.match(title)
 
 
 def detect_sec_type_and_number(
@@ -374,23 +416,12 @@ def detect_sec_type_and_number(
 
     text = section_text.strip()
 
-    # Padrões para extrair número de seção
-    number_patterns = [
-        r"^(\d+(?:\.\d+)*)\s*\.?\s+",  # 2.1 ou 2.1.
-        r"^(\d+)\s*\.\s+",  # 3.
-        r"^(\d+)\s+",  # 3
-        r"^([A-Z])\s*\.\s+",  # A.
-        r"^([A-Z])\s+",  # A
-        r"^([IVX]+)\s*\.\s+",  # IV. (números romanos)
-        r"^([IVX]+)\s+",  # IV
-    ]
-
     section_number = None
     title_without_number = text
 
     # Tenta extrair o número
-    for pattern in number_patterns:
-        match = re.match(pattern, text)
+    for pattern in _SEC_NUMBER_PATTERNS:
+        match = pattern.match(text)
         if match:
             section_number = match.group(1)
             title_without_number = text[match.end() :].strip()
@@ -516,8 +547,8 @@ def _detect_fn_type_from_patterns(text: str) -> Optional[str]:
 
     # Remove possível numeração do início
     clean_text = text
-    for pattern in FN_NUMBER_PATTERNS:
-        clean_text = re.sub(pattern, "", text, count=1)
+    for pattern in _FN_NUMBER_PATTERNS:
+        clean_text = pattern.sub("", text, count=1)
         if clean_text != text:
             break
 
@@ -526,12 +557,7 @@ def _detect_fn_type_from_patterns(text: str) -> Optional[str]:
         return None
 
     # Verifica padrões de fn-type
-    for fn_type, patterns in FN_TYPE_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, clean_text):
-                return fn_type
-
-    return None
+    return _FN_TYPE_PATTERNS.search(clean_text)
 
 
 def detect_element_type(title: str, context: Optional[str] = None) -> Dict[str, Optional[str]]:
@@ -560,6 +586,14 @@ def detect_element_type(title: str, context: Optional[str] = None) -> Dict[str,
         >>> detect_element_type("Financial disclosure: This work was supported by...")
         {'element_type': 'fn', 'type_attribute': 'financial-disclosure', ...}
     """
+    if title:
+        title = title.strip()
+    # o resultado guardado em cache não pode ser alterado por quem o recebe
+    return dict(_detect_element_type(title, context))
+
+
+@lru_cache(maxsize=DETECTOR_CACHE_SIZE)
+def _detect_element_type(title, context):
     result = {
         "element_type": None,
         "type_attribute": None,
@@ -576,29 +610,26 @@ def detect_element_type(title: str, context: Optional[str] = None) -> Dict[str,
     if not title:
         return result
     
-    for pattern in REFERENCIAS_PATTERNS:
-        if re.search(pattern, title):
-            result["element_type"] = "ref-list"
-            return result
-    
-    for pattern in AGRADECIMENTOS_PATTERNS:
-        if re.search(pattern, title):
-            result["element_type"] = "ack"
-            return result
+    if _REFERENCIAS_PATTERNS.any(title):
+        result["element_type"] = "ref-list"
+        return result
+
+    if _AGRADECIMENTOS_PATTERNS.any(title):
+        result["element_type"] = "ack"
+        return result
 
     # Verifica se definitivamente NÃO é uma footnote
-    for pattern in NOT_FN_INDICATORS:
-        if re.match(pattern, title):
-            # É uma seção
-            sec_type, number = detect_sec_type_and_number(title)
-            if sec_type:
-                result["element_type"] = "sec"
-                result["type_attribute"] = sec_type
-                result["confidence"] = "high"
-                result["detected_as"] = f"section: {sec_type}"
-                result["suggested_id"] = suggest_sec_id(title)
-                result["number"] = number
-                return result
+    if _NOT_FN_INDICATORS.match(title):
+        # É uma seção
+        sec_type, number = detect_sec_type_and_number(title)
+        if sec_type:
+            result["element_type"] = "sec"
+            result["type_attribute"] = sec_type
+            result["confidence"] = "high"
+            result["detected_as"] = f"section: {sec_type}"
+            result["suggested_id"] = suggest_sec_id(title)
+            result["number"] = number
+            return result
     
     # Tenta detectar como footnote
     fn_type = detect_fn_type(title)
@@ -686,8 +717,8 @@ def extract_fn_number(text: str) -> Optional[str]:
     if not text:
         return None
     
-    for pattern in FN_NUMBER_PATTERNS:
-        match = re.match(pattern, text)
+    for pattern in _FN_NUMBER_PATTERNS:
+        match = pattern.match(text)
         if match:
             return match.group(1)
     
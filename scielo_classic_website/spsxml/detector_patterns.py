@@ -0,0 +1,136 @@
+"""
+Padrões dos detectores (detector_config_*) compilados no carregamento.
+
+Os padrões de uma configuração são reunidos em uma única expressão
+(alternância de grupos nomeados), de modo que o texto é examinado uma
+única vez, em vez de uma chamada a `re.match` / `re.search` por padrão.
+São centenas de padrões, mais do que cabe no cache interno do `re`, que
+os compilava novamente a cada chamada.
+
+O resultado é o mesmo da iteração dos padrões na ordem da configuração:
+- match: a alternância é tentada na ordem, logo o primeiro padrão que casa
+  no início do texto é o primeiro da configuração
+- search: para os padrões ancorados ("^..."), search equivale a match; para
+  os demais, a alternância somente descarta os textos sem nenhuma
+  ocorrência e, quando há, os padrões compilados são testados na ordem
+"""
+
+import os
+import re
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    # Python < 3.11
+    import sre_parse
+
+DETECTOR_CACHE_SIZE = int(os.environ.get("CLASSIC_WEBSITE_DETECTOR_CACHE_SIZE") or 4096)
+
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+class PatternSet:
+    def __init__(self, items, flags=0):
+        """
+        items : sequência de (padrão, valor)
+        """
+        items = list(items)
+        self.values = [value for pattern, value in items]
+        self.compiled = [re.compile(pattern, flags) for pattern, value in items]
+        self.combined = _combine(enumerate(pattern for pattern, value in items), flags)
+
+        anchored = []
+        floating = []
+        for i, (pattern, value) in enumerate(items):
+            if _is_anchored(pattern, flags):
+                anchored.append((i, pattern))
+            else:
+                floating.append((i, pattern))
+        self._anchored = _combine(anchored, flags)
+        self._floating = _combine(floating, flags)
+        self._floating_compiled = [(i, self.compiled[i]) for i, pattern in floating]
+
+    def __len__(self):
+        return len(self.values)
+
+    def match(self, text, default=None):
+        """
+        Valor do primeiro padrão que casa com o início de `text`
+        """
+        if self.combined is None:
+            return default
+        m = self.combined.match(text)
+        if m is None:
+            return default
+        return self.values[int(m.lastgroup[1:])]
+
+    def search(self, text, default=None):
+        """
+        Valor do primeiro padrão encontrado em `text`
+        """
+        first = None
+        if self._anchored is not None:
+            m = self._anchored.match(text)
+            if m is not None:
+                first = int(m.lastgroup[1:])
+        if self._floating is not None and self._floating.search(text) is not None:
+            for i, regex in self._floating_compiled:
+                if first is not None and i > first:
+                    break
+                if regex.search(text):
+                    first = i
+                    break
+        if first is None:
+            return default
+        return self.values[first]
+
+    def any(self, text):
+        """
+        Indica se algum padrão é encontrado em `text`
+        """
+        return (
+            self._anchored is not None and self._anchored.match(text) is not None
+        ) or (
+            self._floating is not None and self._floating.search(text) is not None
+        )
+
+
+def from_lists(patterns_by_value):
+    """
+    PatternSet de {valor: [padrão, ...]} (ordem do dicionário e das listas)
+    """
+    return PatternSet(
+        (pattern, value)
+        for value, patterns in patterns_by_value.items()
+        for pattern in patterns
+    )
+
+
+def _combine(indexed_patterns, flags):
+    indexed_patterns = list(indexed_patterns)
+    if not indexed_patterns:
+        return None
+    return re.compile(
+        "|".join(f"(?P<p{i}>{_scoped(pattern)})" for i, pattern in indexed_patterns),
+        flags,
+    )
+
+
+def _is_anchored(pattern, flags):
+    # "^..." sem alternância no nível mais externo e sem MULTILINE
+    parsed = sre_parse.parse(pattern, flags)
+    # SubPattern.state, antes do Python 3.8 SubPattern.pattern
+    state = getattr(parsed, "state", None) or parsed.pattern
+    if (state.flags | flags) & re.MULTILINE:
+        return False
+    items = list(parsed)
+    return bool(items) and items[0] == (sre_parse.AT, sre_parse.AT_BEGINNING)
+
+
+def _scoped(pattern):
+    # flags globais, ex.: "(?i)^abc", somente são aceitas no início da
+    # expressão; na alternância valem apenas para o próprio padrão
+    m = _GLOBAL_FLAGS.match(pattern)
+    if m:
+        return f"(?{m.group(1)}:{pattern[m.end():]})"
+    return f"(?:{pattern})"
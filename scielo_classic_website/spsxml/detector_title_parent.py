@@ -3,8 +3,11 @@ Identificador semântico de elemento pai para <title> em JATS/SPS.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
 
+from scielo_classic_website.spsxml.detector_patterns import DETECTOR_CACHE_SIZE, PatternSet
+
 
 # Dicionário global de padrões -> elemento pai
 PATTERNS = {
@@ -61,6 +64,9 @@ PATTERNS = {
     r'^(legend|legenda|leyenda|légende|explicación)': 'legend',
 }
 
+_PATTERNS = PatternSet(PATTERNS.items())
+_NUMBERED_TITLE = re.compile(r'^\d+\.?\d*\.?\s+\w+')
+
 
 def identify_parent_by_title(title_content: str) -> Optional[str]:
     """
@@ -74,16 +80,19 @@ def identify_parent_by_title(title_content: str) -> Optional[str]:
     """
     
     # Normaliza o texto para comparação
-    text = title_content.strip().lower()
-    
+    return _identify_parent_by_title(title_content.strip().lower())
+
+
+@lru_cache(maxsize=DETECTOR_CACHE_SIZE)
+def _identify_parent_by_title(text):
     # Testa cada padrão
-    for pattern, parent in PATTERNS.items():
-        if re.search(pattern, text):
-            return parent
+    parent = _PATTERNS.search(text)
+    if parent:
+        return parent
     
     # Se não encontrou padrão específico, pode ser uma seção genérica
     # se tiver numeração como "1.", "2.1", etc.
-    if re.match(r'^\d+\.?\d*\.?\s+\w+', text):
+    if _NUMBERED_TITLE.match(text):
         return 'sec'
     
     return None
@@ -0,0 +1,102 @@
+"""
+Índice dos elementos de uma árvore por tag, id, name e rid (xref).
+
+Construído em um único percurso, substitui consultas do tipo
+`.//xref[@rid='...']` feitas para cada id, que custam O(ids × nós).
+
+As listas estão na ordem do documento. As consultas conferem o valor
+corrente do atributo, então o índice continua válido quando os atributos
+são removidos, mas alterações de valor devem ser feitas por `rename_id`.
+"""
+
+
+class IdIndex:
+    def __init__(self, root):
+        self.root = root
+        self.nodes = []
+        self.by_tag = {}
+        self.by_id = {}
+        self.by_name = {}
+        self.by_rid = {}
+        for node in root.iterdescendants():
+            tag = node.tag
+            if not isinstance(tag, str):
+                # comentários e instruções de processamento
+                continue
+            self.nodes.append(node)
+            self.by_tag.setdefault(tag, []).append(node)
+            _id = node.get("id")
+            if _id is not None:
+                self.by_id.setdefault(_id, []).append(node)
+            name = node.get("name")
+            if name is not None:
+                self.by_name.setdefault(name, []).append(node)
+            if tag == "xref":
+                rid = node.get("rid")
+                if rid is not None:
+                    self.by_rid.setdefault(rid, []).append(node)
+
+    def tag(self, tag):
+        """Equivale a `.//{tag}`"""
+        return self.by_tag.get(tag) or []
+
+    def with_id(self, value):
+        """Equivale a `.//*[@id=$value]`"""
+        return [node for node in self.by_id.get(value) or [] if node.get("id") == value]
+
+    def with_name(self, value, context=None):
+        """
+        Equivale a `.//*[@name=$value]` a partir de `root` ou de `context`
+        """
+        return [
+            node
+            for node in self.by_name.get(value) or []
+            if node.get("name") == value and (context is None or _is_descendant(node, context))
+        ]
+
+    def xrefs(self, rid):
+        """Equivale a `.//xref[@rid=$rid]`"""
+        return [node for node in self.by_rid.get(rid) or [] if node.get("rid") == rid]
+
+    def rename_id(self, node, new_id):
+        """
+        Altera o id de `node` e o rid dos xref que o referenciam
+        """
+        old_id = node.get("id")
+        node.set("id", new_id)
+        self.by_id.setdefault(new_id, []).append(node)
+        for xref in self.xrefs(old_id):
+            xref.set("rid", new_id)
+            self.by_rid.setdefault(new_id, []).append(xref)
+
+    def add_prefix(self, prefix):
+        """
+        Acrescenta `prefix` aos ids que não o têm, atualizando os rid
+        """
+        for node in self.nodes:
+            _id = node.get("id")
+            if _id is not None and not _id.startswith(prefix):
+                self.rename_id(node, f"{prefix}{_id}")
+
+    def duplicated(self, attr="id", tag=None):
+        """
+        Elementos (ordem do documento) cujo valor de `attr`
+        já ocorreu em um elemento anterior
+        """
+        nodes = self.nodes if tag is None else self.tag(tag)
+        seen = set()
+        for node in nodes:
+            value = node.get(attr)
+            if value is None:
+                continue
+            if value in seen:
+                yield node
+            else:
+                seen.add(value)
+
+
+def _is_descendant(node, context):
+    for ancestor in node.iterancestors():
+        if ancestor is context:
+            return True
+    return False
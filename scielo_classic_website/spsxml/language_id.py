@@ -0,0 +1,110 @@
+"""
+Identificação do idioma de textos restrita aos idiomas presentes no SciELO.
+
+Usa os perfis de n-gramas do langdetect, carregados uma única vez por
+processo e somente para os idiomas candidatos. A semente é fixa, portanto
+o resultado é reproduzível, e os resultados são guardados pelo hash do texto.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from langdetect.detector import Detector
+from langdetect.detector_factory import PROFILES_DIRECTORY, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+from langdetect.utils.lang_profile import LangProfile
+
+LANGUAGES = ("pt", "es", "en", "fr", "de", "it", "af")
+
+LANGUAGE_ID_CACHE_SIZE = int(os.environ.get("CLASSIC_WEBSITE_LANGUAGE_ID_CACHE_SIZE") or 10000)
+
+
+class LanguageIdentifier:
+    def __init__(self, languages=None, seed=0, maxsize=None):
+        self.languages = tuple(languages or LANGUAGES)
+        self.seed = seed
+        self.maxsize = maxsize or LANGUAGE_ID_CACHE_SIZE
+        self._factory = None
+        self._items = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def factory(self):
+        if self._factory is None:
+            with self._lock:
+                if self._factory is None:
+                    self._factory = self._load_factory()
+        return self._factory
+
+    def _load_factory(self):
+        factory = DetectorFactory()
+        for index, lang in enumerate(self.languages):
+            with open(os.path.join(PROFILES_DIRECTORY, lang), encoding="utf-8") as fp:
+                profile = LangProfile(**json.load(fp))
+            factory.add_profile(profile, index, len(self.languages))
+        factory.set_seed(self.seed)
+        return factory
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items)}
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def detect(self, text):
+        """
+        Retorna o código do idioma de `text` ou None
+        """
+        if not text or not text.strip():
+            return None
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        with self._lock:
+            try:
+                lang = self._items[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                return lang
+
+        lang = self._detect(text)
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                self._items.pop(next(iter(self._items)))
+            self._items[key] = lang
+        return lang
+
+    def detect_many(self, texts):
+        """
+        Retorna a lista dos códigos de idioma (ou None) de `texts`
+        """
+        results = {}
+        for text in texts:
+            if text not in results:
+                results[text] = self.detect(text)
+        return [results[text] for text in texts]
+
+    def _detect(self, text):
+        detector = self.factory.create()
+        detector.append(text)
+        try:
+            lang = detector.detect()
+        except LangDetectException:
+            return None
+        if lang == Detector.UNKNOWN_LANG:
+            return None
+        return lang
+
+
+# instância compartilhada (perfis carregados no primeiro uso)
+LANGUAGE_ID = LanguageIdentifier()
+
+
+def detect_language(text):
+    return LANGUAGE_ID.detect(text)
@@ -0,0 +1,250 @@
+"""
+Instrumentação das pipes (plumber) da geração do XML.
+
+Registra, por documento, etapa e pipe: número de chamadas, tempo (wall e CPU),
+variação do número de nós da árvore (opcional, `count_nodes`), número de
+exceções e número de percursos da árvore feitos pelo `tag_dispatcher`.
+
+Quando desabilitado não há custo: `plumber.Filter.__iter__` somente é
+substituído enquanto o profiler está habilitado.
+
+>>> with PIPE_PROFILER:
+...     document.generate_body_and_back_from_html()
+>>> PIPE_PROFILER.to_json("/tmp/pipes.json")
+>>> PIPE_PROFILER.to_flamegraph("/tmp/pipes.folded")
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import plumber
+from lxml import etree
+
+from scielo_classic_website.spsxml.xml_snapshots import get_document_name
+
+FIELDS = ("calls", "wall", "cpu", "self_wall", "nodes_delta", "exceptions", "traversals")
+
+
+class PipeProfiler:
+    """
+    count_nodes : bool
+        registra a variação do número de nós (percorre a árvore antes e
+        depois de cada pipe); o tempo da contagem não entra nos tempos
+    """
+
+    def __init__(self, count_nodes=False):
+        self.count_nodes = count_nodes
+        self.enabled = False
+        self.records = {}
+        self._original_iter = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.disable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self._original_iter = plumber.Filter.__iter__
+        profiler = self
+
+        def __iter__(pipe):
+            for data in getattr(pipe, "_iterable_data", []):
+                yield profiler.transform(pipe, data)
+
+        plumber.Filter.__iter__ = __iter__
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        plumber.Filter.__iter__ = self._original_iter
+        self._original_iter = None
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.records = {}
+
+    @property
+    def _labels(self):
+        try:
+            return self._local.labels
+        except AttributeError:
+            self._local.labels = {"document": None, "step": None}
+            self._local.stack = []
+            return self._local.labels
+
+    @contextmanager
+    def context(self, **labels):
+        """Define document e/ou step para as pipes executadas no contexto"""
+        current = self._labels
+        previous = dict(current)
+        current.update(labels)
+        try:
+            yield
+        finally:
+            current.clear()
+            current.update(previous)
+
+    def transform(self, pipe, data):
+        labels = self._labels
+        stack = self._local.stack
+        name = type(pipe).__name__
+        # nome, tempo das pipes internas e tempos (wall, CPU) da contagem
+        # de nós feita para as pipes internas
+        frame = [name, 0.0, 0.0, 0.0]
+        stack.append(frame)
+
+        counting = [0.0, 0.0]
+        nodes = self.count_nodes and self._count_nodes(data, counting)
+        exception = 0
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            result = pipe.transform(data)
+        except Exception:
+            exception = 1
+            raise
+        finally:
+            # a contagem de nós das pipes internas não é tempo da pipe
+            wall = time.perf_counter() - start - frame[2]
+            cpu = time.process_time() - cpu - frame[3]
+            stack.pop()
+            delta = 0
+            if nodes and not exception:
+                after = self._count_nodes(result, counting)
+                if after:
+                    delta = after - nodes
+            if stack:
+                stack[-1][1] += wall
+                stack[-1][2] += frame[2] + counting[0]
+                stack[-1][3] += frame[3] + counting[1]
+            key = (
+                labels["document"],
+                labels["step"],
+                ";".join(item[0] for item in stack + [frame]),
+            )
+            self._add(key, (1, wall, cpu, wall - frame[1], delta, exception, 0))
+        return result
+
+    def _count_nodes(self, data, counting):
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            return _count_nodes(data)
+        finally:
+            counting[0] += time.perf_counter() - start
+            counting[1] += time.process_time() - cpu
+
+    def add_traversal(self):
+        """Registra um percurso completo da árvore pela pipe corrente"""
+        labels = self._labels
+        key = (
+            labels["document"],
+            labels["step"],
+            ";".join(item[0] for item in self._local.stack),
+        )
+        self._add(key, (0, 0.0, 0.0, 0.0, 0, 0, 1))
+
+    def _add(self, key, values):
+        with self._lock:
+            record = self.records.get(key)
+            if record is None:
+                self.records[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    record[i] += value
+
+    @property
+    def stats(self):
+        """
+        Lista de dict com document, step, pipe (caminho das pipes aninhadas
+        separado por ";") e os valores de FIELDS
+        """
+        with self._lock:
+            items = list(self.records.items())
+        return [
+            {"document": document, "step": step, "pipe": pipe, **dict(zip(FIELDS, values))}
+            for (document, step, pipe), values in items
+        ]
+
+    def merge(self, stats):
+        """Agrega `stats` (de outro processo, por exemplo) aos registros"""
+        for item in stats:
+            key = (item["document"], item["step"], item["pipe"])
+            self._add(key, [item.get(field, 0) for field in FIELDS])
+
+    def summary(self, group_by=("step", "pipe")):
+        """
+        Agrega os registros pelos campos `group_by`, ordenados pelo tempo
+        (decrescente)
+        """
+        groups = {}
+        for item in self.stats:
+            key = tuple(item[name] for name in group_by)
+            group = groups.setdefault(key, dict(zip(group_by, key), **dict.fromkeys(FIELDS, 0)))
+            for field in FIELDS:
+                group[field] += item[field]
+        return sorted(groups.values(), key=lambda item: item["self_wall"], reverse=True)
+
+    def to_json(self, file_path=None):
+        content = json.dumps(self.stats, indent=2)
+        if file_path:
+            with open(file_path, "w") as fp:
+                fp.write(content)
+        return content
+
+    def to_flamegraph(self, file_path=None):
+        """
+        Formato "collapsed stacks" (flamegraph.pl, speedscope),
+        com o tempo próprio de cada pipe em microssegundos
+        """
+        lines = []
+        for item in self.stats:
+            frames = [item["document"] or "-", item["step"] or "-", item["pipe"]]
+            lines.append(f"{';'.join(frames)} {int(item['self_wall'] * 1000000)}")
+        content = "\n".join(lines)
+        if file_path:
+            with open(file_path, "w") as fp:
+                fp.write(content)
+        return content
+
+
+def _count_nodes(data):
+    try:
+        raw, xml = data
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(xml, etree._Element):
+        return None
+    return sum(1 for _ in xml.iter())
+
+
+# instância compartilhada; pode ser habilitada por
+# CLASSIC_WEBSITE_PIPE_PROFILER=1
+PIPE_PROFILER = PipeProfiler()
+if os.environ.get("CLASSIC_WEBSITE_PIPE_PROFILER"):
+    PIPE_PROFILER.enable()
+
+
+def profile_context(**labels):
+    """Contexto para identificar document / step; sem custo se desabilitado"""
+    if not PIPE_PROFILER.enabled:
+        return nullcontext()
+    return PIPE_PROFILER.context(**labels)
+
+
+def profile_document(document):
+    """Contexto que identifica o documento; sem custo se desabilitado"""
+    if not PIPE_PROFILER.enabled:
+        return nullcontext()
+    return PIPE_PROFILER.context(document=get_document_name(document))
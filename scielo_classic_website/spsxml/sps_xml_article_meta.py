@@ -11,6 +11,7 @@ from scielo_classic_website.spsxml.sps_xml_attributes import (
 )
 from scielo_classic_website.spsxml.sps_xml_utils import set_subject_text
 from scielo_classic_website.htmlbody.html_fixer import remove_tags
+from scielo_classic_website.spsxml.xpaths import XPATH
 
 
 def fix_html_text(html_text):
@@ -294,9 +295,9 @@ class XMLArticleMetaAuthorNotesPipe(plumber.Pipe):
         raw, xml = data
         
         # Encontra elementos corresp em back
-        corresp_elements = xml.xpath(".//corresp")
+        corresp_elements = XPATH(xml, ".//corresp")
         if not corresp_elements:
-            emails = xml.xpath(".//email")
+            emails = XPATH(xml, ".//email")
             if not emails:
                 return data
             corresp = ET.Element("corresp")
@@ -304,7 +305,7 @@ class XMLArticleMetaAuthorNotesPipe(plumber.Pipe):
                 corresp.append(item)
             corresp_elements = [corresp]
 
-        author_notes = xml.xpath(".//author-notes")
+        author_notes = XPATH(xml, ".//author-notes")
         if not author_notes:
             author_notes = ET.Element("author-notes")
         
@@ -8,7 +8,7 @@ import re
 import plumber
 from lxml import etree as ET
 
-from scielo_classic_website.htmlbody.html_body import html_to_node
+from scielo_classic_website.htmlbody.html_body import html_to_node, html_to_nodes
 from scielo_classic_website.spsxml.detector import (
     analyze_xref,
     detect_from_text,
@@ -23,6 +23,14 @@ from scielo_classic_website.htmlbody.html_merger import (
 from scielo_classic_website.spsxml.detector_config_xref import (
     ASSET_TYPE_CONFIG,
 )
+from scielo_classic_website.spsxml.id_index import IdIndex
+from scielo_classic_website.spsxml.pipe_profiler import profile_context
+from scielo_classic_website.spsxml.tag_dispatcher import NodeVisitorPipe, TagDispatcherPipe
+from scielo_classic_website.spsxml.xml_snapshots import XMLSnapshots
+from scielo_classic_website.spsxml.xpaths import XPATH
+
+
+LOCAL_FILE_PATTERN = re.compile(r".*/([a-zA-Z]+)/[^/]*\.[^/]+(?:#.*)?$")
 
 
 class XMLBodyAnBackConvertException(Exception): ...
@@ -40,7 +48,7 @@ def is_last_item_in_parent(node):
 def wrap_elements(root, xpath, stop_tag, excluding_tags=None):
     excluding_tags = excluding_tags or set()
     wrap_item = None
-    for item in list(root.xpath(xpath or "*")):
+    for item in list(XPATH(root, xpath or "*")):
         if item.tag in excluding_tags:
             continue
 
@@ -58,7 +66,7 @@ def wrap_elements(root, xpath, stop_tag, excluding_tags=None):
             wrap_item = new_tag
             continue
 
-        if item.xpath(f".//{stop_tag}"):
+        if XPATH(item, f".//{stop_tag}"):
             item.tag = stop_tag
             wrap_item = item                
             continue
@@ -73,7 +81,7 @@ def wrap_elements(root, xpath, stop_tag, excluding_tags=None):
 def delete_tags(root):
     if root is None:
         return
-    for node in root.xpath(f"//*[@delete]"):
+    for node in XPATH(root, "//*[@delete]"):
         parent = node.getparent()
         node.addnext(ET.Element("EMPTYTAGTOSTRIP"))
         parent.remove(node)
@@ -114,9 +122,18 @@ def has_next_text(br):
     return False
 
 
-def convert_html_to_xml(document):
+def convert_html_to_xml(document, snapshots=None, retention=None):
     """
     document está em scielo_classic_website.models.document.Document.
+
+    Parameters
+    ----------
+    snapshots : iterable of str
+        nomes das etapas cujo resultado intermediário deve ser guardado
+        em `document.xml_body_and_back`, independentemente de `retention`
+    retention : str
+        política de retenção dos resultados das etapas
+        (last, failures, all, spill), ver `xml_snapshots`
     """
     calls = (
         convert_html_to_xml_step_10_insert_html_in_cdata,
@@ -130,14 +147,30 @@ def convert_html_to_xml(document):
         # convert_html_to_xml_step_90_complete_disp_formula,
         convert_html_to_xml_step_95_fix_body,
     )
-    document.xml_body_and_back = []
-    for i, call_ in enumerate(calls, start=1):
-        try:
-            document.xml_body_and_back.append(call_(document))
-        except Exception as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            action = f"Convert HTML to XML - step {i} failed {call_.__name__}"
-            document.add_exception(action, str(type(e)), traceback.format_exc())
+    snapshots = set(snapshots or [])
+    recorder = XMLSnapshots(document, retention)
+    try:
+        for i, call_ in enumerate(calls, start=1):
+            try:
+                with profile_context(step=call_.__name__):
+                    xml = call_(document)
+                recorder.add(call_.__name__, xml, keep=call_.__name__ in snapshots)
+            except Exception as e:
+                exc_type, exc_value, exc_traceback = sys.exc_info()
+                action = f"Convert HTML to XML - step {i} failed {call_.__name__}"
+                document.add_exception(action, str(type(e)), traceback.format_exc())
+                recorder.failed(call_.__name__)
+    finally:
+        recorder.close()
+
+
+def _tostring(xml, pretty_print=False):
+    return ET.tostring(
+        xml,
+        encoding="utf-8",
+        method="xml",
+        pretty_print=pretty_print,
+    ).decode("utf-8")
 
 
 def convert_html_to_xml_step_10_insert_html_in_cdata(document):
@@ -261,11 +294,13 @@ def convert_html_to_xml_step_40_basic_html_to_xml(document):
         StartPipe(),
         XMLNormalizeSpacePipe(),
         RemoveCommentPipe(),
-        FontSymbolPipe(),
-        RenameElementsPipe(),
-        OlPipe(),
-        UlPipe(),
-        TagsHPipe(),
+        TagDispatcherPipe(
+            FontSymbolPipe(),
+            RenameElementsPipe(),
+            OlPipe(),
+            UlPipe(),
+            TagsHPipe(),
+        ),
         XMLBodyCenterPipe(),
         CreateStyleTagFromAttributePipe(),
         SizeAttributePipe(),
@@ -329,8 +364,10 @@ def convert_html_to_xml_step_60_ahref_and_aname(document):
     """
     ppl = plumber.Pipeline(
         StartPipe(),
-        ASourcePipe(),
-        ImgSrcPipe(),
+        TagDispatcherPipe(
+            ASourcePipe(),
+            ImgSrcPipe(),
+        ),
         AHrefPipe(),
         XRefAssetTypeImagePipe(),
         XRefAssetOtherTypesPipe(),
@@ -449,13 +486,13 @@ def convert_html_to_xml_step_95_fix_body(document):
 
 
 def _process(xml, tag, func):
-    nodes = xml.xpath(".//%s" % tag)
+    nodes = XPATH(xml, ".//%s" % tag)
     for node in nodes:
         func(node)
 
 
 def _process_with_params(xml, tag, func, params):
-    nodes = xml.xpath(".//%s" % tag)
+    nodes = XPATH(xml, ".//%s" % tag)
     for node in nodes:
         func(node, xml, params)
 
@@ -500,15 +537,7 @@ class SetupPipe(plumber.Pipe):
 class EndPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
-
-        data = ET.tostring(
-            xml,
-            encoding="utf-8",
-            method="xml",
-            pretty_print=raw.pretty_print,
-        ).decode("utf-8")
-
-        return data
+        return _tostring(xml, raw.pretty_print)
 
 
 class MainHTMLPipe(plumber.Pipe):
@@ -568,10 +597,11 @@ class MainHTMLPipe(plumber.Pipe):
                 xml.find(".").append(back)
             back.insert(0, ref_list_node)
 
-        for item in xml.xpath(".//temp[@type='mixed-citation']"):
+        items = XPATH(xml, ".//temp[@type='mixed-citation']")
+        new_nodes = html_to_nodes("mixed-citation", [item.text for item in items])
+        for item, new_node in zip(items, new_nodes):
             parent = item.getparent()
-            new_node = html_to_node("mixed-citation", item.text)
-            for child in new_node.xpath(".//*"):
+            for child in XPATH(new_node, ".//*"):
                 if child.tag in ("sup", "sub", "italic", "bold", "ext-link", "xref"):
                     continue
                 child.tag = "STRIPTAG"
@@ -579,7 +609,7 @@ class MainHTMLPipe(plumber.Pipe):
             parent.replace(item, new_node)
         
         remove_items = []
-        for item in xml.xpath(".//ref"):
+        for item in XPATH(xml, ".//ref"):
             mixed_citation = item.find(".//mixed-citation")
             if mixed_citation is None:
                 remove_items.append(item)
@@ -616,7 +646,7 @@ class TranslatedHTMLPipe(plumber.Pipe):
 
         article = xml.find(".")
         idx = 0
-        for sub_article in xml.xpath(".//sub-article"):
+        for sub_article in XPATH(xml, ".//sub-article"):
 
             # O CDATA evita que o seu conteúdo seja "parseado" e, assim não
             # acusará erro de má formação do XML. O conteúdo do CDATA será
@@ -637,7 +667,7 @@ class TranslatedHTMLPipe(plumber.Pipe):
                 except KeyError:
                     pass
 
-        for item in xml.xpath(".//temp[@type]"):
+        for item in XPATH(xml, ".//temp[@type]"):
             parent = item.getparent()
             parent.remove(item)
 
@@ -676,7 +706,7 @@ class RemoveCommentPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        comments = xml.xpath("//comment()")
+        comments = XPATH(xml, "//comment()")
         for comment in comments:
             parent = comment.getparent()
             if parent is not None:
@@ -701,7 +731,7 @@ class RemoveHTMLTagsPipe(plumber.Pipe):
 # Rename
 
 
-class RenameElementsPipe(plumber.Pipe):
+class RenameElementsPipe(NodeVisitorPipe):
     from_to = (
         ("dir", "ul"),
         ("dl", "def-list"),
@@ -713,28 +743,19 @@ class RenameElementsPipe(plumber.Pipe):
         ("em", "bold"),
         ("i", "italic"),
     )
+    tags = dict(from_to)
 
-    def transform(self, data):
-        raw, xml = data
+    def visit(self, node):
+        node.tag = self.tags[node.tag]
 
-        for old, new in self.from_to:
-            xpath = f".//{old}"
-            for node in xml.findall(xpath):
-                node.tag = new
-        _report(xml, func_name=type(self))
-        return data
 
+class FontSymbolPipe(NodeVisitorPipe):
+    tags = ("font",)
 
-class FontSymbolPipe(plumber.Pipe):
-    def transform(self, data):
-        raw, xml = data
-        xpath = f".//font"
-        for node in xml.xpath(xpath):
-            face = node.get("face")
-            if face and "SYMBOL" in face.upper():
-                node.tag = "font-face-symbol"
-        _report(xml, func_name=type(self))
-        return data
+    def visit(self, node):
+        face = node.get("face")
+        if face and "SYMBOL" in face.upper():
+            node.tag = "font-face-symbol"
 
 
 class CreateStyleTagFromAttributePipe(plumber.Pipe):
@@ -744,7 +765,7 @@ class CreateStyleTagFromAttributePipe(plumber.Pipe):
         return data
     
     def fix_style_tags(self, xml):
-        for node in xml.xpath(".//*[@style]"):
+        for node in XPATH(xml, ".//*[@style]"):
             self.fix_style_tag(node, self.match_style(node))
         ET.strip_tags(xml, "striptag")
     
@@ -787,13 +808,13 @@ class SizeAttributePipe(plumber.Pipe):
         max_size = self.find_max_size(xml)
         logging.info(f"Max font size found: {max_size}")
 
-        fonts = list(xml.xpath(".//font[@size]"))
+        fonts = list(XPATH(xml, ".//font[@size]"))
         logging.info(f"Total font size found - before marking irrelevant: {len(fonts)}")
         for node in fonts:
             self.mark_irrelevant_font_size(node, max_size)
         ET.strip_tags(xml, "striptag")
 
-        fonts = list(xml.xpath(".//font[@size]"))
+        fonts = list(XPATH(xml, ".//font[@size]"))
         logging.info(f"Total font size found - after marking irrelevant: {len(fonts)}")
         for node in fonts:
             self.change_size_to_title(node)
@@ -801,7 +822,7 @@ class SizeAttributePipe(plumber.Pipe):
 
     def find_max_size(self, xml):
         max_size = 0
-        for node in list(xml.xpath(".//font[@size]")):
+        for node in list(XPATH(xml, ".//font[@size]")):
             size = node.get("size")
             if size[0] == "-":
                 node.attrib.pop("size")
@@ -820,7 +841,7 @@ class SizeAttributePipe(plumber.Pipe):
         return max_size
 
     def mark_irrelevant_font_size(self, node, max_size):
-        text = "".join(node.xpath(".//text()")).strip()
+        text = "".join(XPATH(node, ".//text()")).strip()
         if not text:
             # nao tem conteudo relevante
             node.tag = "striptag"
@@ -846,7 +867,7 @@ class SizeAttributePipe(plumber.Pipe):
             return
         if first_child.tail and first_child.tail.strip():
             return
-        bold = node.xpath(".//bold")
+        bold = XPATH(node, ".//bold")
         if not bold:
             node.tag = "title"
 
@@ -856,78 +877,82 @@ class StylePipe(plumber.Pipe):
         raw, xml = data
         for style in ("bold", "italic", "sup", "sub", "underline"):
             xpath = f".//span[@name='style_{style}']"
-            for node in xml.xpath(xpath):
+            for node in XPATH(xml, xpath):
                 node.tag = style
                 node.attrib.pop("name")
         _report(xml, func_name=type(self))
         return data
 
 
-class OlPipe(plumber.Pipe):
+class ListPipe(NodeVisitorPipe):
+    """
+    Converte `list_tag` em list e os seus filhos com texto em list-item.
+
+    A conversão dos filhos é feita quando cada filho é visitado,
+    para que a pipe possa ser executada por TagDispatcherPipe
+    """
+
+    list_tag = None
+
+    def start(self):
+        self._lists = set()
+
+    def match(self, node):
+        return node.tag == self.list_tag or node.getparent() in self._lists
+
+    def visit(self, node):
+        is_list = node.tag == self.list_tag
+        if node.getparent() in self._lists:
+            text = "".join(node.itertext()).strip()
+            if text:
+                node.tag = "list-item"
+        if is_list:
+            self.parser_node(node)
+            self._lists.add(node)
+
+    def parser_node(self, node):
+        raise NotImplementedError
+
+
+class OlPipe(ListPipe):
+    list_tag = "ol"
+
     def parser_node(self, node):
         node.tag = "list"
         node.set("list-type", "order")
-        for item in node.getchildren():
-            text = "".join(item.itertext()).strip()
-            if not text:
-                continue
-            item.tag = "list-item"
 
-    def transform(self, data):
-        raw, xml = data
-        _process(xml, "ol", self.parser_node)
-        _report(xml, func_name=type(self))
-        return data
 
+class UlPipe(ListPipe):
+    list_tag = "ul"
 
-class UlPipe(plumber.Pipe):
     def parser_node(self, node):
         node.tag = "list"
         node.set("list-type", "bullet")
         node.attrib.pop("list", None)
 
-        for item in node.getchildren():
-            text = "".join(item.itertext()).strip()
-            if not text:
-                continue
-            item.tag = "list-item"
 
-    def transform(self, data):
-        raw, xml = data
-        _process(xml, "ul", self.parser_node)
-        _report(xml, func_name=type(self))
-        return data
+class TagsHPipe(NodeVisitorPipe):
+    tags = ("h1", "h2", "h3", "h4", "h5", "h6")
 
-
-class TagsHPipe(plumber.Pipe):
-    def parser_node(self, node):
+    def visit(self, node):
         node.attrib.clear()
         org_tag = node.tag
         node.tag = "title"
         node.set("content-type", org_tag)
 
-    def transform(self, data):
-        raw, xml = data
-        tags = ["h1", "h2", "h3", "h4", "h5", "h6"]
-        for tag in tags:
-            _process(xml, tag, self.parser_node)
-        _report(xml, func_name=type(self))
-        return data
 
+class ASourcePipe(NodeVisitorPipe):
+    tags = ("a",)
+
+    def match(self, node):
+        return node.tag == "a" and node.get("src") is not None
 
-class ASourcePipe(plumber.Pipe):
-    def _change_src_to_href(self, node):
+    def visit(self, node):
         href = node.attrib.get("href")
         src = node.attrib.get("src")
         if not href and src:
             node.attrib["href"] = node.attrib.pop("src")
 
-    def transform(self, data):
-        raw, xml = data
-        _process(xml, "a[@src]", self._change_src_to_href)
-        _report(xml, func_name=type(self))
-        return data
-
 
 ##############################################################################
 
@@ -986,8 +1011,7 @@ class AHrefPipe(plumber.Pipe):
             return False
 
         # Verifica padrão /acrônimo/ no caminho
-        pattern = r".*/([a-zA-Z]+)/[^/]*\.[^/]+(?:#.*)?$"
-        return bool(re.search(pattern, normalized_href))
+        return bool(LOCAL_FILE_PATTERN.search(normalized_href))
 
     def _create_ext_link(self, node, extlinktype="uri"):
         node.tag = "ext-link"
@@ -1007,7 +1031,7 @@ class AHrefPipe(plumber.Pipe):
                 node.text = text
                 return
 
-        texts = " ".join(node.xpath(".//text()")).strip()
+        texts = " ".join(XPATH(node, ".//text()")).strip()
         for text in texts.split():
             if "@" in text:
                 node.text = text
@@ -1059,7 +1083,7 @@ class AHrefPipe(plumber.Pipe):
         href = self.sanitize_href(node)
         if not href:
             return
-        text = " ".join(node.xpath(".//text()")).strip()
+        text = " ".join(XPATH(node, ".//text()")).strip()
         if ("mailto" in href) or ("@" in href) or (text and "@" in text):
             # email
             return self._create_email(node)
@@ -1109,11 +1133,11 @@ class AHrefPipe(plumber.Pipe):
         raw, xml = data
         journal_acron = raw.journal and raw.journal.acronym
         journal_acron_folder = f"/{journal_acron}/" if journal_acron else ""
-        for context in xml.xpath(".//body|.//ref-list"):
-            for a_href_node in context.xpath(".//a[@href]"):
+        for context in XPATH(xml, ".//body|.//ref-list"):
+            for a_href_node in XPATH(context, ".//a[@href]"):
                 self.parser_node(a_href_node, journal_acron, journal_acron_folder, context)
-        for context in xml.xpath(".//back"):
-            for a_href_node in context.xpath(".//a[@href]"):
+        for context in XPATH(xml, ".//back"):
+            for a_href_node in XPATH(context, ".//a[@href]"):
                 self.parser_node(a_href_node, journal_acron, journal_acron_folder, context)
         ET.strip_tags(xml, "STRIPTAG")
         delete_tags(xml)
@@ -1129,27 +1153,23 @@ class ANamePipe(plumber.Pipe):
     """
 
     def remove_top_and_back(self, root):
-        for node in root.xpath(".//a[@name]"):
+        for node in XPATH(root, ".//a[@name]"):
             name = node.get("name")
             if name.startswith("top") or name.startswith("back"):
                 node.tag = "STRIPTAG"
         ET.strip_tags(root, "STRIPTAG")
 
-    def remove_multiplicity(self, root):
-        items = []
-        for node in root.xpath(".//a[@name]"):
-            name = node.get("name")
-            if name in items:
-                node.set("delete", "true")
-            else:
-                items.append(name)
+    def remove_multiplicity(self, root, index=None):
+        index = index or IdIndex(root)
+        for node in index.duplicated("name", tag="a"):
+            node.set("delete", "true")
         delete_tags(root)
 
     def transform(self, data):
         raw, xml = data
         self.remove_top_and_back(xml)
         self.remove_multiplicity(xml)
-        for node in xml.xpath(".//a[@name]"):
+        for node in XPATH(xml, ".//a[@name]"):
             name = node.attrib.pop("name")
             ref_type, elem = detect_from_id(name)
             node.tag = elem or "element"
@@ -1157,19 +1177,18 @@ class ANamePipe(plumber.Pipe):
         return data
 
 
-class ImgSrcPipe(plumber.Pipe):
-    def parser_node(self, node):
+class ImgSrcPipe(NodeVisitorPipe):
+    tags = ("img",)
+
+    def match(self, node):
+        return node.tag == "img" and node.get("src") is not None
+
+    def visit(self, node):
         node.tag = "graphic"
         href = node.attrib.pop("src")
         node.attrib.clear()
         node.set("{http://www.w3.org/1999/xlink}href", href)
 
-    def transform(self, data):
-        raw, xml = data
-        _process(xml, "img[@src]", self.parser_node)
-        _report(xml, func_name=type(self))
-        return data
-
 
 class XRefPipe(plumber.Pipe):
     """
@@ -1189,11 +1208,11 @@ class XRefPipe(plumber.Pipe):
 
     """
 
-    def add_reftype(self, node, xml):
+    def add_reftype(self, node, xml, index=None):
         rid = node.get("rid")
         if not rid:
             return
-        text = " ".join(node.xpath(".//text()")).strip()
+        text = " ".join(XPATH(node, ".//text()")).strip()
         if not text:
             return
         if "corresp" in rid.lower():
@@ -1204,19 +1223,22 @@ class XRefPipe(plumber.Pipe):
             node.set("ref-type", ref_type)
         element_name = result.get("element_name")
         if element_name:
-            for elem in xml.xpath(f".//*[@name='{rid}']"):
+            index = index or IdIndex(xml)
+            for elem in index.with_name(rid):
                 elem.tag = element_name
                 elem.set("id", rid)
                 elem.attrib.pop("name", None)
 
-    def handle_special_xref_reftypes(self, xml, ref_type):
-        xrefs = xml.xpath(f".//xref[@ref-type='{ref_type}']")
+    def handle_special_xref_reftypes(self, xml, ref_type, index=None):
+        xrefs = XPATH(xml, ".//xref[@ref-type=$ref_type]", ref_type=ref_type)
         if not xrefs:
             return
+        index = index or IdIndex(xml)
         for xref in xrefs:
-            self.discover_reftype_and_element_name(xml, xref)
+            self.discover_reftype_and_element_name(xml, xref, index)
 
-    def discover_reftype_and_element_name(self, xml, xref):
+    def discover_reftype_and_element_name(self, xml, xref, index=None):
+        index = index or IdIndex(xml)
         rid = xref.get("rid")
         node_ref_type = None
         if xref.get("ref-type") == "number":
@@ -1231,8 +1253,8 @@ class XRefPipe(plumber.Pipe):
                 (".//body", "aff", "aff"),
             )
         for xpath, tag, reftype in items:
-            for root in xml.xpath(xpath):
-                for elem in root.xpath(f".//*[@name='{rid}']"):
+            for root in XPATH(xml, xpath):
+                for elem in index.with_name(rid, context=root):
                     elem.tag = tag
                     elem.set("id", rid)
                     elem.attrib.pop("name", None)
@@ -1244,11 +1266,12 @@ class XRefPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for xref in xml.xpath(".//xref[not(@ref-type)]"):
-            self.add_reftype(xref, xml)
-        self.handle_special_xref_reftypes(xml, "number")
-        self.handle_special_xref_reftypes(xml, "symbol")
-        self.handle_special_xref_reftypes(xml, "letter")
+        index = IdIndex(xml)
+        for xref in XPATH(xml, ".//xref[not(@ref-type)]"):
+            self.add_reftype(xref, xml, index)
+        self.handle_special_xref_reftypes(xml, "number", index)
+        self.handle_special_xref_reftypes(xml, "symbol", index)
+        self.handle_special_xref_reftypes(xml, "letter", index)
         return data
 
 
@@ -1260,17 +1283,17 @@ class XRefAssetTypeImagePipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        if not xml.xpath(".//xref[@asset_type='image']"):
+        if not XPATH(xml, ".//xref[@asset_type='image']"):
             return data
         self.find_parents(xml)
-        parents = xml.xpath(".//*[@xref-parent='true']")
+        parents = XPATH(xml, ".//*[@xref-parent='true']")
         for xref_parent in parents:
             self.process_parent(raw, xml, xref_parent)
         _report(xml, func_name=type(self))
         return data
 
     def find_parents(self, xml):
-        for xref in xml.xpath(".//xref[@asset_type='image']"):
+        for xref in XPATH(xml, ".//xref[@asset_type='image']"):
             parent = xref.getparent()
             parent.set("xref-parent", "true")
 
@@ -1286,7 +1309,7 @@ class XRefAssetTypeImagePipe(plumber.Pipe):
             xref_parent.addnext(node)
 
     def _extract_xref_text(self, xref_element):
-        return " ".join(xref_element.xpath(".//text()")).strip()
+        return " ".join(XPATH(xref_element, ".//text()")).strip()
 
     def get_label_text_and_number_from_xref_text(self, xref_text, previous_label_text):
         # Tables 1-3
@@ -1310,7 +1333,7 @@ class XRefAssetTypeImagePipe(plumber.Pipe):
 
         # navega pelos xref dentro do xref_parent
         # trata casos como <xref>Table 1</xref> and <xref>2</xref>
-        for child in xref_parent.xpath("xref[@asset_type='image' and @path]"):
+        for child in XPATH(xref_parent, "xref[@asset_type='image' and @path]"):
             # guarda label_text anterior (Table)
             previous_label_text = label_text
             # Table 1
@@ -1345,10 +1368,8 @@ class XRefAssetTypeImagePipe(plumber.Pipe):
             # cria se não existir e completa os atributos
             path = child.get("path")
             rid = child.get("rid")
-            xpath = f"//*[@id='{rid}' or @name='{rid}']"
-
             try:
-                element = xml.xpath(xpath)[0]
+                element = XPATH(xml, "//*[@id=$rid or @name=$rid]", rid=rid)[0]
                 element.set("id", rid)
             except IndexError:
                 new_elem = ET.Element(element_name)
@@ -1401,7 +1422,7 @@ class BaseInsertGraphicInContainerPipe(plumber.Pipe):
         return " | ".join(f".//{tag}" for tag in self.target_tags)
 
     def _wrap_content(self, container):
-        if container.xpath(self.components_xpath):
+        if XPATH(container, self.components_xpath):
             # já tem o componente dentro do container, não precisa buscar
             return
         target = self._find_target(container)
@@ -1466,7 +1487,7 @@ class BaseInsertGraphicInContainerPipe(plumber.Pipe):
 
     def _find_in_descendants(self, element):
         """Busca primeiro target nos descendentes."""
-        found = element.xpath(self.components_xpath)
+        found = XPATH(element, self.components_xpath)
         return found[0] if found else None
 
 
@@ -1521,7 +1542,7 @@ class StripTagsPipe(plumber.Pipe):
     Ex: <p> </p>
     """
     def mark_span_spelle_to_strip(self, xml):
-        for item in list(xml.xpath(".//span[@class='SpellE']")):
+        for item in list(XPATH(xml, ".//span[@class='SpellE']")):
             item.tag = "TOSTRIP"
         ET.strip_tags(xml, "TOSTRIP")
 
@@ -1541,15 +1562,15 @@ class RemoveExcedingBreakTagPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
 
-        for parent in xml.xpath(".//p[break]"):
-            for item in parent.xpath("break"):
+        for parent in XPATH(xml, ".//p[break]"):
+            for item in XPATH(parent, "break"):
                 if not is_last_item_in_parent(item):
                     continue
                 item.tag = "REMOVE_EXCEDING_BREAK_TAG"
         ET.strip_tags(xml, "REMOVE_EXCEDING_BREAK_TAG")
 
-        for parent in xml.xpath(".//mixed-citation[break]"):
-            for item in parent.xpath("break"):
+        for parent in XPATH(xml, ".//mixed-citation[break]"):
+            for item in XPATH(parent, "break"):
                 item.tag = "REMOVE_EXCEDING_BREAK_TAG"
         ET.strip_tags(xml, "REMOVE_EXCEDING_BREAK_TAG")
         return data
@@ -1565,13 +1586,13 @@ class InlineGraphicPipe(plumber.Pipe):
     """
 
     def parser_node(self, node):
-        for graphic in node.xpath("graphic"):
+        for graphic in XPATH(node, "graphic"):
             if self.is_graphic_inline(graphic):
                 graphic.tag = "inline-graphic"
 
     def transform(self, data):
         raw, xml = data
-        for parent in xml.xpath(".//*[graphic]"):
+        for parent in XPATH(xml, ".//*[graphic]"):
             self.parser_node(parent)
         return data
 
@@ -1734,17 +1755,17 @@ class CompleteDispFormulaPipe(plumber.Pipe):
             logging.exception(e)
 
     def get_id(self, xml):
-        return len(xml.xpath(".//disp-formula")) + 1
+        return len(XPATH(xml, ".//disp-formula")) + 1
 
     def transform(self, data):
         raw, xml = data
 
-        for item in xml.xpath(".//*[graphic]"):
+        for item in XPATH(xml, ".//*[graphic]"):
             if item.tag != "p":
                 continue
             if len(item.getchildren()) > 1:
                 continue
-            texts = "".join(item.xpath(".//text()")).strip()
+            texts = "".join(XPATH(item, ".//text()")).strip()
             if texts:
                 continue
             disp_formula_id = f"e{self.get_id(xml)}"
@@ -1792,7 +1813,7 @@ class XRefAssetOtherTypesPipe(plumber.Pipe):
 
         processed = set()
 
-        for xref in xml.xpath(".//xref[@asset_type and @asset_type!='image' and @asset_type!='html']"):
+        for xref in XPATH(xml, ".//xref[@asset_type and @asset_type!='image' and @asset_type!='html']"):
             events = []
             path = xref.get("path")
             if not path:
@@ -1804,7 +1825,7 @@ class XRefAssetOtherTypesPipe(plumber.Pipe):
 
                 name, ext = self._extract_file_info(path)
                 events.append(f"Asset name: {name}, extension: {ext}")
-                text = "".join(xref.xpath(".//text()")).strip()
+                text = "".join(XPATH(xref, ".//text()")).strip()
                 events.append(f"Asset text: {text}")
 
                 xref.set("rid", name)
@@ -1838,7 +1859,13 @@ class MarkHTMLFileToEmbedPipe(plumber.Pipe):
     """
     Marca xrefs com ... que são arquivos HTML locais para serem embedados."""
 
-    def html_reader(self, path, encoding, journal_acron_folder):
+    @staticmethod
+    def html_reader(path, encoding, journal_acron_folder):
+        return path
+
+    @staticmethod
+    def html_signature(path, encoding, journal_acron_folder):
+        # o conteúdo lido por `html_reader` depende somente de `path`
         return path
 
     def transform(self, data):
@@ -1846,44 +1873,46 @@ class MarkHTMLFileToEmbedPipe(plumber.Pipe):
 
         try:
             html_reader = raw.html_reader
+            html_signature = getattr(raw, "html_signature", None)
         except AttributeError:
             # TODO implementar html_reader em raw
             html_reader = self.html_reader
+            html_signature = self.html_signature
+
+        try:
+            html_file_cache = raw.html_file_cache
+        except AttributeError:
+            html_file_cache = None
 
         journal_acron = raw.journal and raw.journal.acronym
         if not journal_acron:
             return data
         journal_acron_folder = f"/{journal_acron}/"
-        self.merge(journal_acron_folder, html_reader, xml)
+        self.merge(
+            journal_acron_folder, html_reader, xml, html_file_cache, html_signature
+        )
         return data
 
-    def merge(self, journal_acron_folder, html_reader, xml):
+    def merge(
+        self,
+        journal_acron_folder,
+        html_reader,
+        xml,
+        html_file_cache=None,
+        html_signature=None,
+    ):
+        # processa body e back na própria árvore, sem serializar e
+        # refazer o parsing
         try:
-            for body in xml.xpath(".//body"):
-                body_str = ET.tostring(body, encoding="iso-8859-1").decode("iso-8859-1")
-                input_html = f"<html>{body_str}</html>"
-                new_body = merge_html(
-                    input_html,
-                    journal_acron_folder=journal_acron_folder,
-                    encoding="iso-8859-1",
-                    content_reader=html_reader
-                )
-                parent = body.getparent()
-                parent.replace(body, new_body)
-            
-            for back in xml.xpath(".//back"):
-                back.tag = "body"
-                back_str = ET.tostring(back, encoding="iso-8859-1").decode("iso-8859-1")
-                input_html = f"<html>{back_str}</html>"
-                new_back = merge_html(
-                    input_html,
+            for node in XPATH(xml, ".//body|.//back"):
+                merge_html(
+                    node,
                     journal_acron_folder=journal_acron_folder,
                     encoding="iso-8859-1",
-                    content_reader=html_reader
+                    content_reader=html_reader,
+                    cache=html_file_cache,
+                    content_signature=html_signature,
                 )
-                new_back.tag = "back"
-                parent = back.getparent()
-                parent.replace(back, new_back)
         except Exception as e:
             logging.error(f"MarkHTMLFileToEmbedPipe - error processing html embedding: {e}")
             logging.exception(e)
@@ -1899,21 +1928,21 @@ class XMLBodyCenterPipe(plumber.Pipe):
     
     def transform(self, data):
         raw, xml = data
-        for item in xml.xpath(".//body|.//back"):
+        for item in XPATH(xml, ".//body|.//back"):
             self.rename_center(item)
         return data
 
     def rename_center(self, root):
         # Converte todos os elementos center para title
-        for center in root.xpath("center| *[@align='center']"):
+        for center in XPATH(root, "center| *[@align='center']"):
             previous = center.getprevious()
             if previous is not None:
                 if previous.tag == "a":
                     center.insert(0, previous)
-            if center.xpath(".//img|.//a[@href]"):
+            if XPATH(center, ".//img|.//a[@href]"):
                 center.tag = "p"
                 continue
-            text = "".join(center.xpath(".//text()")).strip()
+            text = "".join(XPATH(center, ".//text()")).strip()
             children = list(center.getchildren())
             if not children and not text:
                 center.tag = "STRIPTAG"
@@ -1933,21 +1962,21 @@ class XMLBoldToTitlePipe(plumber.Pipe):
         self.replace_bold_by_title(xml)
         self.strip_bold_from_bold_title(xml)
         self.strip_bold_from_title_bold(xml)
-        for title in xml.xpath(".//title[break]"):
-            for item in title.xpath("break"):
+        for title in XPATH(xml, ".//title[break]"):
+            for item in XPATH(title, "break"):
                 item.tag = "TAGTOSTRIP"
         ET.strip_tags(xml, "TAGTOSTRIP")
         return data
     
     def fix_bold_p(self, xml):
-        for node in xml.xpath(".//bold[p]"):
+        for node in XPATH(xml, ".//bold[p]"):
             children = list(node.getchildren())
             if len(children) == 1:
                 node.tag = "p"
                 children[0].tag = "bold"
             
     def join_bold_and_bold(self, xml):
-        for node in xml.xpath(".//bold[following-sibling::node()[1][self::bold]]"):
+        for node in XPATH(xml, ".//bold[following-sibling::node()[1][self::bold]]"):
             bold = node.getnext()
             if bold.text:
                 node.tail = (node.tail or "") + bold.text
@@ -1958,12 +1987,12 @@ class XMLBoldToTitlePipe(plumber.Pipe):
         ET.strip_tags(xml, "TAGTOSTRIP")
             
     def strip_bold_from_bold_title(self, xml):
-        for node in xml.xpath(".//bold[title]"):
+        for node in XPATH(xml, ".//bold[title]"):
             node.tag = "TAGTOSTRIP"
         ET.strip_tags(xml, "TAGTOSTRIP")
 
     def strip_bold_from_title_bold(self, xml):
-        for node in xml.xpath(".//title[bold]"):
+        for node in XPATH(xml, ".//title[bold]"):
             if len(node.getchildren()) == 0:
                 continue
             child = node.getchildren()[0]
@@ -1973,7 +2002,7 @@ class XMLBoldToTitlePipe(plumber.Pipe):
         ET.strip_tags(xml, "TAGTOSTRIP")
 
     def replace_bold_by_title(self, xml):
-        for node in list(xml.xpath(f".//*[bold]")):
+        for node in list(XPATH(xml, ".//*[bold]")):
             first_child = node.getchildren()[0]
             if first_child.tag != "bold":
                 continue
@@ -1993,16 +2022,16 @@ class XMLEmptyTagsPipe(plumber.Pipe):
         finished = False
         while not finished:
             self.identify_empty_tags(root)
-            if not root.xpath(".//TAGTOSTRIP"):
+            if not XPATH(root, ".//TAGTOSTRIP"):
                 finished = True
             ET.strip_tags(root, "TAGTOSTRIP")
 
     def identify_empty_tags(self, root):
         for tag in ("div", "p", "span",  "font", "italic", "bold", "sup", "sub", "b", "i"):
-            for node in root.xpath(f".//{tag}"):
+            for node in XPATH(root, f".//{tag}"):
                 if node.getchildren():
                     continue
-                text = "".join(node.xpath(".//text()")).strip()
+                text = "".join(XPATH(node, ".//text()")).strip()
                 if not text:
                     node.tag = "TAGTOSTRIP"
 
@@ -2011,8 +2040,8 @@ class XMLIdentifyTitleParentPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for root in xml.xpath(".//body|.//back"):
-            for parent_title in root.xpath(".//*[title]"):
+        for root in XPATH(xml, ".//body|.//back"):
+            for parent_title in XPATH(root, ".//*[title]"):
                 self.identify_title_parent(parent_title)
             ET.strip_tags(root, "TAGTOSTRIP")
         return data
@@ -2073,8 +2102,8 @@ class XMLSecPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for node in xml.xpath(".//body|.//back"):
-            if not node.xpath(".//sec"):
+        for node in XPATH(xml, ".//body|.//back"):
+            if not XPATH(node, ".//sec"):
                 continue
             self.wrap_secs(node)
             self.wrap_subsections(node)
@@ -2090,10 +2119,10 @@ class XMLSecPipe(plumber.Pipe):
             return
 
     def wrap_subsections(self, root):
-        for node in root.xpath(".//*[@parent-title-unknown='true']"):
+        for node in XPATH(root, ".//*[@parent-title-unknown='true']"):
             self.fix_parent_title_unknown(node)
 
-        for subsec in list(root.xpath(".//sec[not(@sec-type)]")):
+        for subsec in list(XPATH(root, ".//sec[not(@sec-type)]")):
             self.wrap_subsection_children(subsec)
 
     def wrap_subsection_children(self, sec):
@@ -2107,7 +2136,7 @@ class XMLSecPipe(plumber.Pipe):
             following = sec.getnext()
     
     def wrap_secs(self, root):
-        for child in list(root.xpath(".//sec[@sec-type]")):
+        for child in list(XPATH(root, ".//sec[@sec-type]")):
             self.wrap_sec_children(child)
 
     def wrap_sec_children(self, sec):
@@ -2124,13 +2153,13 @@ class XMLSecPipe(plumber.Pipe):
 class XMLFixBodySecHierarchyPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
-        for body in xml.xpath(".//body"):
+        for body in XPATH(xml, ".//body"):
             self.fix_sec_hierarchy(body)
         return data
     
     def fix_sec_hierarchy(self, body):
-        for node in list(body.xpath(".//sec")):
-            sec = node.xpath(".//sec[@sec-type]")
+        for node in list(XPATH(body, ".//sec")):
+            sec = XPATH(node, ".//sec[@sec-type]")
             if not sec:
                 continue
             node.tag = "tostrip"
@@ -2141,7 +2170,7 @@ class XMLStripFrontTextPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for body in xml.xpath(".//body"):
+        for body in XPATH(xml, ".//body"):
             self.save_elements(body)
             self.identify_body_beginning(body)
         return data
@@ -2166,7 +2195,7 @@ class XMLStripFrontTextPipe(plumber.Pipe):
             back.append(email)
 
     def strip_front_text_by_sec_intro(self, body):
-        intro = body.xpath("sec[@sec-type='intro']")
+        intro = XPATH(body, "sec[@sec-type='intro']")
         if not intro:
             return False
         intro = intro[0]
@@ -2185,14 +2214,14 @@ class ReferenceTitlePipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for body in xml.xpath(".//body"):
+        for body in XPATH(xml, ".//body"):
             self.complete_ref_list_title(body)
             break
         return data
 
     def complete_ref_list_title(self, body):
         try:
-            node = body.xpath(".//*[@ref-list-title='true']")[0]
+            node = XPATH(body, ".//*[@ref-list-title='true']")[0]
         except IndexError:
             return
         
@@ -2214,11 +2243,11 @@ class ReferenceTitlePipe(plumber.Pipe):
 class WrapFnPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
-        for root in xml.xpath(".//body|.//back"):
+        for root in XPATH(xml, ".//body|.//back"):
             self.wrap_fn(root)
         
-            for parent in root.xpath("*[fn]"):
-                fns = parent.xpath("fn")
+            for parent in XPATH(root, "*[fn]"):
+                fns = XPATH(parent, "fn")
                 if len(fns) > 1:
                     if parent.tag in ("p", "sec", "div"):
                         parent.tag = "fn-group"
@@ -2230,8 +2259,8 @@ class WrapFnPipe(plumber.Pipe):
         return data
 
     def wrap_fn(self, xml):
-        for node in xml.xpath(".//fn"):
-            if node.xpath("*"):
+        for node in XPATH(xml, ".//fn"):
+            if XPATH(node, "*"):
                 continue
             for sibling in list(node.itersiblings()):
                 if sibling.tag == "fn":
@@ -2248,7 +2277,7 @@ class RemoveDuplicatedTagSubtagPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for root in xml.xpath(".//body|.//back"):
+        for root in XPATH(xml, ".//body|.//back"):
             self.remove_duplicated_tag(root, "title")
             self.remove_duplicated_tag(root, "p")
             self.remove_duplicated_tag(root, "sec")
@@ -2257,7 +2286,7 @@ class RemoveDuplicatedTagSubtagPipe(plumber.Pipe):
     def remove_duplicated_tag(self, root, tag_name):
         while True:
             xpath = f".//{tag_name}[{tag_name}]"
-            for node in list(root.xpath(xpath)):
+            for node in list(XPATH(root, xpath)):
                 text = (node.text or "").strip()
                 if text:
                     continue
@@ -2270,7 +2299,7 @@ class RemoveDuplicatedTagSubtagPipe(plumber.Pipe):
                     # há tags diferentes entre os filhos
                     continue
                 node.tag = "TAGTOSTRIP"
-            if not root.xpath("//TAGTOSTRIP"):
+            if not XPATH(root, "//TAGTOSTRIP"):
                 break
             ET.strip_tags(root, "TAGTOSTRIP")
 
@@ -2279,21 +2308,21 @@ class FixParagraphAbsencePipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
 
-        for root in xml.xpath(".//body|.//back"):
-            p_nodes = root.xpath(".//p")
-            br_nodes = root.xpath(".//br|.//break")
-            font_nodes = root.xpath(".//font")
+        for root in XPATH(xml, ".//body|.//back"):
+            p_nodes = XPATH(root, ".//p")
+            br_nodes = XPATH(root, ".//br|.//break")
+            font_nodes = XPATH(root, ".//font")
             if font_nodes and len(br_nodes) >= len(p_nodes):
                 self.fix_p_absence(root)
         return data
     
     def remove_invalid_p_tags(self, root):
-        for p in list(root.xpath(".//p")):
-            text = "".join(p.xpath(".//text()")).strip()
+        for p in list(XPATH(root, ".//p")):
+            text = "".join(XPATH(p, ".//text()")).strip()
             if text:
                 continue
             strip = True
-            for child in p.xpath(".//*"):
+            for child in XPATH(p, ".//*"):
                 if child.tag in ("img", "a"):
                     continue
                 child.tag = "TAGTOSTRIP"
@@ -2310,7 +2339,7 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         self.strip_p_p(root)
 
     def corresp(self, root):
-        for aname in root.xpath(".//a[@name]"):
+        for aname in XPATH(root, ".//a[@name]"):
             if "corresp" not in aname.get("name", "").lower():
                 continue
             aname.tag = "corresp"
@@ -2322,8 +2351,8 @@ class FixParagraphAbsencePipe(plumber.Pipe):
                 aname.append(sibling)
     
     def fix_div(self, root):
-        for div in root.xpath("div"):
-            font = div.xpath(".//font|.//span")
+        for div in XPATH(root, "div"):
+            font = XPATH(div, ".//font|.//span")
             if font:
                 div.tag = "tostrip"
             else:
@@ -2331,11 +2360,11 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         ET.strip_tags(root, "tostrip")
     
     def change_font_to_p(self, root):
-        for child in root.xpath("font"):
+        for child in XPATH(root, "font"):
             child.tag = "p"
 
     def change_font_break_to_p(self, root):
-        children = list(root.xpath(".//font|.//span"))
+        children = list(XPATH(root, ".//font|.//span"))
         if not children:
             return
         for child in children:
@@ -2348,11 +2377,11 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         ET.strip_tags(root, "tostrip")
 
     def change_font_with_inner_break_to_p(self, root):
-        for child in list(root.xpath(".//font[break]|.//span[break]")):
+        for child in list(XPATH(root, ".//font[break]|.//span[break]")):
             parent = child.getparent()
             if parent.tag == "p":
                 continue
-            br_nodes = child.xpath("break")
+            br_nodes = XPATH(child, "break")
             if not br_nodes:
                 continue
             last_child = br_nodes[-1]
@@ -2363,7 +2392,7 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         ET.strip_tags(root, "tostrip")
 
     def strip_break_which_is_p_sibling(self, root):
-        for br in root.xpath(".//break"):
+        for br in XPATH(root, ".//break"):
             previous = br.getprevious()
             if previous is not None and previous.tag == "p":
                 br.tag = "tostrip"
@@ -2375,7 +2404,7 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         ET.strip_tags(root, "tostrip")
 
     def wrap_title_which_is_p_sibling(self, root):
-        for title in root.xpath(".//title"):
+        for title in XPATH(root, ".//title"):
             previous = title.getprevious()
             if previous is not None and previous.tag == "p":
                 self.wrap_title(title)
@@ -2391,7 +2420,7 @@ class FixParagraphAbsencePipe(plumber.Pipe):
         p.append(title)
 
     def strip_p_p(self, root):
-        for p in list(root.xpath(".//p[p]")):
+        for p in list(XPATH(root, ".//p[p]")):
             if p.text and p.text.strip():
                 continue
             strip = True
@@ -2471,19 +2500,19 @@ class MoveBoldPipe(plumber.Pipe):
         return data
 
     def mark_todo(self, xml):
-        for item in list(xml.xpath(".//bold[*]")):
+        for item in list(XPATH(xml, ".//bold[*]")):
             item.tag = "TODOTAG"
 
     def move_bold_tags(self, xml):
         while True:
-            bold_nodes = xml.xpath(".//TODOTAG")
+            bold_nodes = XPATH(xml, ".//TODOTAG")
             if not bold_nodes:
                 break
             self.move_bold_tag(bold_nodes[0])
 
     def move_bold_tag(self, bold):
         for child in list(bold.getchildren()):
-            text = "".join(child.xpath(".//text()")).strip()
+            text = "".join(XPATH(child, ".//text()")).strip()
             if not text:
                 continue
             if child.tag in ("italic", "sup", "sub", "xref"):
@@ -2499,12 +2528,12 @@ class POpenPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
         
-        for root in xml.xpath(".//body|.//back"):
+        for root in XPATH(xml, ".//body|.//back"):
             self.wrap(root)
         return data
 
     def wrap(self, root):
-        if not root.xpath("p[@type='open']"):
+        if not XPATH(root, "p[@type='open']"):
             return
         # wrap elements
         wrap_elements(
@@ -2517,16 +2546,16 @@ class POpenPipe(plumber.Pipe):
 class WrapElementsPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
-        for root in xml.xpath(".//div"):
+        for root in XPATH(xml, ".//div"):
             self.wrap_elements(root)
-        for root in xml.xpath(".//body"):
+        for root in XPATH(xml, ".//body"):
             self.wrap_elements(root)
-        for root in xml.xpath(".//back"):
+        for root in XPATH(xml, ".//back"):
             self.wrap_elements(root)
         return data
 
     def clean(self, root, tag):
-        for item in list(root.xpath(f".//{tag}")):
+        for item in list(XPATH(root, f".//{tag}")):
             if item.getchildren():
                 continue
             text = "".join(item.itertext()).strip()
@@ -2539,12 +2568,12 @@ class WrapElementsPipe(plumber.Pipe):
         self.clean(root, "span")
         self.clean(root, "font")
         
-        div = root.xpath("div")
+        div = XPATH(root, "div")
         if div:
             wrap_elements(root, xpath=None, stop_tag="div", excluding_tags={"ref-list"})
             return
         
-        p = root.xpath("p")
+        p = XPATH(root, "p")
         if p:
             wrap_elements(root, xpath=None, stop_tag="p", excluding_tags={"ref-list"})
             return
@@ -2559,12 +2588,12 @@ class DivPipe(plumber.Pipe):
         return data
 
     def convert_div_break_to_p(self, xml):
-        for node in list(xml.xpath(".//div[break]")):
+        for node in list(XPATH(xml, ".//div[break]")):
             if node.find("p") is None and node.find("div") is None:
                 node.tag = "p"
 
     def convert_div_title_to_sec(self, xml):
-        for node in list(xml.xpath(".//div[title]")):
+        for node in list(XPATH(xml, ".//div[title]")):
             children = list(node.getchildren())
             if not children:
                 continue
@@ -2574,7 +2603,7 @@ class DivPipe(plumber.Pipe):
             node.tag = "sec"
 
     def strip_left_div(self, xml):
-        for node in list(xml.xpath(".//div")):
+        for node in list(XPATH(xml, ".//div")):
             node.tag = "tostrip"
         ET.strip_tags(xml, "tostrip")
 
@@ -2583,12 +2612,12 @@ class AckPipe(plumber.Pipe):
 
     def transform(self, data):
         raw, xml = data
-        for ack_node in xml.xpath(".//ack"):
+        for ack_node in XPATH(xml, ".//ack"):
             self.process_ack_node(ack_node)
         return data
     
     def process_ack_node(self, ack_node):
-        if ack_node.xpath(".//p"):
+        if XPATH(ack_node, ".//p"):
             return
         next_node = ack_node.getnext()
         if next_node is not None and next_node.tag == "p":
@@ -2611,7 +2640,7 @@ class XMLWrapTitleTailPipe(plumber.Pipe):
         no XML
         """
         raw, xml = data
-        for title in xml.xpath(".//title"):
+        for title in XPATH(xml, ".//title"):
             self.wrap_title_tail(title)
         return data
     
@@ -2628,7 +2657,7 @@ class ExcludeMultipleBreaksPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
 
-        breaks = xml.xpath(".//br|.//break")
+        breaks = XPATH(xml, ".//br|.//break")
         if not breaks:
             return data
         
@@ -2648,7 +2677,7 @@ class ExcludeMultipleBreaksPipe(plumber.Pipe):
         br.set("tostrip", "true")
 
     def strip_tags(self, xml):
-        for node in xml.xpath(".//*[@tostrip='true']"):
+        for node in XPATH(xml, ".//*[@tostrip='true']"):
             node.tag = "TAGTOSTRIP"
         ET.strip_tags(xml, "TAGTOSTRIP")
 
@@ -2684,7 +2713,7 @@ class XMLNormalizeSpacePipe(plumber.Pipe):
         raw, xml = data
 
         # seleciona nós que tem text e/ou tail
-        for node in xml.xpath(".//*[following-sibling::text()] | .//*[text()]"):
+        for node in XPATH(xml, ".//*[following-sibling::text()] | .//*[text()]"):
             self.process_node_text(node)
             self.process_node_tail(node)
         return data
@@ -5,7 +5,6 @@ import re
 
 import plumber
 from lxml import etree as ET
-from langdetect import detect, DetectorFactory, LangDetectException
 
 from scielo_classic_website.spsxml.sps_xml_article_meta import (
     XMLArticleMetaAbstractsPipe,
@@ -37,24 +36,30 @@ from scielo_classic_website.spsxml.sps_xml_attributes import (
     get_article_type,
     country_name,
 )
+from scielo_classic_website.spsxml.id_index import IdIndex
+from scielo_classic_website.spsxml.language_id import LANGUAGE_ID
+from scielo_classic_website.spsxml.pipe_profiler import profile_context
 from scielo_classic_website.spsxml.sps_xml_refs import XMLArticleMetaCitationsPipe
 from scielo_classic_website.spsxml.sps_xml_utils import set_subject_text
+from scielo_classic_website.spsxml.xpaths import XPATH
 
 
 def get_node_text_language_code(node):
+    return LANGUAGE_ID.detect(get_node_text(node))
+
+
+def get_nodes_text_language_codes(nodes):
+    return LANGUAGE_ID.detect_many([get_node_text(node) for node in nodes])
+
+
+def get_node_text(node):
     texts = []
-    for text in node.xpath(".//text()"):  # Garantir que body não está vazio
+    for text in XPATH(node, ".//text()"):  # Garantir que body não está vazio
         if text.strip():
             texts.append(text.strip())
         if len(str(texts)) > 300:  # Limita a quantidade de texto para detecção
             break
-    text = " ".join(texts)
-    if not text:
-        return None
-    try:
-        return detect(text)
-    except LangDetectException:
-        return None
+    return " ".join(texts)
 
 
 def get_xml_rsps(document):
@@ -65,7 +70,8 @@ def get_xml_rsps(document):
     ----------
     document: dict
     """
-    return _process(document)
+    with profile_context(step="get_xml_rsps"):
+        return _process(document)
 
 
 def _process(document):
@@ -154,30 +160,18 @@ class SetupArticlePipe(plumber.Pipe):
 
 class XMLDeleteRepeatedElementWithId(plumber.Pipe):
     def fix_subarticle_id_and_rid(self, root):
-        subarticle_id = root.get("id")
-        items = []
-        for node in root.xpath(".//*[@id]"):
-            _id = node.get("id")
-            if not _id.startswith(subarticle_id):
-                new_id = f"{subarticle_id}{_id}"
-                node.set("id", new_id)
-                for xref in root.xpath(f".//xref[@rid='{_id}']"):
-                    xref.set("rid", new_id)
+        IdIndex(root).add_prefix(root.get("id"))
 
     def remove_multiplicity(self, root):
-        items = set()
-        for node in root.xpath(".//*[@id]"):
-            _id = node.get("id")
-            if _id in items:
-                elem = ET.Element("EMPTYTAGTOSTRIP")
-                node.addnext(elem)
-                parent = node.getparent()
-                parent.remove(node)
-            items.add(_id)
+        for node in IdIndex(root).duplicated("id"):
+            elem = ET.Element("EMPTYTAGTOSTRIP")
+            node.addnext(elem)
+            parent = node.getparent()
+            parent.remove(node)
 
     def transform(self, data):
         raw, xml = data
-        for subarticle in xml.xpath("sub-article[@article-type='translation']"):
+        for subarticle in XPATH(xml, "sub-article[@article-type='translation']"):
             self.fix_subarticle_id_and_rid(subarticle)
         self.remove_multiplicity(xml.find("."))
         ET.strip_tags(xml, "EMPTYTAGTOSTRIP")
@@ -190,13 +184,13 @@ class XMLDeleteRepeatedTranslations(plumber.Pipe):
 
         to_delete = []
         articlemeta_node = xml.find(".//article-meta")
-        for subarticle in xml.xpath(".//sub-article[@article-type='translation']"):
+        for subarticle in XPATH(xml, ".//sub-article[@article-type='translation']"):
 
             lang = subarticle.get("{http://www.w3.org/XML/1998/namespace}lang")
 
             namespaces = {"xml": "http://www.w3.org/XML/1998/namespace"}
-            nodes = articlemeta_node.xpath(
-                f".//*[@xml:lang='{lang}']", namespaces=namespaces
+            nodes = XPATH(
+                articlemeta_node, ".//*[@xml:lang=$lang]", namespaces=namespaces, lang=lang
             )
 
             for node in nodes:
@@ -476,7 +470,7 @@ class XMLStylePipe(plumber.Pipe):
         raw, xml = data
         for style in ("bold", "italic", "sup", "sub", "underline"):
             xpath = f".//span[@name='style_{style}']"
-            for node in xml.xpath(xpath):
+            for node in XPATH(xml, xpath):
                 node.tag = style
                 node.attrib.pop("name")
         return data
@@ -667,7 +661,7 @@ class XMLFontFaceSymbolPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
 
-        for node in xml.xpath(".//font-face-symbol"):
+        for node in XPATH(xml, ".//font-face-symbol"):
             item = self.FONTFACESYMBOL.get(node.text)
             if item:
                 node.text = item["char"]
@@ -693,13 +687,14 @@ class XMLSupToXrefPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
 
-        self.transform_sup_to_xref(xml)
-        self.complete_xref_reftype(xml)
+        index = IdIndex(xml)
+        self.transform_sup_to_xref(xml, index)
+        self.complete_xref_reftype(xml, index)
          
         return data
 
-    def complete_xref_reftype(self, xml):
-        xref_numbers = xml.xpath(".//xref[@ref-type='number']")
+    def complete_xref_reftype(self, xml, index=None):
+        xref_numbers = XPATH(xml, ".//xref[@ref-type='number']")
         if not xref_numbers:
             return
         
@@ -711,12 +706,12 @@ class XMLSupToXrefPipe(plumber.Pipe):
         if not numbers:
             return
 
-        ids, numeric_labels = self.get_ids_and_labels(xml, "ref", "mixed-citation")
+        ids, numeric_labels = self.get_ids_and_labels(xml, "ref", "mixed-citation", index=index)
         done = self._complete_xref_reftype(xref_numbers, numbers, ids, numeric_labels, "bibr")
         if done:
             return
 
-        ids, numeric_labels = self.get_ids_and_labels(xml, "fn")
+        ids, numeric_labels = self.get_ids_and_labels(xml, "fn", index=index)
         done = self._complete_xref_reftype(xref_numbers, numbers, ids, numeric_labels, "fn")
         if done:
             return
@@ -735,8 +730,8 @@ class XMLSupToXrefPipe(plumber.Pipe):
             total += 1
         return total
 
-    def transform_sup_to_xref(self, xml):
-        sups = xml.xpath(".//sup")
+    def transform_sup_to_xref(self, xml, index=None):
+        sups = XPATH(xml, ".//sup")
         if not sups:
             return
         
@@ -753,20 +748,24 @@ class XMLSupToXrefPipe(plumber.Pipe):
         if not numbers:
             return
 
-        ids, numeric_labels = self.get_ids_and_labels(xml, "ref", "mixed-citation")
+        ids, numeric_labels = self.get_ids_and_labels(xml, "ref", "mixed-citation", index=index)
         done = self._convert_sup_to_xref(sups, numbers, ids, numeric_labels, "bibr")
         if done:
             return
 
-        ids, numeric_labels = self.get_ids_and_labels(xml, "fn")
+        ids, numeric_labels = self.get_ids_and_labels(xml, "fn", index=index)
         done = self._convert_sup_to_xref(sups, numbers, ids, numeric_labels, "fn")
         if done:
             return
     
-    def get_ids_and_labels(self, xml, from_tag, subtag=None):
+    def get_ids_and_labels(self, xml, from_tag, subtag=None, index=None):
         elem_ids = {}
         numeric_labels = set()
-        for elem in xml.xpath(f".//{from_tag}"):
+        if index is None:
+            elems = XPATH(xml, f".//{from_tag}")
+        else:
+            elems = index.tag(from_tag)
+        for elem in elems:
             node = elem
             if subtag:
                 node = elem.find(subtag)
@@ -826,9 +825,9 @@ class XMLSupToXrefPipe(plumber.Pipe):
 class XMLAckPipe(plumber.Pipe):
     def transform(self, data):
         raw, xml = data
-        if not xml.xpath(".//body//ack"):
+        if not XPATH(xml, ".//body//ack"):
             return data
-        for body in xml.xpath(".//body"):
+        for body in XPATH(xml, ".//body"):
             ack = body.find(".//ack")
             if ack is None:
                 continue
@@ -849,6 +848,9 @@ class XMLCheckArticleLanguagePipe(plumber.Pipe):
         if article_meta is None:
             return data
 
+        # independe da decisão sobre o idioma do artigo
+        self.complete_missing_languages(xml)
+
         article_lang = xml.get("{http://www.w3.org/XML/1998/namespace}lang")
         
         expected_langs = []
@@ -875,6 +877,22 @@ class XMLCheckArticleLanguagePipe(plumber.Pipe):
                 return data
 
         # não é possível decidir por falta de informação ou ambiguidade dos idiomas de título/abstract
-        xml.set("{http://www.w3.org/XML/1998/namespace}lang", get_node_text_language_code(article_meta))
-
+        lang = get_node_text_language_code(article_meta)
+        if lang:
+            xml.set("{http://www.w3.org/XML/1998/namespace}lang", lang)
         return data
+
+    def complete_missing_languages(self, xml):
+        """
+        Identifica o idioma de sub-article e trans-abstract sem xml:lang
+        """
+        nodes = XPATH(
+            xml,
+            ".//sub-article[not(@xml:lang)] | .//trans-abstract[not(@xml:lang)]",
+            namespaces={"xml": "http://www.w3.org/XML/1998/namespace"},
+        )
+        if not nodes:
+            return
+        for node, lang in zip(nodes, get_nodes_text_language_codes(nodes)):
+            if lang:
+                node.set("{http://www.w3.org/XML/1998/namespace}lang", lang)
@@ -1,5 +1,9 @@
 import logging
+import os
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import StringIO
 
@@ -9,6 +13,17 @@ from lxml import etree as ET
 from scielo_classic_website.htmlbody.html_code_utils import html_decode
 
 from . import utils, xylose_adapters
+from .xpaths import XPATH
+
+XML_CITATIONS_MODE = os.environ.get("CLASSIC_WEBSITE_XML_CITATIONS_MODE") or "sequential"
+XML_CITATIONS_MAX_WORKERS = int(os.environ.get("CLASSIC_WEBSITE_XML_CITATIONS_MAX_WORKERS") or 4)
+
+CITATIONS_MODES = ("sequential", "batch", "threads")
+
+# intervalo (número de citações) do registro do tempo de processamento
+TIMING_BLOCK = 100
+
+_local = threading.local()
 
 
 def parse_yyyymmdd(yyyymmdd):
@@ -41,6 +56,25 @@ def iso_8601_date(yyyymmdd):
 
 
 class XMLArticleMetaCitationsPipe(plumber.Pipe):
+    """
+    Completa os ref de ref-list com mixed-citation e element-citation
+    obtidos dos registros de citação (ISIS)
+
+    mode : str
+        sequential: aplica o pipeline de XMLCitation a cada citação
+        batch: aplica o pipeline a todas as citações em um único percurso
+        threads: obtém os element-citation em paralelo (max_workers)
+    """
+
+    def __init__(self, mode=None, max_workers=None):
+        self.mode = mode or XML_CITATIONS_MODE
+        if self.mode not in CITATIONS_MODES:
+            raise ValueError(
+                f"Invalid mode {self.mode}. Expected one of {CITATIONS_MODES}"
+            )
+        self.max_workers = max_workers or XML_CITATIONS_MAX_WORKERS
+        self.timings = []
+
     def precond(data):
         raw, xml = data
         if not raw.citations:
@@ -57,34 +91,24 @@ class XMLArticleMetaCitationsPipe(plumber.Pipe):
             article.append(back)
 
         try:
-            reflist = back.xpath(".//ref-list")[0]
+            reflist = XPATH(back, ".//ref-list")[0]
         except IndexError:
             reflist = ET.Element("ref-list")
             back.insert(0, reflist)
 
-        cit = XMLCitation()
-        for i, citation in enumerate(raw.citations):
+        reflist_nodes = {}
+        for node in XPATH(reflist, ".//ref"):
+            reflist_nodes.setdefault(node.get("id"), node)
+
+        citations = raw.citations
+        self.timings = []
+        start = time.perf_counter()
+        for i, (ref, error) in enumerate(self.deploy(citations)):
             logging.info(f"Processing citation {i}")
             try:
-                citation.fix_function = html_decode
-                ref = cit.deploy(xylose_adapters.ReferenceXyloseAdapter(citation))[1]
-                if ref is None:
-                    continue
-                ref_id = ref.get("id")
-                if not ref_id:
-                    continue
-                try:
-                    reflist_node = reflist.xpath(f".//ref[@id='{ref_id}']")[0]
-                except IndexError:
-                    continue
-                if reflist_node.find(".//mixed-citation") is None:
-                    mixed_citation = ref.find(".//mixed-citation")
-                    if mixed_citation is not None:
-                        reflist_node.append(mixed_citation)
-                if reflist_node.find(".//element-citation") is None:
-                    element_citation = ref.find(".//element-citation")
-                    if element_citation is not None:
-                        reflist_node.append(element_citation)
+                if error:
+                    raise error
+                self.merge(reflist_nodes, ref)
             except Exception as e:
                 raw.add_exception(
                     action=f"Processing citation {i}",
@@ -92,11 +116,84 @@ class XMLArticleMetaCitationsPipe(plumber.Pipe):
                     message=traceback.format_exc(),
                     detail={
                         "i": i,
-                        "record_data": citation._record
+                        "record_data": citations[i]._record
                     },
                 )
+            if (i + 1) % TIMING_BLOCK == 0 or i + 1 == len(citations):
+                elapsed = time.perf_counter() - start
+                self.timings.append((i + 1, elapsed))
+                logging.info(f"Processed citations {i + 1}/{len(citations)} ({elapsed:.3f}s)")
+                start = time.perf_counter()
         return data
 
+    def deploy(self, citations):
+        """
+        Retorna, na ordem de `citations`, (ref, None) ou (None, exception)
+        """
+        if self.mode == "threads" and len(citations) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                yield from executor.map(_deploy_citation, citations)
+        elif self.mode == "batch":
+            adapters = []
+            errors = {}
+            for i, citation in enumerate(citations):
+                try:
+                    adapters.append(_get_adapter(citation))
+                except Exception as e:
+                    errors[i] = e
+            results = get_xml_citation().deploy_many(adapters)
+            for i in range(len(citations)):
+                if i in errors:
+                    yield None, errors[i]
+                else:
+                    yield next(results)
+        else:
+            for citation in citations:
+                yield _deploy_citation(citation)
+
+    def merge(self, reflist_nodes, ref):
+        if ref is None:
+            return
+        ref_id = ref.get("id")
+        if not ref_id:
+            return
+        reflist_node = reflist_nodes.get(ref_id)
+        if reflist_node is None:
+            return
+        if reflist_node.find(".//mixed-citation") is None:
+            mixed_citation = ref.find(".//mixed-citation")
+            if mixed_citation is not None:
+                reflist_node.append(mixed_citation)
+        if reflist_node.find(".//element-citation") is None:
+            element_citation = ref.find(".//element-citation")
+            if element_citation is not None:
+                reflist_node.append(element_citation)
+
+
+def _get_adapter(citation):
+    citation.fix_function = html_decode
+    return xylose_adapters.ReferenceXyloseAdapter(citation)
+
+
+def _deploy_citation(citation):
+    try:
+        return get_xml_citation().deploy(_get_adapter(citation))[1], None
+    except Exception as e:
+        return None, e
+
+
+def get_xml_citation():
+    """
+    Retorna o XMLCitation da thread corrente, criado uma única vez
+    (as pipes guardam estado durante a execução e não podem ser
+    compartilhadas entre threads)
+    """
+    try:
+        return _local.xml_citation
+    except AttributeError:
+        _local.xml_citation = XMLCitation()
+        return _local.xml_citation
+
 
 class XMLCitation(object):
     def __init__(self):
@@ -916,3 +1013,19 @@ class XMLCitation(object):
         transformed_data = self._ppl.run(raw, rewrap=True)
 
         return next(transformed_data)
+
+    def deploy_many(self, raws):
+        """
+        Aplica o pipeline a `raws` em um único percurso e retorna, na ordem,
+        (ref, None) ou (None, exception). Após uma exceção, o percurso
+        continua a partir do item seguinte.
+        """
+        start = 0
+        while start < len(raws):
+            try:
+                for raw, xml in self._ppl.run(raws[start:]):
+                    start += 1
+                    yield xml, None
+            except Exception as e:
+                start += 1
+                yield None, e
@@ -0,0 +1,64 @@
+"""
+Percurso único da árvore com despacho por tag.
+
+Pipes derivadas de `NodeVisitorPipe` tratam um nó por vez. Uma sequência
+delas pode ser executada por `TagDispatcherPipe` em um único percurso da
+árvore: para cada nó, as pipes são aplicadas na ordem em que foram declaradas
+e cada uma seleciona o nó pela tag corrente (já alterada pelas anteriores),
+o que produz o mesmo resultado que executá-las uma após a outra.
+
+Para isso, `visit` somente pode alterar o próprio nó. Efeitos sobre os filhos
+(ex.: ol/ul alteram as tags dos itens) devem ser aplicados quando o filho for
+visitado (ver `match` e `start`).
+"""
+
+import plumber
+
+from scielo_classic_website.spsxml.pipe_profiler import PIPE_PROFILER
+
+
+class NodeVisitorPipe(plumber.Pipe):
+    # tags selecionadas por `match`
+    tags = ()
+
+    def start(self):
+        """Inicia o estado de um percurso"""
+
+    def match(self, node):
+        return node.tag in self.tags
+
+    def visit(self, node):
+        raise NotImplementedError
+
+    def transform(self, data):
+        raw, xml = data
+        dispatch(xml, (self,))
+        return data
+
+
+class TagDispatcherPipe(plumber.Pipe):
+    """
+    Executa as `NodeVisitorPipe` em um único percurso da árvore
+    """
+
+    def __init__(self, *pipes):
+        self.pipes = pipes
+
+    def transform(self, data):
+        raw, xml = data
+        dispatch(xml, self.pipes)
+        return data
+
+
+def dispatch(xml, visitors):
+    """
+    Percorre os descendentes de `xml` uma única vez aplicando `visitors`
+    """
+    if PIPE_PROFILER.enabled:
+        PIPE_PROFILER.add_traversal()
+    for visitor in visitors:
+        visitor.start()
+    for node in xml.iterdescendants():
+        for visitor in visitors:
+            if visitor.match(node):
+                visitor.visit(node)
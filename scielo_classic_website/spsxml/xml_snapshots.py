@@ -0,0 +1,131 @@
+"""
+Política de retenção dos resultados intermediários (snapshots) da conversão
+HTML => XML guardados em `document.xml_body_and_back`.
+
+- last: guarda somente o resultado final (padrão)
+- failures: guarda também o resultado anterior a cada etapa que falhou
+- all: guarda o resultado de todas as etapas
+- spill: guarda somente o resultado final em memória e grava o resultado de
+  todas as etapas em um arquivo zip (`document.xml_body_and_back_spill`)
+
+O arquivo zip tem nome único (vários processos podem converter o mesmo
+documento) e pertence a quem chamou a conversão, que deve removê-lo
+(`remove_spill`) quando não precisar mais dele. Uma nova conversão do
+mesmo documento remove o arquivo anterior.
+"""
+
+import logging
+import os
+import tempfile
+import zipfile
+from uuid import uuid4
+
+XML_SNAPSHOTS_RETENTION = os.environ.get("CLASSIC_WEBSITE_XML_SNAPSHOTS_RETENTION") or "last"
+XML_SNAPSHOTS_SPILL_DIR = os.environ.get("CLASSIC_WEBSITE_XML_SNAPSHOTS_SPILL_DIR")
+
+RETENTION_POLICIES = ("last", "failures", "all", "spill")
+
+
+class XMLSnapshots:
+    """
+    Registra os resultados das etapas de conversão conforme a política de
+    retenção, mantendo em `document.xml_body_and_back` a lista
+    cujo último item é o resultado da última etapa bem sucedida.
+    """
+
+    def __init__(self, document, retention=None, spill_dir=None):
+        retention = retention or XML_SNAPSHOTS_RETENTION
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(
+                f"Invalid retention {retention}. Expected one of {RETENTION_POLICIES}"
+            )
+        self.document = document
+        self.retention = retention
+        self.spill_dir = spill_dir or XML_SNAPSHOTS_SPILL_DIR
+        self.kept = []
+        self.current = None
+        self._zip = None
+        self._fp = None
+        self._count = 0
+        document.xml_body_and_back = []
+
+    @property
+    def items(self):
+        if self.current is None:
+            return list(self.kept)
+        return self.kept + [self.current]
+
+    def add(self, step_name, xml, keep=False):
+        """
+        Registra o resultado (str) da etapa `step_name`
+
+        keep : bool
+            guarda o resultado independentemente da política
+        """
+        self._count += 1
+        if self.retention == "spill":
+            self._spill(step_name, xml)
+        if self.retention == "all" or keep:
+            self.kept.append(xml)
+            self.current = None
+        else:
+            self.current = xml
+        self.document.xml_body_and_back = self.items
+
+    def failed(self, step_name):
+        """
+        Registra a falha da etapa `step_name`
+        """
+        if self.retention == "failures" and self.current is not None:
+            # resultado anterior à etapa que falhou
+            self.kept.append(self.current)
+            self.current = None
+        self.document.xml_body_and_back = self.items
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._fp.close()
+            self._zip = None
+            self._fp = None
+        self.document.xml_body_and_back = self.items
+
+    def _spill(self, step_name, xml):
+        if self._zip is None:
+            remove_spill(self.document)
+            fp = tempfile.NamedTemporaryFile(
+                dir=self.spill_dir,
+                prefix=f"{get_document_name(self.document)}.",
+                suffix=".xml_body_and_back.zip",
+                delete=False,
+            )
+            self._zip = zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_DEFLATED)
+            self._fp = fp
+            self.document.xml_body_and_back_spill = fp.name
+            logging.info(f"xml_body_and_back snapshots: {fp.name}")
+        self._zip.writestr(f"{self._count:02d}_{step_name}.xml", xml)
+
+
+def remove_spill(document):
+    """
+    Remove o arquivo zip de `document.xml_body_and_back_spill`, se houver
+    """
+    path = getattr(document, "xml_body_and_back_spill", None)
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    document.xml_body_and_back_spill = None
+
+
+def get_document_name(document):
+    for name in ("scielo_pid_v2", "scielo_pid_v3"):
+        try:
+            value = getattr(document, name)
+        except Exception:
+            continue
+        if value:
+            return value
+    return uuid4().hex
@@ -0,0 +1,58 @@
+"""
+Registro de expressões XPath compiladas (`etree.XPath`).
+
+`node.xpath(expr)` compila a expressão a cada chamada. O registro compila
+cada expressão uma única vez (por thread, pois os avaliadores do lxml não
+devem ser compartilhados entre threads) e a reutiliza.
+
+Valores variáveis (ids, rids, idiomas) devem ser passados como variáveis
+XPath e não interpolados na expressão:
+
+>>> XPATH(xml, ".//xref[@rid=$rid]", rid="B1")
+"""
+
+import threading
+
+from lxml import etree
+
+
+class XPathRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.compilations = 0
+        self.evaluations = 0
+
+    @property
+    def _items(self):
+        try:
+            return self._local.items
+        except AttributeError:
+            self._local.items = {}
+            return self._local.items
+
+    def get(self, expr, namespaces=None):
+        """Retorna a expressão `expr` compilada"""
+        key = (expr, namespaces and tuple(sorted(namespaces.items())))
+        items = self._items
+        try:
+            return items[key]
+        except KeyError:
+            compiled = items[key] = etree.XPath(expr, namespaces=namespaces)
+            with self._lock:
+                self.compilations += 1
+            return compiled
+
+    def __call__(self, node, expr, namespaces=None, **variables):
+        """Equivale a `node.xpath(expr, namespaces=namespaces, **variables)`"""
+        self.evaluations += 1
+        return self.get(expr, namespaces)(node, **variables)
+
+    def reset_counters(self):
+        with self._lock:
+            self.compilations = 0
+            self.evaluations = 0
+
+
+# registro compartilhado pelas pipes de spsxml
+XPATH = XPathRegistry()
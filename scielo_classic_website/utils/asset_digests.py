@@ -0,0 +1,142 @@
+"""
+Checksum (SHA-256, BLAKE2 etc) dos arquivos dos fascículos e identificação
+de arquivos repetidos.
+
+Os mesmos logotipos, imagens de licença, PDFs e figuras aparecem em vários
+fascículos e, também, em htdocs/img/revistas e nos caminhos alternativos
+(fbpe). `AssetDigests` calcula os checksums em paralelo (threads, leitura
+sequencial em blocos grandes), reaproveita os checksums já calculados
+(guardados no inventário, `FileInventory`, por caminho, tamanho e data de
+modificação) e marca os arquivos cujo conteúdo já foi encontrado, no mesmo
+fascículo ou em fascículos anteriores.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from scielo_classic_website.utils.file_content import FileContent
+
+DIGEST_ALGORITHM = os.environ.get("CLASSIC_WEBSITE_DIGEST_ALGORITHM") or "sha256"
+DIGEST_MAX_WORKERS = int(os.environ.get("CLASSIC_WEBSITE_DIGEST_MAX_WORKERS") or 8)
+DIGEST_CHUNK_SIZE = int(
+    os.environ.get("CLASSIC_WEBSITE_DIGEST_CHUNK_SIZE") or 8 * 1024 * 1024
+)
+
+
+class AssetDigests:
+    """
+    Checksums dos arquivos e registro dos conteúdos já encontrados
+
+    >>> digests = AssetDigests(inventory)
+    >>> digests.mark(issue_files)
+    >>> [item["path"] for item in issue_files if not item.get("duplicate_of")]
+    """
+
+    def __init__(self, inventory=None, algorithm=None, max_workers=None, chunk_size=None):
+        self.inventory = inventory
+        self.algorithm = algorithm or DIGEST_ALGORITHM
+        self.max_workers = max_workers or DIGEST_MAX_WORKERS
+        self.chunk_size = chunk_size or DIGEST_CHUNK_SIZE
+        # checksum -> caminho do primeiro arquivo com este conteúdo
+        self.seen = {}
+        # (caminho, tamanho, data) -> checksum, calculados nesta execução
+        self._digests = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.reused = 0
+
+    @property
+    def stats(self):
+        return {
+            "computed": self.computed,
+            "reused": self.reused,
+            "unique": len(self.seen),
+        }
+
+    def compute(self, paths):
+        """
+        Checksum de cada arquivo de `paths`
+
+        Returns
+        -------
+        dict
+            {path: checksum}; arquivos inacessíveis são omitidos
+        """
+        keys = {}
+        for path in dict.fromkeys(paths):
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logging.warning(f"AssetDigests: {e}")
+                continue
+            keys[path] = (path, st.st_size, st.st_mtime)
+
+        digests = {}
+        pending = []
+        reused = 0
+        stored = self._stored(
+            [key for key in keys.values() if key not in self._digests]
+        )
+        for path, key in keys.items():
+            digest = self._digests.get(key) or stored.get(key)
+            if digest:
+                digests[path] = digest
+                self._digests[key] = digest
+                reused += 1
+            else:
+                pending.append(key)
+
+        computed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key, digest in zip(pending, executor.map(self._checksum, pending)):
+                if digest is None:
+                    continue
+                digests[key[0]] = digest
+                self._digests[key] = digest
+                computed.append((*key, digest))
+        with self._lock:
+            self.computed += len(computed)
+            self.reused += reused
+        if computed and self.inventory is not None:
+            self.inventory.save_digests(computed, self.algorithm)
+        return digests
+
+    def mark(self, files):
+        """
+        Adiciona "digest" aos itens (dict com "path") de `files` e
+        "duplicate_of" (caminho do primeiro arquivo com o mesmo conteúdo)
+        aos repetidos
+
+        Returns
+        -------
+        list
+            os itens de `files`
+        """
+        files = list(files)
+        digests = self.compute(item["path"] for item in files if item.get("path"))
+        with self._lock:
+            for item in files:
+                digest = digests.get(item.get("path"))
+                if not digest:
+                    continue
+                item["digest"] = digest
+                first = self.seen.setdefault(digest, item["path"])
+                if first != item["path"]:
+                    item["duplicate_of"] = first
+        return files
+
+    def _stored(self, keys):
+        if self.inventory is None or not keys:
+            return {}
+        return self.inventory.get_digests(keys, self.algorithm)
+
+    def _checksum(self, key):
+        try:
+            return FileContent(key[0], size=key[1]).checksum(
+                self.algorithm, self.chunk_size
+            )
+        except OSError as e:
+            logging.warning(f"AssetDigests: {e}")
+            return None
@@ -1,7 +1,13 @@
 import logging
 import difflib
+import heapq
+import os
 import re
 import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+SECTYPE_CACHE_SIZE = int(os.environ.get("CLASSIC_WEBSITE_SECTYPE_CACHE_SIZE") or 4096)
 
 
 SECTION_TYPES = [
@@ -32,16 +38,92 @@ STD = {
 }
 
 
+class CandidateIndex:
+    """
+    Índice dos candidatos de `difflib.get_close_matches`
+
+    Guarda o tamanho e a contagem de caracteres de cada candidato, com os
+    quais são calculados, sem `SequenceMatcher`, os limites superiores
+    `real_quick_ratio` e `quick_ratio`. O `ratio` somente é calculado para
+    os candidatos cujo limite pode superar o melhor resultado já obtido.
+    Retorna o mesmo que `difflib.get_close_matches(word, candidates, n, cutoff)`
+    """
+
+    def __init__(self, candidates):
+        self.candidates = list(candidates)
+        self.sizes = [len(candidate) for candidate in self.candidates]
+        # caractere -> [(posição do candidato, ocorrências), ...]
+        self.chars = {}
+        for i, candidate in enumerate(self.candidates):
+            for char, count in Counter(candidate).items():
+                self.chars.setdefault(char, []).append((i, count))
+
+    def upper_bounds(self, word):
+        """
+        [(quick_ratio, candidato, posição, real_quick_ratio), ...], limites
+        superiores do ratio de cada candidato em relação a `word`
+        """
+        intersections = [0] * len(self.candidates)
+        for char, count in Counter(word).items():
+            for i, candidate_count in self.chars.get(char, ()):
+                intersections[i] += min(count, candidate_count)
+        size = len(word)
+        bounds = []
+        for i, candidate in enumerate(self.candidates):
+            total = self.sizes[i] + size
+            if not total:
+                bounds.append((1.0, candidate, i, 1.0))
+                continue
+            bounds.append((
+                2.0 * intersections[i] / total,
+                candidate,
+                i,
+                2.0 * min(self.sizes[i], size) / total,
+            ))
+        return bounds
+
+    def get_close_matches(self, word, n=3, cutoff=0.6):
+        if not n > 0:
+            raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        result = []
+        # maiores limites primeiro; para quando nenhum candidato restante
+        # pode entrar entre os n melhores
+        bounds = sorted(
+            (bound for bound in self.upper_bounds(word)
+             if bound[3] >= cutoff and bound[0] >= cutoff),
+            reverse=True,
+        )
+        for quick_ratio, candidate, i, real_quick_ratio in bounds:
+            if len(result) == n and (quick_ratio, candidate) < result[0]:
+                break
+            matcher.set_seq1(candidate)
+            score = matcher.ratio()
+            if score < cutoff:
+                continue
+            if len(result) < n:
+                heapq.heappush(result, (score, candidate))
+            elif (score, candidate) > result[0]:
+                heapq.heapreplace(result, (score, candidate))
+        return [candidate for score, candidate in sorted(result, reverse=True)]
+
+
+CANDIDATES = CandidateIndex(SECTION_TYPES + SECTION_TYPES_TO_IGNORE)
+
+
+@lru_cache(maxsize=SECTYPE_CACHE_SIZE)
+def _get_best_matches(section_title, n, cutoff):
+    return tuple(CANDIDATES.get_close_matches(section_title, n, cutoff))
+
+
 def get_best_matches(section_title, n=None, cutoff=None):
     # Encontra as 3 melhores correspondências com pelo menos 60% de similaridade
     n = n or 1
     cutoff = cutoff or 0.1
-    return difflib.get_close_matches(
-        section_title, 
-        SECTION_TYPES+SECTION_TYPES_TO_IGNORE, 
-        n,           # número máximo de resultados
-        cutoff     # similaridade mínima (0 a 1)
-    )
+    return list(_get_best_matches(section_title, n, cutoff))
 
 def ignore(section_title):
     if len(section_title.split()) > 3:
@@ -49,6 +131,11 @@ def ignore(section_title):
 
 
 def get_sectype(section_title, n=None, cutoff=None):
+    return _get_sectype(section_title)
+
+
+@lru_cache(maxsize=SECTYPE_CACHE_SIZE)
+def _get_sectype(section_title):
     section_title_parts = section_title.split(" ")
     total_words = len(section_title_parts)
     if total_words > 3:
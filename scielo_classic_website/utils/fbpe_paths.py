@@ -0,0 +1,105 @@
+"""
+Mapa dos caminhos alternativos (fbpe) dos fascículos.
+
+Os caminhos alternativos das imagens são os diretórios
+htdocs/**/fbpe/**/acron/issue_folder. Em vez de procurá-los percorrendo
+htdocs a cada fascículo, os diretórios abaixo de "fbpe" são obtidos uma
+única vez e organizados por (acron, issue_folder).
+
+Com o inventário (`FileInventory`), o mapa é obtido do banco, que é
+persistente e atualizado de forma incremental; sem ele, htdocs é percorrido
+uma vez por instância.
+"""
+
+import logging
+import os
+import threading
+
+FBPE = "fbpe"
+
+
+class FbpePathMap:
+    """
+    {(acron, issue_folder): [caminho, ...]} dos diretórios abaixo de "fbpe"
+
+    >>> fbpe_paths = FbpePathMap("/scielo/htdocs", inventory)
+    >>> fbpe_paths.get("abc", "v1n1")
+    ['/scielo/htdocs/img/fbpe/abc/v1n1']
+    """
+
+    def __init__(self, root, inventory=None):
+        self.root = os.path.normpath(root)
+        self.inventory = inventory
+        self._map = None
+        self._lock = threading.Lock()
+
+    def get(self, acron, issue_folder):
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    self.refresh()
+        return list(self._map.get((acron, issue_folder), ()))
+
+    def refresh(self):
+        """
+        Obtém novamente o mapa (após `FileInventory.refresh`, se houver)
+        """
+        if self.inventory is not None and self.inventory.covers(self.root):
+            dirs = self._inventory_dirs()
+        else:
+            dirs = self._walk_dirs()
+        paths = {}
+        for path, parent_name, name in dirs:
+            paths.setdefault((parent_name, name), set()).add(path)
+        self._map = {key: sorted(value) for key, value in paths.items()}
+        logging.info(f"FbpePathMap {self.root}: {len(self._map)} issues")
+        return self._map
+
+    def _inventory_dirs(self):
+        for fbpe_path in self.inventory.find_dirs(FBPE, self.root):
+            for path, parent_name, name in self.inventory.descendant_dirs(fbpe_path):
+                # acron/issue_folder abaixo de fbpe: ao menos dois níveis
+                if os.path.dirname(path) == fbpe_path:
+                    continue
+                # como o glob: ignora diretórios ocultos
+                parts = os.path.relpath(path, self.root).split(os.sep)
+                if any(part.startswith(".") for part in parts):
+                    continue
+                yield path, parent_name, name
+
+    def _walk_dirs(self):
+        # como o glob: ignora diretórios ocultos e segue links simbólicos
+        # (exceto para diretórios ascendentes)
+        if not os.path.isdir(self.root):
+            return
+        stack = [(self.root, 0, frozenset([os.path.realpath(self.root)]))]
+        while stack:
+            path, fbpe_depth, ancestors = stack.pop()
+            if fbpe_depth >= 3:
+                yield (
+                    path,
+                    os.path.basename(os.path.dirname(path)),
+                    os.path.basename(path),
+                )
+            try:
+                entries = list(os.scandir(path))
+            except OSError as e:
+                logging.warning(f"FbpePathMap: {e}")
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if not entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                real = os.path.realpath(entry.path)
+                if real in ancestors:
+                    continue
+                # níveis abaixo do primeiro diretório "fbpe" (inclusive)
+                if fbpe_depth:
+                    depth = fbpe_depth + 1
+                else:
+                    depth = 1 if entry.name == FBPE else 0
+                stack.append((entry.path, depth, ancestors | {real}))
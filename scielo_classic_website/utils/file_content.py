@@ -0,0 +1,83 @@
+"""
+Conteúdo de arquivo lido somente quando solicitado.
+
+`FileContent` guarda apenas o caminho (e o tamanho) do arquivo e oferece
+leitura completa, leitura em blocos, `mmap` e checksum calculado em blocos,
+sem manter o conteúdo em memória.
+"""
+
+import hashlib
+import mmap
+import os
+from contextlib import contextmanager
+
+FILE_CHUNK_SIZE = int(os.environ.get("CLASSIC_WEBSITE_FILE_CHUNK_SIZE") or 1024 * 1024)
+# tamanho máximo (bytes) do conteúdo carregado em memória; 0: sem limite
+FILE_CONTENT_MAX_SIZE = int(os.environ.get("CLASSIC_WEBSITE_FILE_CONTENT_MAX_SIZE") or 0)
+
+
+class FileContent:
+    """
+    Referência ao conteúdo do arquivo `path`
+
+    >>> content = FileContent("/path/a01.pdf")
+    >>> content.checksum()
+    >>> for chunk in content.chunks(): ...
+    """
+
+    def __init__(self, path, max_size=None, size=None):
+        self.path = path
+        self.max_size = FILE_CONTENT_MAX_SIZE if max_size is None else max_size
+        self._size = size
+
+    def __repr__(self):
+        return f"FileContent({self.path!r})"
+
+    @property
+    def size(self):
+        if self._size is None:
+            self._size = os.stat(self.path).st_size
+        return self._size
+
+    @property
+    def too_large(self):
+        """
+        Indica se o arquivo excede `max_size` e não deve ser carregado
+        em memória
+        """
+        return bool(self.max_size) and self.size > self.max_size
+
+    def open(self):
+        return open(self.path, "rb")
+
+    def read(self):
+        with self.open() as fp:
+            return fp.read()
+
+    def chunks(self, chunk_size=None):
+        chunk_size = chunk_size or FILE_CHUNK_SIZE
+        with self.open() as fp:
+            while True:
+                chunk = fp.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    @contextmanager
+    def mmap(self):
+        """
+        Visão (somente leitura) do arquivo mapeado em memória
+        """
+        with self.open() as fp:
+            if not os.fstat(fp.fileno()).st_size:
+                # arquivo vazio não pode ser mapeado
+                yield b""
+                return
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def checksum(self, algorithm="sha256", chunk_size=None):
+        digest = hashlib.new(algorithm)
+        for chunk in self.chunks(chunk_size):
+            digest.update(chunk)
+        return digest.hexdigest()
@@ -6,6 +6,8 @@ import tempfile
 from datetime import datetime
 from zipfile import ZipFile
 
+from scielo_classic_website.utils.package_writer import PackageWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -121,13 +123,16 @@ def write_file(path, source, mode="w"):
         f.write(source)
 
 
-def create_zip_file(files, zip_name, zip_folder=None):
+def create_zip_file(files, zip_name, zip_folder=None, max_workers=None):
+    """
+    Cria o pacote zip `zip_name` com `files`; PDFs e imagens são gravados
+    sem compressão (ver `PackageWriter`)
+    """
     zip_folder = zip_folder or tempfile.mkdtemp()
 
     zip_path = os.path.join(zip_folder, zip_name)
-    with ZipFile(zip_path, "w") as myzip:
-        for f in files:
-            myzip.write(f, os.path.basename(f))
+    with PackageWriter(zip_path, max_workers=max_workers, algorithm=None) as package:
+        package.add_files((f, os.path.basename(f)) for f in files)
     return zip_path
 
 
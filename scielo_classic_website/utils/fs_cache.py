@@ -0,0 +1,99 @@
+"""
+Cache de resolução de caminhos do sistema de arquivos.
+
+Evita repetir `os.path.realpath` e `os.stat` para os mesmos caminhos
+(por exemplo, htdocs montado via NFS). Os resultados expiram após `ttl`
+segundos para que mudanças no sistema de arquivos sejam percebidas.
+"""
+
+import os
+import stat
+import threading
+import time
+
+PATH_CACHE_TTL = float(os.environ.get("CLASSIC_WEBSITE_PATH_CACHE_TTL") or 300)
+PATH_CACHE_MAXSIZE = int(os.environ.get("CLASSIC_WEBSITE_PATH_CACHE_MAXSIZE") or 100000)
+
+
+class PathCache:
+    """
+    Cache com validade (TTL) de `realpath` e `stat` por caminho.
+
+    >>> cache = PathCache(ttl=60)
+    >>> cache.isfile("/etc/hosts")
+    True
+    """
+
+    def __init__(self, ttl=None, maxsize=None):
+        self.ttl = PATH_CACHE_TTL if ttl is None else ttl
+        self.maxsize = maxsize or PATH_CACHE_MAXSIZE
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, kind, path, func):
+        key = (kind, _absolute(path))
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and now - item[0] < self.ttl:
+                self.hits += 1
+                return item[1]
+        value = func(path)
+        with self._lock:
+            self.misses += 1
+            if len(self._data) >= self.maxsize:
+                self._purge(now)
+            self._data[key] = (now, value)
+        return value
+
+    def _purge(self, now):
+        expired = [
+            key for key, item in self._data.items() if now - item[0] >= self.ttl
+        ]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            self._data.clear()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def realpath(self, path):
+        return self._get("realpath", path, os.path.realpath)
+
+    def stat(self, path):
+        """Retorna `os.stat_result` ou None se o caminho não existe"""
+        return self._get("stat", path, _stat_or_none)
+
+    def exists(self, path):
+        return self.stat(path) is not None
+
+    def isfile(self, path):
+        st = self.stat(path)
+        return st is not None and stat.S_ISREG(st.st_mode)
+
+    def isdir(self, path):
+        st = self.stat(path)
+        return st is not None and stat.S_ISDIR(st.st_mode)
+
+
+def _absolute(path):
+    # caminhos relativos dependem do diretório corrente (chdir)
+    if os.path.isabs(path):
+        return path
+    cwd = os.getcwdb() if isinstance(path, bytes) else os.getcwd()
+    return os.path.join(cwd, path)
+
+
+def _stat_or_none(path):
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+# instância compartilhada por HTMLContent, IssueFiles etc
+PATH_CACHE = PathCache()
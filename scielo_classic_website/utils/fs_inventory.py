@@ -0,0 +1,480 @@
+"""
+Inventário (SQLite) dos arquivos do site clássico.
+
+bases/xml, bases/pdf, bases/translation e htdocs são percorridos uma única
+vez e os diretórios e arquivos são registrados em um banco SQLite local
+(caminho, tamanho, data de modificação e, para os diretórios, os dois
+últimos componentes do caminho, que são (acron, issue_folder) para as
+pastas dos fascículos). `FileInventory.glob` responde as mesmas
+consultas de `glob.glob` a partir do banco, sem percorrer a árvore de
+diretórios a cada fascículo (ex.: `htdocs/**/acron/issue_folder/**/*.*`).
+
+A atualização (`refresh`) é incremental: somente os diretórios cuja data de
+modificação mudou são listados novamente. Alterações no conteúdo de um
+arquivo existente não mudam a data do diretório e, portanto, não atualizam
+tamanho e data do arquivo.
+
+Entradas ocultas (".*") não são indexadas, assim como o `glob` as ignora.
+"""
+
+import fnmatch
+import glob
+import logging
+import os
+import sqlite3
+import threading
+
+INVENTORY_PATH = os.environ.get("CLASSIC_WEBSITE_INVENTORY_PATH")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path BLOB PRIMARY KEY,
+    parent BLOB,
+    name BLOB,
+    parent_name BLOB,
+    root BLOB,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE INDEX IF NOT EXISTS dirs_name ON dirs (name, parent_name);
+CREATE INDEX IF NOT EXISTS dirs_root ON dirs (root);
+CREATE TABLE IF NOT EXISTS files (
+    path BLOB PRIMARY KEY,
+    dir BLOB,
+    name BLOB,
+    size INTEGER,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE TABLE IF NOT EXISTS digests (
+    path BLOB,
+    algorithm TEXT,
+    size INTEGER,
+    mtime REAL,
+    digest TEXT,
+    PRIMARY KEY (path, algorithm)
+);
+"""
+
+_SEP = os.fsencode(os.sep)
+
+
+class FileInventory:
+    """
+    Inventário dos arquivos abaixo de `roots`
+
+    >>> inventory = FileInventory("/tmp/inventory.db", ["/scielo/bases/pdf"])
+    >>> inventory.glob("/scielo/bases/pdf/acron/v1n1/*.*")
+    """
+
+    def __init__(self, db_path, roots):
+        self.db_path = db_path
+        self.roots = _outermost(os.path.normpath(root) for root in roots if root)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshed = False
+        with self._connection as conn:
+            conn.executescript(_SCHEMA)
+
+    @property
+    def _connection(self):
+        # uma conexão por thread (e por processo, após fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def covers(self, path):
+        """
+        Indica se `path` está em um dos diretórios inventariados
+        """
+        path = os.path.normpath(path)
+        return any(
+            path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+            for root in self.roots
+        )
+
+    def refresh(self):
+        """
+        Atualiza o inventário: percorre as raízes ainda não inventariadas e
+        lista novamente os diretórios modificados desde a última atualização
+
+        Returns
+        -------
+        dict
+            {"dirs": verificados, "changed": listados novamente,
+             "added": novos, "removed": removidos}
+        """
+        stats = {"dirs": 0, "changed": 0, "added": 0, "removed": 0}
+        with self._lock, self._connection as conn:
+            for root in self.roots:
+                root = os.fsencode(root)
+                rows = conn.execute(
+                    "SELECT path, mtime FROM dirs WHERE root = ? ORDER BY path",
+                    (root,),
+                ).fetchall()
+                if not rows:
+                    stats["added"] += self._scan(conn, root, root)
+                    continue
+                for path, mtime in rows:
+                    stats["dirs"] += 1
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        st = None
+                    if st is None:
+                        stats["removed"] += self._delete_tree(conn, path)
+                    elif st.st_mtime != mtime:
+                        stats["changed"] += 1
+                        added, removed = self._rescan_dir(conn, root, path, st)
+                        stats["added"] += added
+                        stats["removed"] += removed
+            self._refreshed = True
+        logging.info(f"FileInventory.refresh {self.db_path}: {stats}")
+        return stats
+
+    def _ensure_refreshed(self):
+        # o inventário é atualizado uma vez por instância, na primeira consulta
+        if not self._refreshed:
+            with self._refresh_lock:
+                if not self._refreshed:
+                    self.refresh()
+
+    def _scan(self, conn, root, path):
+        """
+        Registra `path` e todos os seus subdiretórios e arquivos
+        """
+        count = 0
+        # (diretório, caminho real, caminhos reais dos ascendentes)
+        stack = [(path, os.path.realpath(path), _real_ancestors(path, root))]
+        while stack:
+            path, real, ancestors = stack.pop()
+            try:
+                st = os.stat(path)
+                entries = [] if real in ancestors else list(os.scandir(path))
+            except OSError as e:
+                logging.warning(f"FileInventory: {e}")
+                continue
+            # link simbólico para um diretório ascendente é registrado,
+            # mas não é percorrido
+            self._insert_dir(conn, root, path, st)
+            count += 1
+            ancestors = ancestors | {real}
+            for entry in entries:
+                if not _is_dir(entry):
+                    continue
+                if entry.is_symlink():
+                    entry_real = os.path.realpath(entry.path)
+                else:
+                    entry_real = os.path.join(real, entry.name)
+                stack.append((entry.path, entry_real, ancestors))
+            self._insert_files(conn, path, entries)
+        return count
+
+    def _rescan_dir(self, conn, root, path, st):
+        """
+        Atualiza os arquivos e subdiretórios imediatos de `path`
+        """
+        self._insert_dir(conn, root, path, st)
+        if os.path.realpath(path) in _real_ancestors(path, root):
+            return 0, 0
+        try:
+            entries = list(os.scandir(path))
+        except OSError as e:
+            logging.warning(f"FileInventory: {e}")
+            return 0, 0
+
+        conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        self._insert_files(conn, path, entries)
+
+        current = {entry.path for entry in entries if _is_dir(entry)}
+        known = {
+            row[0]
+            for row in conn.execute("SELECT path FROM dirs WHERE parent = ?", (path,))
+        }
+        added = removed = 0
+        for subdir in known - current:
+            removed += self._delete_tree(conn, subdir)
+        for subdir in current - known:
+            added += self._scan(conn, root, subdir)
+        return added, removed
+
+    def _insert_dir(self, conn, root, path, st):
+        parent, name = os.path.split(path)
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)",
+            (path, parent, name, os.path.basename(parent), root, st.st_mtime),
+        )
+
+    def _insert_files(self, conn, path, entries):
+        rows = []
+        for entry in entries:
+            if entry.name.startswith(b".") or _is_dir(entry):
+                continue
+            try:
+                st = entry.stat()
+                size, mtime = st.st_size, st.st_mtime
+            except OSError:
+                # link simbólico quebrado
+                size = mtime = None
+            rows.append((entry.path, path, entry.name, size, mtime))
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", rows)
+
+    def _delete_tree(self, conn, path):
+        low, high = _descendants_range(path)
+        conn.execute(
+            "DELETE FROM files WHERE dir = ? OR (dir > ? AND dir < ?)", (path, low, high)
+        )
+        cursor = conn.execute(
+            "DELETE FROM dirs WHERE path = ? OR (path > ? AND path < ?)",
+            (path, low, high),
+        )
+        return cursor.rowcount
+
+    def glob(self, pattern, recursive=False):
+        """
+        Mesmo resultado de `glob.glob(pattern, recursive=recursive)`
+        (exceto a ordem), ou None se `pattern` não está no inventário
+        """
+        if pattern.endswith(os.sep):
+            return None
+        parts = os.path.normpath(pattern).split(os.sep)
+        magic = [i for i, part in enumerate(parts) if glob.has_magic(part)]
+        if not magic:
+            if not self.covers(pattern):
+                return None
+            self._ensure_refreshed()
+            path = os.fsencode(os.path.normpath(pattern))
+            return [pattern] if self._exists(path) else []
+
+        prefix = os.sep.join(parts[: magic[0]])
+        components = parts[magic[0] :]
+        if not prefix or not self.covers(prefix):
+            return None
+        if recursive and components[-1] == "**":
+            return None
+        self._ensure_refreshed()
+
+        dirs = [os.fsencode(prefix)] if self._isdir(os.fsencode(prefix)) else []
+        i = 0
+        while dirs and i < len(components) - 1:
+            component = components[i]
+            if recursive and component == "**":
+                following = components[i + 1]
+                if i + 1 < len(components) - 1 and not glob.has_magic(following):
+                    # "**/literal": consulta pelo nome do diretório
+                    dirs = self._descendant_dirs(dirs, os.fsencode(following))
+                    i += 2
+                    continue
+                dirs = dirs + self._descendant_dirs(dirs)
+            elif glob.has_magic(component):
+                dirs = [
+                    path
+                    for path, name in self._children(dirs, "dirs", "parent")
+                    if fnmatch.fnmatch(os.fsdecode(name), component)
+                ]
+            else:
+                component = os.fsencode(component)
+                dirs = [
+                    path
+                    for path in (os.path.join(d, component) for d in dirs)
+                    if self._isdir(path)
+                ]
+            i += 1
+
+        if not dirs:
+            return []
+        last = components[-1]
+        if not glob.has_magic(last):
+            last = os.fsencode(last)
+            found = (os.path.join(d, last) for d in dirs)
+            return [os.fsdecode(path) for path in found if self._exists(path)]
+        return [
+            os.fsdecode(path)
+            for table, column in (("dirs", "parent"), ("files", "dir"))
+            for path, name in self._children(dirs, table, column)
+            if fnmatch.fnmatch(os.fsdecode(name), last)
+        ]
+
+    def issue_dirs(self, acron, issue_folder):
+        """
+        Diretórios inventariados que terminam com acron/issue_folder
+        """
+        self._ensure_refreshed()
+        return [
+            os.fsdecode(row[0])
+            for row in self._connection.execute(
+                "SELECT path FROM dirs WHERE name = ? AND parent_name = ? ORDER BY path",
+                (os.fsencode(issue_folder), os.fsencode(acron)),
+            )
+        ]
+
+    def find_dirs(self, name, below):
+        """
+        Diretórios com o nome `name` abaixo de `below`
+        """
+        self._ensure_refreshed()
+        below = os.fsencode(os.path.normpath(below))
+        return [
+            os.fsdecode(path)
+            for path in self._descendant_dirs([below], os.fsencode(name))
+        ]
+
+    def descendant_dirs(self, path):
+        """
+        [(caminho, nome do diretório pai, nome), ...] dos diretórios
+        abaixo de `path`
+        """
+        self._ensure_refreshed()
+        low, high = _descendants_range(os.fsencode(os.path.normpath(path)))
+        return [
+            (os.fsdecode(row[0]), os.fsdecode(row[1]), os.fsdecode(row[2]))
+            for row in self._connection.execute(
+                "SELECT path, parent_name, name FROM dirs WHERE path > ? AND path < ?",
+                (low, high),
+            )
+        ]
+
+    def stat(self, path):
+        """
+        (tamanho, data de modificação) de um arquivo inventariado ou None
+        """
+        self._ensure_refreshed()
+        return self._connection.execute(
+            "SELECT size, mtime FROM files WHERE path = ?", (os.fsencode(path),)
+        ).fetchone()
+
+    def get_digests(self, keys, algorithm):
+        """
+        Checksums guardados de `keys`, [(caminho, tamanho, data), ...],
+        válidos somente se tamanho e data não mudaram
+
+        Returns
+        -------
+        dict
+            {(caminho, tamanho, data): checksum}
+        """
+        conn = self._connection
+        found = {}
+        for key in keys:
+            row = conn.execute(
+                "SELECT size, mtime, digest FROM digests WHERE path = ? AND algorithm = ?",
+                (os.fsencode(key[0]), algorithm),
+            ).fetchone()
+            if row and (row[0], row[1]) == (key[1], key[2]):
+                found[key] = row[2]
+        return found
+
+    def save_digests(self, rows, algorithm):
+        """
+        Guarda os checksums, rows: [(caminho, tamanho, data, checksum), ...]
+        """
+        with self._lock, self._connection as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?)",
+                [
+                    (os.fsencode(path), algorithm, size, mtime, digest)
+                    for path, size, mtime, digest in rows
+                ],
+            )
+
+    @property
+    def stats(self):
+        conn = self._connection
+        return {
+            "dirs": conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0],
+            "files": conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+        }
+
+    def _isdir(self, path):
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM dirs WHERE path = ?", (path,)
+            ).fetchone()
+            is not None
+        )
+
+    def _exists(self, path):
+        return (
+            self._isdir(path)
+            or self._connection.execute(
+                "SELECT 1 FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            is not None
+        )
+
+    def _children(self, dirs, table, column):
+        conn = self._connection
+        for d in dirs:
+            yield from conn.execute(
+                f"SELECT path, name FROM {table} WHERE {column} = ?", (d,)
+            )
+
+    def _descendant_dirs(self, dirs, name=None):
+        conn = self._connection
+        found = []
+        for d in dirs:
+            low, high = _descendants_range(d)
+            if name is None:
+                rows = conn.execute(
+                    "SELECT path FROM dirs WHERE path > ? AND path < ?", (low, high)
+                )
+            else:
+                rows = conn.execute(
+                    "SELECT path FROM dirs WHERE name = ? AND path > ? AND path < ?",
+                    (name, low, high),
+                )
+            found.extend(row[0] for row in rows)
+        return found
+
+
+def inventory_glob(inventory, pattern, recursive=False):
+    """
+    `glob.glob` respondido pelo inventário, quando houver e se o inventário
+    contém `pattern`
+    """
+    if inventory is not None:
+        paths = inventory.glob(pattern, recursive=recursive)
+        if paths is not None:
+            return paths
+    return glob.glob(pattern, recursive=recursive)
+
+
+def _outermost(roots):
+    roots = sorted(set(roots))
+    selected = []
+    for root in roots:
+        if not any(
+            root == other or root.startswith(other.rstrip(os.sep) + os.sep)
+            for other in selected
+        ):
+            selected.append(root)
+    return selected
+
+
+def _is_dir(entry):
+    if entry.name.startswith(b"."):
+        return False
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _real_ancestors(path, root):
+    # caminhos reais dos ascendentes de `path` até `root`
+    ancestors = set()
+    while path != root and len(path) > len(root):
+        path = os.path.dirname(path)
+        ancestors.add(os.path.realpath(path))
+    return frozenset(ancestors)
+
+
+def _descendants_range(path):
+    # caminhos abaixo de `path`: path + "/" <= x < path + "0" ("0" sucede "/")
+    prefix = path if path.endswith(_SEP) else path + _SEP
+    return prefix, prefix[:-1] + bytes([prefix[-1] + 1])
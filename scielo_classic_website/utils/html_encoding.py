@@ -0,0 +1,149 @@
+"""
+Detecção do encoding de arquivos HTML do site clássico a partir dos bytes.
+
+Os arquivos são lidos uma única vez (em bytes) e o encoding é detectado por:
+
+1. BOM
+2. validade UTF-8 (sequências multibyte válidas raramente ocorrem por acaso
+   em textos ISO-8859-1, e a declaração `<meta charset>` das páginas
+   antigas frequentemente está errada)
+3. `<meta charset>` / `<meta http-equiv="Content-Type">`
+4. encoding padrão (ISO-8859-1, que decodifica qualquer sequência de bytes)
+"""
+
+import codecs
+import logging
+import os
+import re
+import threading
+
+HTML_DECODER_MAXSIZE = int(os.environ.get("CLASSIC_WEBSITE_HTML_DECODER_MAXSIZE") or 1000)
+
+DEFAULT_ENCODING = "iso-8859-1"
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE
+)
+
+# a declaração de charset fica no head; não é necessário procurar no body
+META_SCAN_SIZE = 4096
+
+
+def get_meta_charset(data):
+    """Retorna o encoding declarado em `<meta>` ou None"""
+    match = META_CHARSET.search(data[:META_SCAN_SIZE])
+    if not match:
+        return None
+    name = match.group(1).decode("ascii", errors="ignore")
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(data, default=None):
+    """
+    Retorna o encoding de `data` (bytes)
+
+    >>> detect_encoding("ação".encode("utf-8"))
+    'utf-8'
+    >>> detect_encoding("ação".encode("iso-8859-1"))
+    'iso-8859-1'
+    """
+    for bom, encoding in BOMS:
+        if data.startswith(bom):
+            return encoding
+    if data.isascii():
+        return "utf-8"
+    try:
+        data.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    for encoding in (get_meta_charset(data), default):
+        if not encoding or codecs.lookup(encoding).name == "utf-8":
+            continue
+        try:
+            data.decode(encoding)
+            return encoding
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return DEFAULT_ENCODING
+
+
+def decode_html(data, default=None):
+    """
+    Decodifica `data` (bytes)
+
+    Returns
+    -------
+    tuple (text, encoding)
+    """
+    if data is None:
+        return None, None
+    encoding = detect_encoding(data, default)
+    return data.decode(encoding), encoding
+
+
+class HTMLDecoder:
+    """
+    Lê e decodifica arquivos HTML, guardando o resultado por arquivo.
+
+    A entrada é validada pelo `mtime` e pelo tamanho do arquivo.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or HTML_DECODER_MAXSIZE
+        self._items = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def read(self, file_path, default=None):
+        """
+        Retorna (text, encoding) do arquivo
+
+        Raises
+        ------
+        OSError
+        """
+        st = os.stat(file_path)
+        signature = (st.st_mtime_ns, st.st_size)
+        key = (file_path, default)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == signature:
+                self.hits += 1
+                return item[1]
+
+        with open(file_path, "rb") as fp:
+            result = decode_html(fp.read(), default)
+        logging.info(f"{file_path} decoded as {result[1]}")
+
+        with self._lock:
+            self.misses += 1
+            if len(self._items) >= self.maxsize:
+                self._items.pop(next(iter(self._items)))
+            self._items[key] = (signature, result)
+        return result
+
+
+# instância compartilhada por HTMLContent, HTMLMerger etc
+HTML_DECODER = HTMLDecoder()
+
+
+def read_html(file_path, default=None):
+    """Retorna (text, encoding) do arquivo HTML `file_path`"""
+    return HTML_DECODER.read(file_path, default)
@@ -0,0 +1,184 @@
+"""
+Manifesto dos arquivos de um fascículo e detecção de alterações.
+
+O manifesto guarda, para cada arquivo do fascículo, caminho relativo,
+tamanho, data de modificação e (opcional) checksum, e a data de
+modificação dos diretórios do fascículo. Comparado com o manifesto da
+execução anterior, indica os arquivos novos, alterados e removidos, de modo
+que somente estes sejam enviados.
+
+Se nenhum diretório do fascículo mudou (data de modificação), o fascículo
+não é listado novamente (`quick=True`). Sobrescrever um arquivo existente
+não muda a data do diretório; nesse caso use `quick=False`.
+"""
+
+import json
+import os
+import tempfile
+
+MANIFESTS_PATH = os.environ.get("CLASSIC_WEBSITE_MANIFESTS_PATH")
+
+
+class IssueManifestStore:
+    """
+    Manifestos (JSON) em `folder`/acron/issue_folder.json
+    """
+
+    def __init__(self, folder=None):
+        self.folder = folder or MANIFESTS_PATH
+        if not self.folder:
+            raise ValueError(
+                "IssueManifestStore requires folder or CLASSIC_WEBSITE_MANIFESTS_PATH"
+            )
+
+    def _path(self, acron, issue_folder):
+        return os.path.join(self.folder, acron, f"{issue_folder}.json")
+
+    def load(self, acron, issue_folder):
+        try:
+            with open(self._path(acron, issue_folder), encoding="utf-8") as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return None
+
+    def save(self, manifest):
+        path = self._path(manifest["acron"], manifest["issue_folder"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # grava em arquivo temporário e renomeia: nunca fica incompleto
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            json.dump(manifest, fp, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def get_manifest_dirs(classic_website_paths, subdir_acron_issue):
+    """
+    Diretórios acron/issue_folder de bases/xml, bases/pdf,
+    bases/translation e htdocs/img/revistas
+    """
+    return [
+        os.path.join(base_path, subdir_acron_issue)
+        for base_path in (
+            getattr(classic_website_paths, name, None)
+            for name in (
+                "bases_xml_path",
+                "bases_pdf_path",
+                "bases_translation_path",
+                "htdocs_img_revistas_path",
+            )
+        )
+        if base_path
+    ]
+
+
+def get_dirs_mtimes(dirs):
+    """
+    {diretório: data de modificação}; None para os inexistentes
+    """
+    mtimes = {}
+    for path in dirs:
+        try:
+            mtimes[path] = os.stat(path).st_mtime
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def get_changes(issue, store, quick=True, digests=None):
+    """
+    Arquivos de `issue` (IssueFiles ou IssueFolder) novos, alterados e
+    removidos desde o manifesto guardado em `store`
+
+    Parameters
+    ----------
+    quick : bool
+        não lista o fascículo se nenhum dos seus diretórios mudou
+    digests : AssetDigests
+        se informado, o checksum é guardado no manifesto e um arquivo com
+        tamanho ou data diferentes e mesmo checksum não é considerado alterado
+
+    Returns
+    -------
+    dict
+        {"added": [item, ...], "changed": [item, ...], "removed": [chave, ...],
+         "unchanged": bool, "manifest": novo manifesto}
+        O novo manifesto deve ser guardado (`store.save`) pelo chamador
+        depois que as alterações forem processadas
+    """
+    previous = store.load(issue.acron, issue.issue_folder)
+    if quick and previous and previous["dirs"]:
+        if get_dirs_mtimes(previous["dirs"]) == previous["dirs"]:
+            return {
+                "added": [],
+                "changed": [],
+                "removed": [],
+                "unchanged": True,
+                "manifest": previous,
+            }
+
+    previous_files = (previous or {}).get("files") or {}
+    items = {}
+    entries = {}
+    dirs = set(issue.manifest_dirs)
+    for item in issue.files:
+        path = item.get("path")
+        if not path or item.get("error"):
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key = item.get("relative_path") or path
+        items[key] = item
+        entries[key] = {"size": st.st_size, "mtime": st.st_mtime}
+        dirs.add(os.path.dirname(path))
+
+    if digests is not None:
+        _add_digests(entries, items, previous_files, digests)
+
+    added = []
+    changed = []
+    for key, entry in entries.items():
+        old = previous_files.get(key)
+        if old is None:
+            added.append(items[key])
+        elif _changed(old, entry):
+            changed.append(items[key])
+    removed = sorted(set(previous_files) - set(entries))
+
+    manifest = {
+        "acron": issue.acron,
+        "issue_folder": issue.issue_folder,
+        "dirs": get_dirs_mtimes(sorted(dirs)),
+        "files": entries,
+    }
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": not (added or changed or removed),
+        "manifest": manifest,
+    }
+
+
+def _add_digests(entries, items, previous_files, digests):
+    # somente os arquivos novos ou com tamanho / data diferentes
+    pending = {}
+    for key, entry in entries.items():
+        old = previous_files.get(key)
+        if old and old.get("digest") and _same_stat(old, entry):
+            entry["digest"] = old["digest"]
+        else:
+            pending[items[key]["path"]] = key
+    for path, digest in digests.compute(pending).items():
+        entries[pending[path]]["digest"] = digest
+
+
+def _same_stat(old, entry):
+    return (old["size"], old["mtime"]) == (entry["size"], entry["mtime"])
+
+
+def _changed(old, entry):
+    if old.get("digest") and entry.get("digest"):
+        return old["digest"] != entry["digest"]
+    return not _same_stat(old, entry)
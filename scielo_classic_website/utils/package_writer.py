@@ -0,0 +1,261 @@
+"""
+Gravação de pacotes (zip ou tar) em fluxo.
+
+Os arquivos são gravados no pacote à medida que são adicionados, lidos em
+blocos, diretamente no destino (caminho ou qualquer objeto com `write`).
+No zip, a compressão é escolhida pelo tipo de mídia: PDF, imagens (JPEG,
+PNG, TIFF etc), vídeos e arquivos compactados já são comprimidos e são
+gravados sem compressão (ZIP_STORED); os demais (XML, HTML etc) com
+deflate.
+
+O manifesto (nome, tamanho, compressão e checksum de cada arquivo) é
+retornado por `close` e, opcionalmente, incluído no pacote.
+"""
+
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+PACKAGE_MAX_WORKERS = int(os.environ.get("CLASSIC_WEBSITE_PACKAGE_MAX_WORKERS") or 4)
+# arquivos maiores são lidos em blocos pelo próprio gravador, sem leitura antecipada
+PACKAGE_PREFETCH_MAX_SIZE = int(
+    os.environ.get("CLASSIC_WEBSITE_PACKAGE_PREFETCH_MAX_SIZE") or 16 * 1024 * 1024
+)
+PACKAGE_CHUNK_SIZE = 1024 * 1024
+
+FORMATS = ("zip", "tar")
+
+# tipos de mídia comprimidos, gravados sem compressão
+COMPRESSED_MEDIA_TYPES = {
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-xz",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/epub+zip",
+}
+COMPRESSIBLE_IMAGE_TYPES = {"image/svg+xml", "image/bmp", "image/x-ms-bmp"}
+
+
+def get_compression(name):
+    """
+    ZIP_STORED para os arquivos já comprimidos, ZIP_DEFLATED para os demais
+    """
+    media_type, encoding = mimetypes.guess_type(name)
+    if encoding:
+        # .gz, .bz2, .xz etc
+        return ZIP_STORED
+    if not media_type:
+        return ZIP_DEFLATED
+    if media_type in COMPRESSED_MEDIA_TYPES:
+        return ZIP_STORED
+    if media_type.startswith(("video/", "audio/")):
+        return ZIP_STORED
+    if media_type.startswith("image/") and media_type not in COMPRESSIBLE_IMAGE_TYPES:
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+class PackageWriter:
+    """
+    Grava arquivos em um pacote zip ou tar
+
+    >>> with PackageWriter("/tmp/package.zip") as package:
+    ...     package.add("/path/a01.xml")
+    ...     package.add_files(["/path/a01.pdf", "/path/a01f1.jpg"])
+    >>> package.manifest
+    """
+
+    def __init__(
+        self,
+        target,
+        format="zip",
+        max_workers=None,
+        algorithm="sha256",
+        manifest_name=None,
+    ):
+        """
+        target : str or file object
+            caminho do pacote ou objeto com `write` (não precisa de `seek`)
+        max_workers : int
+            threads de leitura antecipada de `add_files`
+        algorithm : str
+            algoritmo (hashlib) do checksum do manifesto; None: sem checksum
+        manifest_name : str
+            se informado, o manifesto (JSON) é incluído no pacote com este nome
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown package format: {format}. Expected: {FORMATS}")
+        self.format = format
+        self.max_workers = max_workers or PACKAGE_MAX_WORKERS
+        self.algorithm = algorithm
+        self.manifest_name = manifest_name
+        self.manifest = []
+        self._fileobj = None
+        if isinstance(target, (str, os.PathLike)):
+            target = self._fileobj = open(target, "wb")
+        if format == "zip":
+            self._package = ZipFile(target, "w", ZIP_DEFLATED)
+        else:
+            self._package = tarfile.open(fileobj=target, mode="w|")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, path, arcname=None):
+        """
+        Grava o arquivo `path`, lido em blocos
+        """
+        arcname = arcname or os.path.basename(path)
+        digest = self._new_digest()
+        with open(path, "rb") as fp:
+            reader = _DigestReader(fp, digest)
+            if self.format == "zip":
+                zinfo = ZipInfo.from_file(path, arcname)
+                zinfo.compress_type = get_compression(arcname)
+                with self._package.open(zinfo, "w") as dest:
+                    while True:
+                        chunk = reader.read(PACKAGE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+            else:
+                tarinfo = self._package.gettarinfo(path, arcname)
+                self._package.addfile(tarinfo, reader)
+        self._register(arcname, reader.size, digest and digest.hexdigest())
+
+    def add_bytes(self, arcname, data):
+        """
+        Grava `data` (bytes) com o nome `arcname`
+        """
+        self._write_bytes(arcname, data, time.time())
+        self._register(arcname, len(data), self._checksum(data))
+
+    def add_files(self, paths):
+        """
+        Grava os arquivos `paths` (caminhos ou pares (caminho, nome)) na
+        ordem informada; os arquivos pequenos são lidos (e o checksum
+        calculado) antecipadamente, em paralelo
+        """
+        items = [(item, None) if isinstance(item, str) else item for item in paths]
+        if self.max_workers == 1:
+            for path, arcname in items:
+                self.add(path, arcname)
+            return
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for path, arcname in items:
+                pending.append((path, arcname, executor.submit(self._prefetch, path)))
+                if len(pending) >= window:
+                    self._add_prefetched(*pending.popleft())
+            while pending:
+                self._add_prefetched(*pending.popleft())
+
+    def close(self):
+        """
+        Finaliza o pacote
+
+        Returns
+        -------
+        list of dict
+            manifesto: [{"name", "size", "compression", "checksum"}, ...]
+        """
+        if self._package is None:
+            return self.manifest
+        if self.manifest_name:
+            data = json.dumps(
+                {"algorithm": self.algorithm, "files": self.manifest},
+                ensure_ascii=False,
+                indent=2,
+            ).encode("utf-8")
+            self._write_bytes(self.manifest_name, data, time.time())
+        self._package.close()
+        self._package = None
+        if self._fileobj:
+            self._fileobj.close()
+        return self.manifest
+
+    def _prefetch(self, path):
+        st = os.stat(path)
+        if st.st_size > PACKAGE_PREFETCH_MAX_SIZE:
+            return None
+        with open(path, "rb") as fp:
+            data = fp.read()
+        return data, st.st_mtime, self._checksum(data)
+
+    def _new_digest(self):
+        return hashlib.new(self.algorithm) if self.algorithm else None
+
+    def _checksum(self, data):
+        return self.algorithm and hashlib.new(self.algorithm, data).hexdigest()
+
+    def _add_prefetched(self, path, arcname, future):
+        prefetched = future.result()
+        if prefetched is None:
+            self.add(path, arcname)
+            return
+        data, mtime, checksum = prefetched
+        arcname = arcname or os.path.basename(path)
+        self._write_bytes(arcname, data, mtime, path)
+        self._register(arcname, len(data), checksum)
+
+    def _write_bytes(self, arcname, data, mtime, path=None):
+        if self.format == "zip":
+            if path:
+                zinfo = ZipInfo.from_file(path, arcname)
+            else:
+                zinfo = ZipInfo(arcname, time.localtime(mtime)[:6])
+                zinfo.external_attr = 0o644 << 16
+            zinfo.compress_type = get_compression(arcname)
+            self._package.writestr(zinfo, data)
+        else:
+            if path:
+                tarinfo = self._package.gettarinfo(path, arcname)
+            else:
+                tarinfo = tarfile.TarInfo(arcname)
+                tarinfo.mtime = mtime
+                tarinfo.mode = 0o644
+            tarinfo.size = len(data)
+            self._package.addfile(tarinfo, io.BytesIO(data))
+
+    def _register(self, arcname, size, checksum):
+        compression = None
+        if self.format == "zip":
+            compression = "stored" if get_compression(arcname) == ZIP_STORED else "deflated"
+        self.manifest.append(
+            {
+                "name": arcname,
+                "size": size,
+                "compression": compression,
+                "checksum": checksum,
+            }
+        )
+
+
+class _DigestReader:
+    # leitor que atualiza o checksum com os bytes lidos
+    def __init__(self, fp, digest):
+        self.fp = fp
+        self.digest = digest
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.fp.read(size)
+        if self.digest:
+            self.digest.update(data)
+        self.size += len(data)
+        return data
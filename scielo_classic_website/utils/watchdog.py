@@ -0,0 +1,188 @@
+"""
+Limites de tempo e de memória por documento.
+
+`Watchdog` verifica periodicamente (SIGALRM) o tempo decorrido e o
+crescimento da memória (RSS) do processo e, se algum limite for excedido,
+interrompe o processamento com `DocumentBudgetExceeded`, que informa a
+etapa (função `convert_html_to_xml_step_*` ou `get_xml_rsps`) e a pipe em
+execução.
+
+Os limites são do documento, não de cada `with`: uma instância mede o tempo
+e a memória desde a primeira entrada, somando todas as etapas. `grant`
+concede um tempo adicional a um caminho alternativo (mais simples), depois
+que os limites foram excedidos.
+
+O sinal só é tratado entre instruções Python: um trecho longo em C (lxml,
+regex) é interrompido somente quando retorna. Com `kill=True` (processos do
+`BatchConverter`), o limite de tempo de CPU do processo (RLIMIT_CPU) é
+ajustado para `KILL_FACTOR` vezes o limite de tempo; ao excedê-lo o processo
+é encerrado pelo sistema.
+
+Funciona somente na thread principal; nas demais, não há verificação.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import plumber
+
+from scielo_classic_website.exceptions import DocumentBudgetExceeded
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+WATCHDOG_INTERVAL = float(os.environ.get("CLASSIC_WEBSITE_WATCHDOG_INTERVAL") or 0.05)
+KILL_FACTOR = 2
+
+STEPS = ("convert_html_to_xml_step_", "get_xml_rsps")
+
+
+def get_rss():
+    """
+    Memória residente (bytes) do processo
+    """
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return None
+        # pico (Linux: KiB)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_stage(frame):
+    """
+    Etapa e pipe em execução em `frame`, por exemplo,
+    "convert_html_to_xml_step_50_break_to_p > FixParagraphAbsencePipe"
+    """
+    pipe = None
+    while frame is not None:
+        name = frame.f_code.co_name
+        if pipe is None:
+            obj = frame.f_locals.get("self")
+            if isinstance(obj, plumber.Pipe):
+                pipe = type(obj).__name__
+        if name.startswith(STEPS):
+            return " > ".join(item for item in (name, pipe) if item)
+        frame = frame.f_back
+    return pipe
+
+
+class Watchdog:
+    """
+    Uma instância por documento
+
+    >>> watchdog = Watchdog(time_limit=30, memory_limit=512 * 1024 * 1024)
+    >>> with watchdog:
+    ...     document.generate_body_and_back_from_html()
+    >>> with watchdog:
+    ...     document.generate_full_xml()
+    """
+
+    def __init__(self, time_limit=None, memory_limit=None, interval=None, kill=False):
+        """
+        time_limit : float
+            segundos
+        memory_limit : int
+            crescimento máximo da memória residente (bytes)
+        """
+        self.time_limit = time_limit or None
+        self.memory_limit = memory_limit or None
+        self.interval = interval or WATCHDOG_INTERVAL
+        self.kill = kill and resource is not None
+        self._active = False
+        self._start = None
+        self._rss = None
+        self._cpu_start = None
+        # tempo concedido além de `time_limit` (`grant`)
+        self._extra = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.time_limit or self.memory_limit)
+
+    @property
+    def elapsed(self):
+        if self._start is None:
+            return 0.0
+        return time.monotonic() - self._start
+
+    def grant(self, seconds):
+        """
+        Concede `seconds` a partir de agora, além do limite de tempo, e
+        reinicia a medida da memória; para o caminho alternativo de um
+        documento que excedeu os limites
+        """
+        if self._start is None:
+            return
+        if self.time_limit:
+            self._extra = max(self.elapsed - self.time_limit, 0.0) + (seconds or 0)
+        self._rss = self.memory_limit and get_rss()
+
+    def __enter__(self):
+        self._active = (
+            self.enabled
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+        if not self._active:
+            return self
+        if self._start is None:
+            # início do documento
+            self._start = time.monotonic()
+            self._rss = self.memory_limit and get_rss()
+            if self.kill and self.time_limit:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                self._cpu_start = usage.ru_utime + usage.ru_stime
+        self._previous_handler = signal.signal(signal.SIGALRM, self._tick)
+        signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+        self._cpu_limit = None
+        if self._cpu_start is not None:
+            self._set_cpu_limit()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if not self._active:
+            return
+        # primeiro desarma o timer; um sinal tratado durante __exit__ é
+        # ignorado por `_tick`, e um sinal pendente, depois de restaurado o
+        # tratamento anterior, por `_active`
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self._previous_handler)
+        if self._cpu_limit:
+            resource.setrlimit(resource.RLIMIT_CPU, self._cpu_limit)
+        self._active = False
+
+    def _set_cpu_limit(self):
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        limit = (
+            int(self._cpu_start + (self.time_limit + self._extra) * KILL_FACTOR) + 1
+        )
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+        self._cpu_limit = (soft, hard)
+
+    def _tick(self, signum, frame):
+        if not self._active or (frame and frame.f_code is _EXIT_CODE):
+            return
+        # enquanto o limite estiver excedido, a exceção é lançada a cada
+        # verificação, mesmo que capturada por um `except:`
+        elapsed = self.elapsed
+        time_limit = self.time_limit and self.time_limit + self._extra
+        if time_limit and elapsed > time_limit:
+            raise DocumentBudgetExceeded("time", get_stage(frame), time_limit, elapsed)
+        if self.memory_limit and self._rss is not None:
+            growth = (get_rss() or 0) - self._rss
+            if growth > self.memory_limit:
+                raise DocumentBudgetExceeded(
+                    "memory", get_stage(frame), self.memory_limit, growth
+                )
+
+
+_EXIT_CODE = Watchdog.__exit__.__code__
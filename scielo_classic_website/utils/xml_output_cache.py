@@ -0,0 +1,231 @@
+"""
+Cache dos XML (SPS) gerados, endereçado pelo conteúdo.
+
+A chave é o checksum (SHA-256) de tudo o que determina o XML do documento:
+os registros ISIS usados pelo documento (tipos o, f, c e p de article ou,
+se article não tiver registros p, os de paragraph), os registros do
+periódico e do fascículo, os textos das traduções, o conteúdo dos arquivos
+HTML referenciados para serem embedados (lidos por `html_reader`),
+`params_for_xml_creation` e a versão da biblioteca (versão do pacote e
+checksum dos seus arquivos). Se nada mudou, o XML e as exceções guardados
+são retornados sem executar as pipes.
+
+Os itens são arquivos (JSON compactado) em `folder`/ab/abcdef....json.gz,
+gravados de forma atômica; o cache pode ser compartilhado por processos.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+
+from scielo_classic_website.htmlbody.html_merger import HTMLMerger
+
+XML_CACHE_PATH = os.environ.get("CLASSIC_WEBSITE_XML_CACHE_PATH")
+
+RECORD_TYPES = ("o", "f", "c", "p")
+EMBEDDED_HTML_ENCODING = "iso-8859-1"
+
+HREF = re.compile(r"""href\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=None)
+def get_library_version():
+    """
+    Versão do pacote e checksum dos seus arquivos; muda a cada alteração do
+    código, mesmo sem nova versão
+    """
+    try:
+        version = metadata.version("scielo_classic_website")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(PACKAGE_DIRECTORY):
+        dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith((".pyc", ".pyo")):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, PACKAGE_DIRECTORY).encode("utf-8"))
+            with open(path, "rb") as fp:
+                digest.update(fp.read())
+    return f"{version}+{digest.hexdigest()[:16]}"
+
+
+def _get_value(record, tag):
+    try:
+        return record[tag][0]["_"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _checksum(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def get_document_records(item):
+    """
+    Registros de `item` usados por `Document` (ver `DocumentRecords`): os de
+    article dos tipos `RECORD_TYPES` e, se article não tiver registros p, os
+    de paragraph
+    """
+    records = [
+        record
+        for record in item.get("article") or []
+        if _get_value(record, "v706") in RECORD_TYPES
+    ]
+    if not any(_get_value(record, "v706") == "p" for record in records):
+        records.extend(item.get("paragraph") or [])
+    return records
+
+
+def get_embedded_html(texts, journal_acron, html_reader=None):
+    """
+    {arquivo: checksum do conteúdo} dos arquivos HTML locais referenciados
+    em `texts` e, recursivamente, nos próprios arquivos
+
+    Sem `html_reader`, o conteúdo não é lido (MarkHTMLFileToEmbedPipe
+    também não o lê) e o checksum é None
+    """
+    journal_acron_folder = journal_acron and f"/{journal_acron}/"
+    merger = HTMLMerger(journal_acron_folder=journal_acron_folder)
+    found = {}
+    pending = list(texts)
+    while pending:
+        text = pending.pop()
+        for href in HREF.findall(text or ""):
+            if not merger.is_link_to_local_html_file(href):
+                continue
+            file_path, anchor = merger.parse_href(href)
+            if file_path in found:
+                continue
+            found[file_path] = None
+            if html_reader is None:
+                continue
+            try:
+                content = html_reader(
+                    file_path, EMBEDDED_HTML_ENCODING, journal_acron_folder
+                )
+            except Exception as e:
+                logging.info(f"get_embedded_html {file_path}: {e}")
+                continue
+            if content is None:
+                continue
+            found[file_path] = _checksum(content)
+            if isinstance(content, bytes):
+                content = content.decode(EMBEDDED_HTML_ENCODING)
+            pending.append(content)
+    return found
+
+
+def get_document_key(
+    item, journal=None, params_for_xml_creation=None, html_reader=None
+):
+    """
+    Chave de um item de `ClassicWebsite.get_issue_doc_records` (ver
+    `batch_converter.convert_document`)
+    """
+    records = get_document_records(item)
+    journal = item.get("title") or journal
+    translations = item.get("translations") or {}
+    texts = [_get_value(record, "v704") for record in records]
+    for parts in translations.values():
+        texts.extend(parts.values())
+    data = {
+        "version": get_library_version(),
+        "records": records,
+        "journal": journal,
+        "issue": item.get("issue"),
+        "translations": translations,
+        "embedded_html": get_embedded_html(
+            texts, _get_value(journal, "v068"), html_reader
+        ),
+        "params_for_xml_creation": params_for_xml_creation or {},
+    }
+    content = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return _checksum(content)
+
+
+class XMLOutputCache:
+    """
+    XML e exceções por chave (`get_document_key`)
+
+    >>> cache = XMLOutputCache("/tmp/xml_cache")
+    >>> key = get_document_key(item, journal)
+    >>> cache.get(key) or cache.set(key, pid, xml, exceptions)
+    """
+
+    def __init__(self, folder=None):
+        self.folder = folder or XML_CACHE_PATH
+        if not self.folder:
+            raise ValueError(
+                "XMLOutputCache requires folder or CLASSIC_WEBSITE_XML_CACHE_PATH"
+            )
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+    def merge(self, stats):
+        """
+        Agrega `stats` (de outro processo, por exemplo)
+        """
+        self.hits += stats.get("hits", 0)
+        self.misses += stats.get("misses", 0)
+        self.stores += stats.get("stores", 0)
+
+    def _path(self, key):
+        return os.path.join(self.folder, key[:2], f"{key}.json.gz")
+
+    def get(self, key):
+        """
+        Returns
+        -------
+        tuple
+            (xml, exceptions) ou None
+        """
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            # item incompleto ou corrompido: será gravado novamente
+            logging.warning(f"XMLOutputCache {key}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        xml = data["xml"]
+        if data.get("bytes"):
+            xml = xml.encode("utf-8")
+        return xml, data["exceptions"]
+
+    def set(self, key, pid, xml, exceptions):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = {
+            "pid": pid,
+            "bytes": isinstance(xml, bytes),
+            "xml": xml.decode("utf-8") if isinstance(xml, bytes) else xml,
+            "exceptions": exceptions,
+        }
+        # grava em arquivo temporário e renomeia: nunca fica incompleto
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as fp:
+                json.dump(data, fp, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        self.stores += 1
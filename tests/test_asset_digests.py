@@ -0,0 +1,84 @@
+import hashlib
+import os
+import tempfile
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.utils.asset_digests import AssetDigests
+from scielo_classic_website.utils.fs_inventory import FileInventory
+
+
+class AssetDigestsTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = {}
+        for name, content in (
+            ("v1n1/logo.gif", b"logo"),
+            ("v1n1/a01f1.gif", b"figure"),
+            ("fbpe/v1n1/a01f1.gif", b"figure"),
+            ("v1n2/logo.gif", b"logo"),
+        ):
+            path = os.path.join(self.tmpdir.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fp:
+                fp.write(content)
+            self.paths[name] = path
+        self.inventory = FileInventory(
+            os.path.join(self.tmpdir.name, "inventory.db"), [self.tmpdir.name]
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def items(self, *names):
+        return [{"path": self.paths[name]} for name in names]
+
+    def test_compute(self):
+        digests = AssetDigests(max_workers=2).compute(self.paths.values())
+        self.assertEqual(
+            hashlib.sha256(b"logo").hexdigest(), digests[self.paths["v1n1/logo.gif"]]
+        )
+        self.assertEqual(4, len(digests))
+
+    def test_compute_blake2(self):
+        digests = AssetDigests(algorithm="blake2b").compute([self.paths["v1n1/logo.gif"]])
+        self.assertEqual(
+            hashlib.blake2b(b"logo").hexdigest(), digests[self.paths["v1n1/logo.gif"]]
+        )
+
+    def test_mark_duplicates_within_and_across_issues(self):
+        digests = AssetDigests()
+        issue = digests.mark(self.items("v1n1/logo.gif", "v1n1/a01f1.gif", "fbpe/v1n1/a01f1.gif"))
+        self.assertNotIn("duplicate_of", issue[0])
+        self.assertNotIn("duplicate_of", issue[1])
+        self.assertEqual(self.paths["v1n1/a01f1.gif"], issue[2]["duplicate_of"])
+
+        other_issue = digests.mark(self.items("v1n2/logo.gif"))
+        self.assertEqual(self.paths["v1n1/logo.gif"], other_issue[0]["duplicate_of"])
+        self.assertEqual({"computed": 4, "reused": 0, "unique": 2}, digests.stats)
+
+    def test_stored_digests_are_reused(self):
+        AssetDigests(self.inventory).compute(self.paths.values())
+        digests = AssetDigests(self.inventory)
+        with patch("scielo_classic_website.utils.asset_digests.FileContent") as mock:
+            result = digests.compute(self.paths.values())
+            mock.assert_not_called()
+        self.assertEqual(4, len(result))
+        self.assertEqual(4, digests.reused)
+
+    def test_changed_file_is_hashed_again(self):
+        AssetDigests(self.inventory).compute(self.paths.values())
+        time.sleep(0.01)
+        with open(self.paths["v1n1/logo.gif"], "wb") as fp:
+            fp.write(b"new logo")
+        digests = AssetDigests(self.inventory)
+        result = digests.compute(self.paths.values())
+        self.assertEqual(
+            hashlib.sha256(b"new logo").hexdigest(), result[self.paths["v1n1/logo.gif"]]
+        )
+        self.assertEqual(1, digests.computed)
+
+    def test_missing_file(self):
+        result = AssetDigests().mark([{"path": os.path.join(self.tmpdir.name, "x.gif")}])
+        self.assertNotIn("digest", result[0])
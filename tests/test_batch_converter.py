@@ -0,0 +1,257 @@
+import multiprocessing
+import os
+import time
+from unittest import TestCase, mock
+
+from scielo_classic_website.models import batch_converter
+from scielo_classic_website.models.batch_converter import (
+    BatchConverter,
+    ConversionResult,
+    convert_document,
+)
+from scielo_classic_website.spsxml.sps_xml_body_pipes import FixParagraphAbsencePipe
+from scielo_classic_website.spsxml.sps_xml_pipes import XMLArticleMetaCountsPipe
+
+
+def _get_journal():
+    return {
+        "v068": [{"_": "jacron"}],
+        "v100": [{"_": "Título do Periódico"}],
+        "v150": [{"_": "Título Abreviado do Periódico"}],
+        "v435": [{"_": "1234-5678", "t": "PRINT"}],
+        "v310": [{"_": "BR"}],
+        "v320": [{"_": "SP"}],
+        "v490": [{"_": "São Paulo"}],
+        "v480": [{"_": "XXX Society"}],
+    }
+
+
+def _get_item(i):
+    pid = f"S1234-5678199900030{i:04d}"
+    record = {
+        "v880": [{"_": pid}],
+        "v702": [{"_": "jacron/v49n3/a01.htm"}],
+        "v040": [{"_": "pt"}],
+        "v012": [{"_": f"Título {i}", "l": "pt"}],
+    }
+    paragraphs = [
+        {
+            "v706": [{"_": "p"}],
+            "v704": [{"_": f"<p><b>Introdução</b></p><p>Texto {i}.{k}<br>linha</p>"}],
+        }
+        for k in range(3)
+    ]
+    return {
+        "issue_id": pid[1:18],
+        "doc_id": pid,
+        "issue": {
+            "v706": [{"_": "i"}],
+            "v031": [{"_": "49"}],
+            "v032": [{"_": "3"}],
+            "v065": [{"_": "19990900"}],
+            "v880": [{"_": pid[1:18]}],
+        },
+        "article": [
+            dict(record, v706=[{"_": "o"}]),
+            dict(record, v706=[{"_": "f"}]),
+        ]
+        + paragraphs,
+    }
+
+
+class ConvertDocumentTest(TestCase):
+    def test_convert_document(self):
+        result = convert_document(_get_item(1), journal=_get_journal())
+        self.assertIsInstance(result, ConversionResult)
+        self.assertEqual("S1234-56781999000300001", result.pid)
+        self.assertIn(b"<body", result.xml)
+        self.assertIn("Texto 1.2".encode("utf-8"), result.xml)
+
+    def test_convert_document_uses_paragraph_records(self):
+        item = _get_item(1)
+        item["paragraph"] = [
+            record for record in item["article"] if record["v706"][0]["_"] == "p"
+        ]
+        item["article"] = item["article"][:2]
+        result = convert_document(item, journal=_get_journal())
+        self.assertIn(b"<body", result.xml)
+        self.assertIn("Texto 1.2".encode("utf-8"), result.xml)
+
+    def test_convert_document_uses_translations(self):
+        item = _get_item(1)
+        item["translations"] = {
+            "en": {"before references": "<p>English text</p>", "after references": ""}
+        }
+        result = convert_document(item, journal=_get_journal())
+        self.assertIn(b"English text", result.xml)
+
+    def test_convert_document_uses_params_for_xml_creation(self):
+        result = convert_document(
+            _get_item(1),
+            journal=_get_journal(),
+            params_for_xml_creation={"specific-use": "sps-1.9"},
+        )
+        self.assertIn(b'specific-use="sps-1.9"', result.xml)
+
+    def test_convert_document_invalid_records(self):
+        result = convert_document({"invalid_records": True, "id": "x", "records": []})
+        self.assertEqual("x", result.pid)
+        self.assertIsNone(result.xml)
+        self.assertEqual("invalid_records", result.exceptions[0]["type"])
+
+    def test_convert_document_registers_failure(self):
+        item = _get_item(1)
+        item["issue"] = None
+        result = convert_document(item, journal=_get_journal())
+        self.assertIsNone(result.xml)
+        self.assertEqual("convert_document", result.exceptions[-1]["action"])
+
+
+class BatchConverterTest(TestCase):
+    def setUp(self):
+        self.items = [_get_item(i) for i in range(7)]
+        self.expected = [
+            convert_document(item, journal=_get_journal()) for item in self.items
+        ]
+
+    def test_convert_in_process(self):
+        converter = BatchConverter(journal=_get_journal(), max_workers=1)
+        with mock.patch.dict(batch_converter._WORKER, clear=True):
+            self.assertEqual(self.expected, list(converter.convert(iter(self.items))))
+            # o cache de HTML não sobrevive à chamada
+            self.assertEqual({}, batch_converter._WORKER)
+
+    def test_convert_ordered(self):
+        converter = BatchConverter(
+            journal=_get_journal(), max_workers=2, chunksize=2, max_pending=2
+        )
+        self.assertEqual(self.expected, list(converter.convert(iter(self.items))))
+
+    def test_convert_as_completed(self):
+        converter = BatchConverter(
+            journal=_get_journal(), max_workers=2, chunksize=3, ordered=False
+        )
+        result = list(converter.convert(iter(self.items)))
+        self.assertEqual(self.expected, sorted(result, key=lambda item: item.pid))
+
+
+def _slow_transform(self, data, seconds=5):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+    return data
+
+
+class ConvertDocumentBudgetTest(TestCase):
+    def test_html_conversion_exceeds_time_limit(self):
+        with mock.patch.object(FixParagraphAbsencePipe, "transform", _slow_transform):
+            result = convert_document(
+                _get_item(1), journal=_get_journal(), time_limit=0.2
+            )
+        self.assertIn(b"<front>", result.xml)
+        self.assertNotIn(b"<body", result.xml)
+        self.assertEqual(1, len(result.exceptions))
+        exception = result.exceptions[0]
+        self.assertEqual("DocumentBudgetExceeded", exception["type"])
+        self.assertEqual("time", exception["detail"]["budget"])
+        self.assertEqual("without body", exception["detail"]["fallback"])
+        self.assertEqual(
+            "convert_html_to_xml_step_50_break_to_p > FixParagraphAbsencePipe",
+            exception["detail"]["stage"],
+        )
+
+    def test_xml_generation_exceeds_time_limit(self):
+        with mock.patch.object(XMLArticleMetaCountsPipe, "transform", _slow_transform):
+            result = convert_document(
+                _get_item(1), journal=_get_journal(), time_limit=0.2
+            )
+        self.assertIsNone(result.xml)
+        self.assertEqual(
+            ["get_xml_rsps > XMLArticleMetaCountsPipe"] * 2,
+            [item["detail"]["stage"] for item in result.exceptions],
+        )
+        self.assertEqual("without body", result.exceptions[0]["detail"]["fallback"])
+
+    def test_budget_is_per_document(self):
+        # a conversão do HTML usa quase todo o tempo do documento
+        def slow_html(self, data):
+            return _slow_transform(self, data, 0.35)
+
+        start = time.monotonic()
+        with mock.patch.object(FixParagraphAbsencePipe, "transform", slow_html):
+            with mock.patch.object(
+                XMLArticleMetaCountsPipe, "transform", _slow_transform
+            ):
+                result = convert_document(
+                    _get_item(1), journal=_get_journal(), time_limit=0.4
+                )
+        # limite do documento (0.4) mais o tempo do XML sem body (0.1)
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(
+            ["get_xml_rsps > XMLArticleMetaCountsPipe"] * 2,
+            [item["detail"]["stage"] for item in result.exceptions],
+        )
+
+    def test_without_body(self):
+        result = convert_document(
+            _get_item(1), journal=_get_journal(), without_body=True
+        )
+        self.assertIn(b"<front>", result.xml)
+        self.assertNotIn(b"<body", result.xml)
+        self.assertEqual("process", result.exceptions[0]["detail"]["budget"])
+
+
+def _exit_on_second_document(document, watchdog):
+    if document.data["article"][0]["v880"][0]["_"].endswith("0002"):
+        os._exit(1)
+    return _generate_full_xml(document, watchdog)
+
+
+_generate_full_xml = batch_converter._generate_full_xml
+
+
+class BatchConverterTerminatedProcessTest(TestCase):
+    def test_terminated_process_does_not_stop_the_batch(self):
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("requires fork")
+        items = [_get_item(i) for i in range(6)]
+        with mock.patch.object(
+            batch_converter, "_generate_full_xml", _exit_on_second_document
+        ):
+            converter = BatchConverter(
+                journal=_get_journal(), max_workers=2, chunksize=2
+            )
+            results = list(converter.convert(iter(items)))
+        self.assertEqual([item["doc_id"] for item in items], [r.pid for r in results])
+        failed = [r.pid for r in results if r.xml is None]
+        self.assertEqual(["S1234-56781999000300002"], failed)
+        self.assertIn("process terminated", results[2].exceptions[0]["message"])
+
+
+def _stuck_in_c_code(self, data):
+    raw, xml = data
+    if raw.data["article"][0]["v880"][0]["_"].endswith("0001"):
+        # laço em C: não é interrompido pelo sinal
+        sum(range(10**11))
+    return data
+
+
+class BatchConverterCPULimitTest(TestCase):
+    def test_process_stuck_in_c_code_is_terminated(self):
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("requires fork")
+        items = [_get_item(i) for i in range(3)]
+        with mock.patch.object(FixParagraphAbsencePipe, "transform", _stuck_in_c_code):
+            converter = BatchConverter(
+                journal=_get_journal(), max_workers=2, chunksize=1, time_limit=0.2
+            )
+            results = list(converter.convert(iter(items)))
+        self.assertEqual([item["doc_id"] for item in items], [r.pid for r in results])
+        # encerrado também no isolamento: convertido sem body
+        self.assertIn(b"<front>", results[1].xml)
+        self.assertNotIn(b"<body", results[1].xml)
+        exception = results[1].exceptions[0]
+        self.assertIn("process terminated", exception["message"])
+        self.assertEqual("without body", exception["detail"]["fallback"])
+        self.assertIsNotNone(results[0].xml)
+        self.assertIsNotNone(results[2].xml)
@@ -0,0 +1,73 @@
+import difflib
+from unittest import TestCase
+
+from scielo_classic_website.utils import body_sec_type_matcher
+from scielo_classic_website.utils.body_sec_type_matcher import (
+    CandidateIndex,
+    get_best_matches,
+    get_sectype,
+)
+
+CANDIDATES = (
+    body_sec_type_matcher.SECTION_TYPES + body_sec_type_matcher.SECTION_TYPES_TO_IGNORE
+)
+
+WORDS = [
+    "",
+    "introduction",
+    "Introdução",
+    "methods",
+    "metodos",
+    "resultados",
+    "discussão",
+    "conclusion",
+    "referencias",
+    "material",
+    "abc",
+    "x",
+]
+
+
+class CandidateIndexTest(TestCase):
+    def test_same_result_as_difflib(self):
+        index = CandidateIndex(CANDIDATES)
+        for word in WORDS:
+            for n in (1, 3, 30):
+                for cutoff in (0.0, 0.1, 0.4, 0.6, 1.0):
+                    with self.subTest(word=word, n=n, cutoff=cutoff):
+                        self.assertEqual(
+                            difflib.get_close_matches(word, CANDIDATES, n, cutoff),
+                            index.get_close_matches(word, n, cutoff),
+                        )
+
+    def test_ties_are_resolved_as_difflib(self):
+        candidates = ["ab", "ba", "ac"]
+        index = CandidateIndex(candidates)
+        self.assertEqual(
+            difflib.get_close_matches("a", candidates, 2, 0.1),
+            index.get_close_matches("a", 2, 0.1),
+        )
+
+    def test_invalid_parameters(self):
+        index = CandidateIndex(CANDIDATES)
+        with self.assertRaises(ValueError):
+            index.get_close_matches("intro", 0, 0.5)
+        with self.assertRaises(ValueError):
+            index.get_close_matches("intro", 1, 1.5)
+
+
+class GetSectypeTest(TestCase):
+    def test_get_best_matches(self):
+        self.assertEqual(["intro"], get_best_matches("introduction"))
+
+    def test_get_sectype(self):
+        self.assertEqual("methods", get_sectype("metodos"))
+        self.assertEqual("materials|methods", get_sectype("materiais e métodos"))
+        self.assertEqual("", get_sectype("referencias"))
+        self.assertIsNone(get_sectype("a very long section title"))
+
+    def test_get_sectype_is_cached(self):
+        body_sec_type_matcher._get_sectype.cache_clear()
+        get_sectype("resultados")
+        get_sectype("resultados")
+        self.assertEqual(1, body_sec_type_matcher._get_sectype.cache_info().hits)
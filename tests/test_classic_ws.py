@@ -0,0 +1,175 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.classic_ws import ClassicWebsite
+from scielo_classic_website.utils.file_content import FileContent
+
+ISSUES = [("acron", "v1n1"), ("acron", "v1n2"), ("other", "v2n1")]
+
+
+def classic_website(root):
+    bases = os.path.join(root, "bases")
+    return ClassicWebsite(
+        bases_path=bases,
+        bases_work_path=os.path.join(root, "bases-work"),
+        bases_translation_path=os.path.join(bases, "translation"),
+        bases_pdf_path=os.path.join(bases, "pdf"),
+        bases_xml_path=os.path.join(bases, "xml"),
+        htdocs_img_revistas_path=os.path.join(root, "htdocs", "img", "revistas"),
+        serial_path=os.path.join(root, "serial"),
+        cisis_path=None,
+        title_path=None,
+        issue_path=None,
+    )
+
+
+class GetIssuesFilesTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        for acron, issue_folder in ISSUES:
+            for folder, name in (
+                (("bases", "xml"), "a01.xml"),
+                (("bases", "pdf"), "a01.pdf"),
+                (("htdocs", "img", "revistas"), "a01f1.jpg"),
+            ):
+                path = os.path.join(self.tmpdir.name, *folder, acron, issue_folder)
+                os.makedirs(path)
+                with open(os.path.join(path, name), "wb") as fp:
+                    fp.write(acron.encode())
+        self.website = classic_website(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_issues_files_and_exceptions(self):
+        responses = list(
+            self.website.get_issues_files_and_exceptions(ISSUES, max_workers=2)
+        )
+        self.assertEqual(
+            sorted(ISSUES),
+            sorted((item["acron"], item["issue_folder"]) for item in responses),
+        )
+        for response in responses:
+            with self.subTest(issue=response["issue_folder"]):
+                expected = self.website.get_issue_files_and_exceptions(
+                    response["acron"], response["issue_folder"]
+                )
+                self.assertEqual(
+                    sorted(item["path"] for item in expected["files"]),
+                    sorted(item["path"] for item in response["files"]),
+                )
+
+    def test_get_issues_folder_content(self):
+        responses = list(
+            self.website.get_issues_folder_content(ISSUES, max_workers=2, read=True)
+        )
+        self.assertEqual(3, len(responses))
+        for response in responses:
+            self.assertEqual(3, len(response["files"]))
+            self.assertIn("content", response["files"][0])
+
+    def test_get_issues_folder_content_without_reading(self):
+        with patch.object(FileContent, "read") as mock:
+            responses = list(
+                self.website.get_issues_folder_content(ISSUES, max_workers=2)
+            )
+        mock.assert_not_called()
+        for response in responses:
+            self.assertEqual(3, len(response["files"]))
+            self.assertNotIn("content", response["files"][0])
+
+    def test_error_is_returned(self):
+        with patch.object(
+            ClassicWebsite,
+            "get_issue_files_and_exceptions",
+            side_effect=ValueError("invalid"),
+        ):
+            responses = list(self.website.get_issues_files_and_exceptions(ISSUES[:1]))
+        self.assertEqual(
+            [
+                {
+                    "error": "invalid",
+                    "error_type": "ValueError",
+                    "acron": "acron",
+                    "issue_folder": "v1n1",
+                }
+            ],
+            responses,
+        )
+
+    def test_back_pressure(self):
+        submitted = []
+        release = threading.Event()
+
+        def issues():
+            for issue in ISSUES * 4:
+                submitted.append(issue)
+                yield issue
+
+        def get_files(acron, issue_folder):
+            release.wait(5)
+            return {"files": []}
+
+        with patch.object(
+            ClassicWebsite, "get_issue_files_and_exceptions", side_effect=get_files
+        ):
+            responses = self.website.get_issues_files_and_exceptions(
+                issues(), max_workers=2, max_pending=3
+            )
+            release.set()
+            next(responses)
+            self.assertLessEqual(len(submitted), 3)
+            self.assertEqual(11, len(list(responses)))
+
+
+class GetIssueDocumentsToConvertTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        folder = os.path.join(self.tmpdir.name, "bases", "translation", "acron", "v1n1")
+        os.makedirs(folder)
+        for name, text in (("en_a01.htm", "Before"), ("en_ba01.htm", "After")):
+            with open(os.path.join(folder, name), "wb") as fp:
+                fp.write(f"<p>{text} é</p>".encode("iso-8859-1"))
+        self.website = classic_website(self.tmpdir.name)
+        self.pid = "S1234-56781999000300001"
+        self.records = [
+            {"v706": [{"_": "o"}], "v702": [{"_": "acron\\v1n1\\a01.htm"}]},
+            {"v706": [{"_": "f"}], "v702": [{"_": "acron\\v1n1\\a01.htm"}]},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_items(self, records):
+        item = {"issue_id": self.pid[1:18], "doc_id": self.pid, "article": records}
+        with patch.object(
+            ClassicWebsite, "get_issue_doc_records", return_value=iter([item])
+        ), patch.object(
+            ClassicWebsite, "get_p_records", return_value=(self.pid, ["p"])
+        ) as mock:
+            items = list(
+                self.website.get_issue_documents_to_convert("acron", "v1n1")
+            )
+        return items, mock
+
+    def test_attaches_paragraph_records_and_translations(self):
+        items, mock = self.get_items(self.records)
+        mock.assert_called_once_with(self.pid)
+        self.assertEqual(["p"], items[0]["paragraph"])
+        self.assertEqual(
+            {
+                "en": {
+                    "before references": "<p>Before é</p>",
+                    "after references": "<p>After é</p>",
+                }
+            },
+            items[0]["translations"],
+        )
+
+    def test_paragraph_records_in_article(self):
+        items, mock = self.get_items(self.records + [{"v706": [{"_": "p"}]}])
+        mock.assert_not_called()
+        self.assertNotIn("paragraph", items[0])
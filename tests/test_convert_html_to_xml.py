@@ -0,0 +1,122 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.spsxml.sps_xml_body_pipes import convert_html_to_xml
+from scielo_classic_website.spsxml.xml_snapshots import remove_spill
+
+
+class Journal:
+    acronym = "acron"
+
+
+class FakeDocument:
+    def __init__(self):
+        self.main_html_paragraphs = {
+            "before references": (
+                '<!-- comment --><p align="center"><font size="4"><b>Title</b></font></p>'
+                '<p><b>INTRODUCTION</b></p><p>Text <i>italic</i> <a href="#B1">1</a><br><br>'
+                'see <a href="/img/revistas/acron/v1n1/t1.htm">Table 1</a></p>'
+                '<p><img src="/img/revistas/acron/v1n1/f1.gif"></p><p><b></b></p>'
+            ),
+            "references": [
+                {"text": "1. Silva J. <i>Title</i>. 2001.", "index": "1", "reference_index": "1", "part": "references"},
+                {"text": "2. Souza M. Book &amp; co.", "index": "2", "reference_index": "2", "part": "references"},
+            ],
+            "after references": "<p><a name=\"back\"></a>* Correspondence</p>",
+        }
+        self.translated_html_by_lang = {
+            "es": {"before references": "<p><b>INTRODUCCIÓN</b></p><p>Texto</p>", "after references": ""},
+        }
+        self.pretty_print = False
+        self.exceptions = None
+        self.journal = Journal()
+        self.xml_body_and_back = None
+
+    def html_reader(self, path, encoding, journal_acron_folder):
+        return "<html><body><table><tr><td>cell</td></tr></table><p></p></body></html>"
+
+    def add_exception(self, action, exception_type, message, detail=None):
+        self.exceptions = (self.exceptions or []) + [action]
+
+
+class TestConvertHtmlToXmlSnapshots(TestCase):
+    def test_snapshots(self):
+        expected = FakeDocument()
+        convert_html_to_xml(expected, retention="all")
+        result = FakeDocument()
+        convert_html_to_xml(result, snapshots=["convert_html_to_xml_step_30_embed_html"])
+        self.assertEqual(
+            [expected.xml_body_and_back[2], expected.xml_body_and_back[-1]],
+            result.xml_body_and_back,
+        )
+
+
+class TestConvertHtmlToXmlRetention(TestCase):
+    def _convert(self, retention, **kwargs):
+        document = FakeDocument()
+        convert_html_to_xml(document, retention=retention, **kwargs)
+        return document
+
+    def test_all_keeps_every_step(self):
+        document = self._convert("all")
+        self.assertEqual(9, len(document.xml_body_and_back))
+
+    def test_last_keeps_final_result(self):
+        expected = self._convert("all")
+        document = self._convert("last")
+        self.assertEqual([expected.xml_body_and_back[-1]], document.xml_body_and_back)
+
+    def test_failures_keeps_snapshot_before_failed_step(self):
+        expected = self._convert("all")
+        document = FakeDocument()
+        with patch(
+            "scielo_classic_website.spsxml.sps_xml_body_pipes.MarkHTMLFileToEmbedPipe.transform",
+            side_effect=ValueError("failure"),
+        ):
+            convert_html_to_xml(document, retention="failures")
+        self.assertEqual(1, len(document.exceptions))
+        self.assertEqual(2, len(document.xml_body_and_back))
+        # entrada da etapa 30 (que falhou) e resultado final
+        self.assertEqual(expected.xml_body_and_back[1], document.xml_body_and_back[0])
+
+    def test_spill_writes_steps_to_zip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch(
+                "scielo_classic_website.spsxml.xml_snapshots.XML_SNAPSHOTS_SPILL_DIR",
+                tmpdir,
+            ):
+                document = self._convert("spill")
+            self.assertEqual(1, len(document.xml_body_and_back))
+            with zipfile.ZipFile(document.xml_body_and_back_spill) as zf:
+                names = zf.namelist()
+                self.assertEqual(9, len(names))
+                self.assertEqual(
+                    document.xml_body_and_back[-1],
+                    zf.read(names[-1]).decode("utf-8"),
+                )
+
+    def test_spill_files_are_unique_and_removable(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch(
+                "scielo_classic_website.spsxml.xml_snapshots.XML_SNAPSHOTS_SPILL_DIR",
+                tmpdir,
+            ):
+                documents = [self._convert("spill") for i in range(2)]
+                first = documents[0].xml_body_and_back_spill
+                self.assertNotEqual(first, documents[1].xml_body_and_back_spill)
+
+                # nova conversão do mesmo documento substitui o arquivo
+                convert_html_to_xml(documents[0], retention="spill")
+                self.assertFalse(os.path.exists(first))
+
+            for document in documents:
+                remove_spill(document)
+                self.assertIsNone(document.xml_body_and_back_spill)
+            self.assertEqual([], os.listdir(tmpdir))
+
+    def test_invalid_retention(self):
+        with self.assertRaises(ValueError):
+            self._convert("none")
@@ -0,0 +1,94 @@
+import re
+from unittest import TestCase
+
+from scielo_classic_website.spsxml import detector
+from scielo_classic_website.spsxml.detector_patterns import PatternSet, from_lists
+from scielo_classic_website.spsxml.detector_title_parent import identify_parent_by_title
+
+
+def first_match(items, text):
+    for pattern, value in items:
+        if re.match(pattern, text):
+            return value
+
+
+def first_search(items, text):
+    for pattern, value in items:
+        if re.search(pattern, text):
+            return value
+
+
+ITEMS = [
+    (r"(?i)^conclus", "conclusions"),
+    (r"resultados?", "results"),
+    (r"(?i)^(result|discuss)", "discussion"),
+    (r"^a|b", "ab"),
+    (r"(?i)m[eé]todos?\s+(e|y)\s+materia(l|is)", "methods"),
+]
+
+TEXTS = [
+    "Conclusões",
+    "Resultados",
+    "results",
+    "Discussion and results",
+    "resultados e discussão",
+    "abc",
+    "cba",
+    "Métodos e materiais",
+    "Introduction",
+    "",
+]
+
+
+class PatternSetTest(TestCase):
+    def test_match_returns_first_pattern_in_order(self):
+        patterns = PatternSet(ITEMS)
+        for text in TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(first_match(ITEMS, text), patterns.match(text))
+
+    def test_search_returns_first_pattern_in_order(self):
+        patterns = PatternSet(ITEMS)
+        for text in TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(first_search(ITEMS, text), patterns.search(text))
+
+    def test_any(self):
+        patterns = PatternSet(ITEMS)
+        for text in TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(first_search(ITEMS, text) is not None, patterns.any(text))
+
+    def test_flags(self):
+        patterns = PatternSet([(r"^f\d+", "fig")], re.IGNORECASE)
+        self.assertEqual("fig", patterns.match("F1"))
+
+    def test_empty(self):
+        patterns = PatternSet([])
+        self.assertIsNone(patterns.match("a"))
+        self.assertIsNone(patterns.search("a"))
+        self.assertFalse(patterns.any("a"))
+
+    def test_from_lists(self):
+        patterns = from_lists({"intro": [r"(?i)^intro"], "methods": [r"(?i)^m[eé]todo"]})
+        self.assertEqual("methods", patterns.match("Métodos"))
+
+
+class DetectorCacheTest(TestCase):
+    def test_detect_element_type_result_can_be_changed(self):
+        result = detector.detect_element_type("Introduction")
+        result["original_title"] = "Introduction"
+        self.assertNotIn("original_title", detector.detect_element_type("Introduction"))
+
+    def test_cache_uses_normalized_title(self):
+        detector._detect_sec_type.cache_clear()
+        self.assertEqual("intro", detector.detect_sec_type("Introduction"))
+        self.assertEqual("intro", detector.detect_sec_type("  Introduction "))
+        self.assertEqual(1, detector._detect_sec_type.cache_info().hits)
+
+    def test_detectors(self):
+        self.assertEqual("results|discussion", detector.detect_sec_type("Results and Discussion"))
+        self.assertEqual(("fig", "fig", "f", "1"), detector.detect_from_text("Figure 1"))
+        self.assertEqual("fn", detector.detect_element_type("* Corresponding author")["element_type"])
+        self.assertEqual("ref-list", identify_parent_by_title("Referências"))
+        self.assertEqual("sec", identify_parent_by_title("2.1 Área de estudo"))
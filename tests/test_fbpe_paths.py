@@ -0,0 +1,79 @@
+import glob
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from scielo_classic_website.utils.fbpe_paths import FbpePathMap
+from scielo_classic_website.utils.fs_inventory import FileInventory
+
+DIRS = (
+    "img/fbpe/acron/v1n1",
+    "img/fbpe/fbpe/acron/v1n1",
+    "fbpe/acron/v1n2",
+    "x/fbpe/y/acron/v1n1",
+    "img/revistas/acron/v1n1",
+    "img/.hidden/fbpe/acron/v1n1",
+    "img/fbpe/v1n1",
+)
+
+
+class FbpePathMapTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "htdocs")
+        for name in DIRS:
+            os.makedirs(os.path.join(self.root, name))
+        self.inventory = FileInventory(
+            os.path.join(self.tmpdir.name, "inventory.db"), [self.root]
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def glob(self, acron, issue_folder):
+        pattern = os.path.join(self.root, "**", "fbpe", "**", acron, issue_folder)
+        return sorted(set(glob.glob(pattern, recursive=True)))
+
+    def test_get_is_equivalent_to_glob(self):
+        for inventory in (None, self.inventory):
+            fbpe_paths = FbpePathMap(self.root, inventory)
+            for acron, issue_folder in (
+                ("acron", "v1n1"),
+                ("acron", "v1n2"),
+                ("fbpe", "v1n1"),
+                ("acron", "v9n9"),
+            ):
+                with self.subTest(inventory=inventory, issue=issue_folder):
+                    self.assertEqual(
+                        self.glob(acron, issue_folder),
+                        fbpe_paths.get(acron, issue_folder),
+                    )
+
+    def test_get_returns_alternative_paths(self):
+        fbpe_paths = FbpePathMap(self.root)
+        self.assertEqual(
+            [
+                os.path.join(self.root, "img", "fbpe", "acron", "v1n1"),
+                os.path.join(self.root, "img", "fbpe", "fbpe", "acron", "v1n1"),
+                os.path.join(self.root, "x", "fbpe", "y", "acron", "v1n1"),
+            ],
+            fbpe_paths.get("acron", "v1n1"),
+        )
+
+    def test_refresh_after_inventory_refresh(self):
+        fbpe_paths = FbpePathMap(self.root, self.inventory)
+        self.assertEqual([], fbpe_paths.get("other", "v1n1"))
+
+        time.sleep(0.01)
+        new_path = os.path.join(self.root, "img", "fbpe", "other", "v1n1")
+        os.makedirs(new_path)
+        self.assertEqual([], fbpe_paths.get("other", "v1n1"))
+
+        self.inventory.refresh()
+        fbpe_paths.refresh()
+        self.assertEqual([new_path], fbpe_paths.get("other", "v1n1"))
+
+    def test_missing_root(self):
+        fbpe_paths = FbpePathMap(os.path.join(self.tmpdir.name, "missing"))
+        self.assertEqual([], fbpe_paths.get("acron", "v1n1"))
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.models.issue_folder import IssueFolder
+from scielo_classic_website.utils.file_content import FileContent
+
+DATA = bytes(range(256)) * 100
+
+
+class FileContentTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "a01.pdf")
+        with open(self.path, "wb") as fp:
+            fp.write(DATA)
+        self.empty = os.path.join(self.tmpdir.name, "empty.gif")
+        open(self.empty, "wb").close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_read(self):
+        content = FileContent(self.path)
+        self.assertEqual(len(DATA), content.size)
+        self.assertEqual(DATA, content.read())
+
+    def test_chunks(self):
+        chunks = list(FileContent(self.path).chunks(1000))
+        self.assertEqual(26, len(chunks))
+        self.assertEqual(DATA, b"".join(chunks))
+
+    def test_mmap(self):
+        with FileContent(self.path).mmap() as mapped:
+            self.assertEqual(DATA[10:20], mapped[10:20])
+        with FileContent(self.empty).mmap() as mapped:
+            self.assertEqual(b"", mapped[:])
+
+    def test_checksum(self):
+        self.assertEqual(
+            hashlib.sha256(DATA).hexdigest(), FileContent(self.path).checksum(chunk_size=7)
+        )
+        self.assertEqual(hashlib.md5(DATA).hexdigest(), FileContent(self.path).checksum("md5"))
+
+    def test_too_large(self):
+        self.assertFalse(FileContent(self.path, max_size=0).too_large)
+        self.assertFalse(FileContent(self.path, max_size=len(DATA)).too_large)
+        self.assertTrue(FileContent(self.path, max_size=len(DATA) - 1).too_large)
+
+
+class IssueFolderFilesTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        folder = os.path.join(self.tmpdir.name, "bases", "pdf", "acron", "v1n1")
+        os.makedirs(folder)
+        for name, size in (("a01.pdf", 10), ("en_a01.pdf", 1000)):
+            with open(os.path.join(folder, name), "wb") as fp:
+                fp.write(b"x" * size)
+        self.paths = SimpleNamespace(
+            bases_pdf_path=os.path.join(self.tmpdir.name, "bases", "pdf")
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get_files(self, **kwargs):
+        folder = IssueFolder("acron", "v1n1", self.paths, **kwargs)
+        return {item["name"]: item for item in folder.bases_pdf_files}
+
+    def test_metadata_only_by_default(self):
+        with patch.object(FileContent, "read") as mock:
+            files = self.get_files()
+        mock.assert_not_called()
+        item = files["a01.pdf"]
+        self.assertNotIn("content", item)
+        self.assertEqual(10, item.file.size)
+        item.load_content()
+        self.assertEqual(b"x" * 10, item["content"])
+
+    def test_items_keep_content_and_expose_file_content(self):
+        files = self.get_files(read_content=True)
+        item = files["a01.pdf"]
+        self.assertEqual(b"x" * 10, item["content"])
+        self.assertEqual(b"x" * 10, dict(item)["content"])
+        self.assertNotIn("content_too_large", item)
+        self.assertNotIn("file", item)
+        self.assertEqual(10, item.file.size)
+        self.assertEqual(FileContent(item["path"]).checksum(), item.file.checksum())
+
+    def test_max_size(self):
+        with patch.object(FileContent, "read", return_value=b"x" * 10) as mock:
+            files = self.get_files(max_size=100, read_content=True)
+        mock.assert_called_once()
+        self.assertEqual(b"x" * 10, files["a01.pdf"]["content"])
+        self.assertIsNone(files["en_a01.pdf"]["content"])
+        self.assertTrue(files["en_a01.pdf"]["content_too_large"])
+        self.assertEqual(1000, files["en_a01.pdf"].file.size)
+
+    def test_read_error(self):
+        with patch.object(FileContent, "read", side_effect=FileNotFoundError("x")):
+            files = self.get_files(read_content=True)
+        self.assertNotIn("content", files["a01.pdf"])
+        self.assertEqual("FileNotFoundError", files["a01.pdf"]["error_type"])
@@ -0,0 +1,81 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.htmlbody.html_body import HTMLContent
+from scielo_classic_website.utils.fs_cache import PathCache
+
+
+class TestPathCache(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "a.txt")
+        with open(self.file_path, "w") as f:
+            f.write("a")
+
+    def test_isfile_isdir_exists(self):
+        cache = PathCache(ttl=60)
+        self.assertTrue(cache.isfile(self.file_path))
+        self.assertFalse(cache.isdir(self.file_path))
+        self.assertTrue(cache.isdir(self.folder))
+        self.assertFalse(cache.exists(os.path.join(self.folder, "x")))
+
+    def test_stat_is_called_once_within_ttl(self):
+        cache = PathCache(ttl=60)
+        with patch("scielo_classic_website.utils.fs_cache.os.stat", wraps=os.stat) as mock_stat:
+            cache.isfile(self.file_path)
+            cache.isdir(self.file_path)
+            cache.exists(self.file_path)
+        self.assertEqual(1, mock_stat.call_count)
+        self.assertEqual(2, cache.hits)
+
+    def test_expired_items_are_resolved_again(self):
+        cache = PathCache(ttl=0)
+        self.assertTrue(cache.isfile(self.file_path))
+        os.remove(self.file_path)
+        self.assertFalse(cache.isfile(self.file_path))
+
+    def test_relative_paths_depend_on_current_directory(self):
+        cache = PathCache(ttl=60)
+        other = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.folder)
+            self.assertEqual(os.path.realpath(self.file_path), cache.realpath("a.txt"))
+            self.assertTrue(cache.isfile("a.txt"))
+            os.chdir(other)
+            self.assertEqual(
+                os.path.realpath(os.path.join(other, "a.txt")), cache.realpath("a.txt")
+            )
+            self.assertFalse(cache.isfile("a.txt"))
+        finally:
+            os.chdir(cwd)
+
+    def test_maxsize(self):
+        cache = PathCache(ttl=60, maxsize=2)
+        for name in ("a", "b", "c"):
+            cache.exists(os.path.join(self.folder, name))
+        self.assertLessEqual(len(cache._data), 2)
+
+
+class TestHTMLContentFixAssetPaths(TestCase):
+    def test_fix_asset_paths_updates_all_matching_nodes(self):
+        folder = os.path.join(tempfile.mkdtemp(), "htdocs", "img", "revistas", "acron")
+        os.makedirs(folder)
+        img_path = os.path.join(folder, "f1.gif")
+        with open(img_path, "wb") as f:
+            f.write(b"GIF")
+
+        hc = HTMLContent(
+            f'<p><img src="{img_path}"/><a href="{img_path}">fig</a>'
+            f'<img src="{img_path}"/><a href="http://x.org">x</a></p>'
+        )
+        hc.fix_asset_paths()
+        nodes = hc.tree.xpath("//*[@data-old-link]")
+        self.assertEqual(3, len(nodes))
+        for node in nodes:
+            self.assertEqual(
+                "/img/revistas/acron/f1.gif", node.get("src") or node.get("href")
+            )
+        self.assertEqual("http://x.org", hc.tree.xpath("//a")[-1].get("href"))
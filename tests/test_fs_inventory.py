@@ -0,0 +1,131 @@
+import glob
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from scielo_classic_website.models.issue_files import IssueFiles
+from scielo_classic_website.utils.fs_inventory import FileInventory, inventory_glob
+
+FILES = (
+    "bases/pdf/acron/v1n1/a01.pdf",
+    "bases/pdf/acron/v1n1/en_a01.pdf",
+    "bases/pdf/acron/v1n2/a01.pdf",
+    "bases/translation/acron/v1n1/en_a01.htm",
+    "htdocs/img/revistas/acron/v1n1/a01f1.gif",
+    "htdocs/img/revistas/acron/v1n1/html/a01f2.jpg",
+    "htdocs/img/revistas/acron/v1n1/.hidden.gif",
+    "htdocs/img/fbpe/acron/v1n1/a01f3.gif",
+    "htdocs/img/revistas/other/v1n1/a01.gif",
+)
+
+
+class FileInventoryTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = self.tmpdir.name
+        for name in FILES:
+            self.create(name)
+        self.roots = [
+            os.path.join(self.base, "bases", "pdf"),
+            os.path.join(self.base, "bases", "translation"),
+            os.path.join(self.base, "htdocs"),
+        ]
+        self.db_path = os.path.join(self.base, "inventory.db")
+        self.inventory = FileInventory(self.db_path, self.roots)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def create(self, name):
+        path = os.path.join(self.base, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fp:
+            fp.write("x")
+        return path
+
+    def path(self, *parts):
+        return os.path.join(self.base, *parts)
+
+    def assertSameAsGlob(self, pattern, recursive=False):
+        self.assertEqual(
+            sorted(set(glob.glob(pattern, recursive=recursive))),
+            sorted(set(self.inventory.glob(pattern, recursive))),
+        )
+
+    def test_glob(self):
+        self.assertSameAsGlob(self.path("bases", "pdf", "acron", "v1n1", "*.*"))
+        self.assertSameAsGlob(self.path("bases", "pdf", "acron", "*", "*.pdf"))
+        self.assertSameAsGlob(self.path("bases", "translation", "acron", "v1n1", "*"))
+        self.assertSameAsGlob(self.path("htdocs", "**", "acron", "v1n1", "**", "*.*"), True)
+        self.assertSameAsGlob(self.path("htdocs", "**", "fbpe", "**", "acron", "v1n1"), True)
+        self.assertSameAsGlob(self.path("htdocs", "img", "revistas", "acron", "v1n1"))
+        self.assertSameAsGlob(self.path("htdocs", "img", "revistas", "acron", "v9", "*"))
+
+    def test_glob_outside_inventory(self):
+        self.assertIsNone(self.inventory.glob(self.path("bases", "xml", "*")))
+        self.assertEqual(
+            [], inventory_glob(self.inventory, self.path("bases", "xml", "*"))
+        )
+
+    def test_issue_dirs(self):
+        self.assertEqual(
+            [
+                self.path("bases", "pdf", "acron", "v1n1"),
+                self.path("bases", "translation", "acron", "v1n1"),
+                self.path("htdocs", "img", "fbpe", "acron", "v1n1"),
+                self.path("htdocs", "img", "revistas", "acron", "v1n1"),
+            ],
+            self.inventory.issue_dirs("acron", "v1n1"),
+        )
+
+    def test_stat(self):
+        self.assertEqual(
+            1, self.inventory.stat(self.path("bases", "pdf", "acron", "v1n1", "a01.pdf"))[0]
+        )
+
+    def test_refresh_is_incremental(self):
+        self.inventory.refresh()
+        # garante data de modificação diferente
+        time.sleep(0.01)
+        os.remove(self.path("bases", "pdf", "acron", "v1n2", "a01.pdf"))
+        os.rmdir(self.path("bases", "pdf", "acron", "v1n2"))
+        self.create("bases/pdf/acron/v1n1/es_a01.pdf")
+        self.create("bases/pdf/acron/v1n3/a01.pdf")
+
+        stats = FileInventory(self.db_path, self.roots).refresh()
+        self.assertEqual(2, stats["changed"])
+        self.assertEqual(1, stats["added"])
+        self.assertEqual(1, stats["removed"])
+        self.assertSameAsGlob(self.path("bases", "pdf", "acron", "*", "*.*"))
+
+    def test_symlink_loop(self):
+        os.symlink(
+            self.path("htdocs", "img"),
+            self.path("htdocs", "img", "revistas", "acron", "loop"),
+        )
+        inventory = FileInventory(os.path.join(self.base, "loop.db"), self.roots)
+        self.assertEqual(
+            [self.path("htdocs", "img", "revistas", "acron", "loop")],
+            inventory.glob(self.path("htdocs", "img", "revistas", "acron", "l*")),
+        )
+        self.assertEqual(
+            [], inventory.glob(self.path("htdocs", "img", "revistas", "acron", "loop", "*"))
+        )
+
+    def test_issue_files(self):
+        paths = SimpleNamespace(
+            bases_pdf_path=self.path("bases", "pdf"),
+            htdocs_img_revistas_path=self.path("htdocs", "img", "revistas"),
+            inventory=self.inventory,
+        )
+        issue_files = IssueFiles("acron", "v1n1", paths)
+        self.assertEqual(
+            ["a01.pdf", "en_a01.pdf"],
+            sorted(item["name"] for item in issue_files.bases_pdf_files),
+        )
+        self.assertEqual(
+            ["a01f1.gif", "a01f2.jpg"],
+            sorted(item["name"] for item in issue_files.htdocs_img_revistas_files),
+        )
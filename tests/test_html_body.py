@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.htmlbody.html_body import (
+    BATCH_INDEX_ATTR,
+    html_to_node,
+    html_to_nodes,
+)
+
+
+def tostring(node):
+    return etree.tostring(node, encoding="utf-8", with_tail=False).decode("utf-8")
+
+
+class TestHtmlToNodes(TestCase):
+    def test_html_to_nodes_returns_same_result_as_html_to_node(self):
+        texts = [
+            "1. Silva, J. <i>Title</i>. Rev &ntilde; 2001;3:1-2.",
+            "2. Souza, M. <b>Book</b> &amp; co.",
+            "3. Unclosed <i>italic",
+            "4. After unclosed <sup>1</sup>",
+        ]
+        result = html_to_nodes("mixed-citation", texts)
+        self.assertEqual(len(texts), len(result))
+        for text, node in zip(texts, result):
+            self.assertEqual(tostring(html_to_node("mixed-citation", text)), tostring(node))
+
+    def test_html_to_nodes_chooses_original_or_fixed_html_by_item(self):
+        # isolado, o primeiro item mantém o HTML original (score <= 0.7);
+        # o lote inteiro teria score maior
+        texts = ["<!--[if gte mso 9]>foo<![endif]--> ok", "z"]
+        result = html_to_nodes("mixed-citation", texts)
+        self.assertEqual(
+            [tostring(html_to_node("mixed-citation", text)) for text in texts],
+            [tostring(node) for node in result],
+        )
+        self.assertIn("<!--[if gte mso 9]>", tostring(result[0]))
+
+    def test_html_to_nodes_keeps_order_and_empty_items(self):
+        result = html_to_nodes("mixed-citation", ["A", "", "B"])
+        self.assertEqual(
+            ["<mixed-citation>A</mixed-citation>", "<mixed-citation/>", "<mixed-citation>B</mixed-citation>"],
+            [tostring(node) for node in result],
+        )
+
+    def test_html_to_nodes_removes_batch_index_and_tail(self):
+        result = html_to_nodes("mixed-citation", ["A", "B"])
+        for node in result:
+            self.assertIsNone(node.get(BATCH_INDEX_ATTR))
+            self.assertIsNone(node.tail)
+
+    def test_html_to_nodes_empty_list(self):
+        self.assertEqual([], html_to_nodes("mixed-citation", []))
@@ -0,0 +1,49 @@
+import codecs
+import os
+import tempfile
+from unittest import TestCase
+
+from scielo_classic_website.utils.html_encoding import (
+    HTMLDecoder,
+    decode_html,
+    detect_encoding,
+)
+
+
+class TestDetectEncoding(TestCase):
+    def test_utf8(self):
+        self.assertEqual("utf-8", detect_encoding("<p>ação</p>".encode("utf-8")))
+
+    def test_iso_8859_1(self):
+        self.assertEqual("iso-8859-1", detect_encoding("<p>ação</p>".encode("iso-8859-1")))
+
+    def test_bom(self):
+        data = codecs.BOM_UTF8 + "<p>ação</p>".encode("utf-8")
+        self.assertEqual(("<p>ação</p>", "utf-8-sig"), decode_html(data))
+
+    def test_meta_charset_is_used_when_not_utf8(self):
+        data = '<meta charset="windows-1252"><p>“aspas”</p>'.encode("cp1252")
+        self.assertEqual("cp1252", detect_encoding(data))
+
+    def test_valid_utf8_overrides_wrong_meta_charset(self):
+        data = '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1"><p>ação</p>'.encode("utf-8")
+        text, encoding = decode_html(data)
+        self.assertEqual("utf-8", encoding)
+        self.assertIn("ação", text)
+
+
+class TestHTMLDecoder(TestCase):
+    def test_read_decodes_each_file_once(self):
+        decoder = HTMLDecoder()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.htm")
+            with open(path, "wb") as fp:
+                fp.write("<p>ação</p>".encode("iso-8859-1"))
+            self.assertEqual(("<p>ação</p>", "iso-8859-1"), decoder.read(path))
+            self.assertEqual(("<p>ação</p>", "iso-8859-1"), decoder.read(path))
+            self.assertEqual((1, 1), (decoder.hits, decoder.misses))
+
+            with open(path, "wb") as fp:
+                fp.write("<p>ações</p>".encode("utf-8"))
+            self.assertEqual(("<p>ações</p>", "utf-8"), decoder.read(path))
+            self.assertEqual(2, decoder.misses)
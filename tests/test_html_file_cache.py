@@ -0,0 +1,159 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.htmlbody.html_file_cache import HTMLFileCache
+from scielo_classic_website.htmlbody.html_merger import merge_html
+from scielo_classic_website.spsxml.sps_xml_body_pipes import MarkHTMLFileToEmbedPipe
+
+
+class TestHTMLFileCache(TestCase):
+    def test_get_tree_loads_once_and_returns_copies(self):
+        cache = HTMLFileCache()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return etree.fromstring("<body><p>x</p></body>")
+
+        first = cache.get_tree("key", loader, signature=(1, 1))
+        first.find("p").text = "changed"
+        second = cache.get_tree("key", loader, signature=(1, 1))
+        self.assertEqual(1, len(calls))
+        self.assertEqual("x", second.find("p").text)
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, cache.stats)
+
+    def test_get_tree_reloads_when_file_changes(self):
+        cache = HTMLFileCache()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.htm")
+            with open(path, "w") as fp:
+                fp.write("<body>1</body>")
+
+            def loader():
+                with open(path) as fp:
+                    return etree.fromstring(fp.read())
+
+            self.assertEqual("1", cache.get_tree(path, loader, path).text)
+            with open(path, "w") as fp:
+                fp.write("<body>22</body>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual("22", cache.get_tree(path, loader, path).text)
+            self.assertEqual(2, cache.misses)
+
+    def test_get_tree_does_not_keep_failures(self):
+        cache = HTMLFileCache()
+        self.assertIsNone(cache.get_tree("key", lambda: None, signature=(1, 1)))
+        self.assertEqual(0, len(cache))
+
+    def test_get_tree_does_not_keep_trees_without_signature(self):
+        cache = HTMLFileCache()
+        for path in (None, "/acron/a01t1.htm"):
+            cache.get_tree("key", lambda: etree.fromstring("<body/>"), path)
+            self.assertEqual(0, len(cache))
+        self.assertEqual(2, cache.misses)
+
+
+class TestMergeHtmlInMemory(TestCase):
+    def test_merge_html_processes_element_in_place_using_cache(self):
+        read = []
+
+        def reader(path, encoding, base):
+            read.append(path)
+            return "<html><body><p>Tabela</p></body></html>"
+
+        cache = HTMLFileCache()
+        for i in range(2):
+            xml = etree.fromstring(
+                '<article><body><p><a href="/img/revistas/acron/t1.htm">T1</a></p></body></article>'
+            )
+            body = xml.find("body")
+            result = merge_html(
+                body,
+                journal_acron_folder="/acron/",
+                content_reader=reader,
+                cache=cache,
+                content_signature=lambda path, encoding, base: (1, 1),
+            )
+            self.assertIs(body, result)
+            self.assertIsNotNone(xml.find(".//html-to-embed"))
+            self.assertEqual("Tabela", xml.find(".//html-to-embed/p").text)
+        self.assertEqual(1, len(read))
+
+    def test_merge_html_does_not_share_trees_between_readers(self):
+        def reader(path, encoding, base):
+            return "<html><body><p>Tabela</p></body></html>"
+
+        def other_reader(path, encoding, base):
+            return "<html><body><p>Outra</p></body></html>"
+
+        cache = HTMLFileCache()
+        for content_reader, expected in ((reader, "Tabela"), (other_reader, "Outra")):
+            xml = etree.fromstring(
+                '<article><body><a href="/img/revistas/acron/t1.htm">T1</a></body></article>'
+            )
+            merge_html(
+                xml.find("body"),
+                journal_acron_folder="/acron/",
+                content_reader=content_reader,
+                cache=cache,
+                content_signature=lambda *args: (1, 1),
+            )
+            self.assertEqual(expected, xml.find(".//html-to-embed/p").text)
+
+    def test_merge_html_default_reader_reloads_changed_file(self):
+        cache = HTMLFileCache()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            folder = os.path.join(tmpdir, "acron")
+            os.makedirs(folder)
+            path = os.path.join(folder, "t1.htm")
+            for i, text in enumerate(("Tabela", "Tabela 1")):
+                with open(path, "w") as fp:
+                    fp.write(f"<html><body><p>{text}</p></body></html>")
+                os.utime(path, ns=(i, i))
+                xml = etree.fromstring(
+                    f'<article><body><a href="{path}">T1</a></body></article>'
+                )
+                merge_html(xml.find("body"), journal_acron_folder="/acron/", cache=cache)
+                self.assertEqual(text, xml.find(".//html-to-embed/p").text)
+            self.assertEqual(1, len(cache))
+
+    def test_merge_html_without_signature_does_not_cache(self):
+        read = []
+
+        def reader(path, encoding, base):
+            read.append(path)
+            return "<html><body><p>Tabela</p></body></html>"
+
+        cache = HTMLFileCache()
+        for i in range(2):
+            xml = etree.fromstring(
+                '<article><body><a href="/img/revistas/acron/t1.htm">T1</a></body></article>'
+            )
+            merge_html(
+                xml.find("body"),
+                journal_acron_folder="/acron/",
+                content_reader=reader,
+                cache=cache,
+            )
+        self.assertEqual(2, len(read))
+        self.assertEqual(0, len(cache))
+
+
+class TestMarkHTMLFileToEmbedPipeCache(TestCase):
+    def test_documents_share_the_cache(self):
+        cache = HTMLFileCache()
+        for i in range(2):
+            raw = SimpleNamespace(
+                journal=SimpleNamespace(acronym="acron"), html_file_cache=cache
+            )
+            xml = etree.fromstring(
+                '<article><body><a href="/img/revistas/acron/t1.htm">T1</a></body></article>'
+            )
+            # sem html_reader no documento: o reader padrão da pipe
+            MarkHTMLFileToEmbedPipe().transform((raw, xml))
+            self.assertIsNotNone(xml.find(".//xref[@asset_type='html']"))
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, cache.stats)
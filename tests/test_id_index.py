@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.spsxml.id_index import IdIndex
+from scielo_classic_website.spsxml.sps_xml_pipes import XMLDeleteRepeatedElementWithId
+
+
+class IdIndexTest(TestCase):
+    def test_add_prefix_renames_ids_and_rids(self):
+        xml = etree.fromstring(
+            '<sub-article id="s1">'
+            '<p><xref rid="B1">1</xref><xref rid="fn1">a</xref><xref rid="s1B2"/></p>'
+            '<ref id="B1"/><fn id="fn1"/><ref id="s1B2"/>'
+            "</sub-article>"
+        )
+        IdIndex(xml).add_prefix("s1")
+        self.assertEqual(["s1B1", "s1fn1", "s1B2"], xml.xpath(".//xref/@rid"))
+        self.assertEqual(["s1B1", "s1fn1", "s1B2"], xml.xpath(".//*[@id]/@id"))
+
+    def test_duplicated(self):
+        xml = etree.fromstring(
+            '<body><a name="x"/><p id="x"/><a name="y"/><a name="x"/><a name="y"/></body>'
+        )
+        index = IdIndex(xml)
+        self.assertEqual(
+            [xml[3], xml[4]], list(index.duplicated("name", tag="a"))
+        )
+        self.assertEqual([], list(index.duplicated("id")))
+
+    def test_with_name_ignores_removed_attributes_and_context(self):
+        xml = etree.fromstring(
+            '<article><body><a name="fn1"/></body><back><a name="fn1"/></back></article>'
+        )
+        index = IdIndex(xml)
+        back = xml.find("back")
+        self.assertEqual([back[0]], index.with_name("fn1", context=back))
+        xml.find("body/a").attrib.pop("name")
+        self.assertEqual([back[0]], index.with_name("fn1"))
+
+
+class XMLDeleteRepeatedElementWithIdTest(TestCase):
+    def test_transform(self):
+        xml = etree.fromstring(
+            "<article>"
+            '<fn id="fn1"/>'
+            '<sub-article article-type="translation" id="s1">'
+            '<p><xref rid="fn1">1</xref></p><fn id="fn1"/><fn id="fn1"/>'
+            "</sub-article>"
+            "</article>"
+        )
+        XMLDeleteRepeatedElementWithId().transform((None, xml))
+        self.assertEqual(
+            b"<article>"
+            b'<fn id="fn1"/>'
+            b'<sub-article article-type="translation" id="s1">'
+            b'<p><xref rid="s1fn1">1</xref></p><fn id="s1fn1"/>'
+            b"</sub-article>"
+            b"</article>",
+            etree.tostring(xml),
+        )
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.models.issue_files import IssueFiles
+
+
+class TestIssueFilesBasesTranslationFiles(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        folder = os.path.join(self.tmpdir.name, "bases", "translation", "acron", "v1n1")
+        os.makedirs(folder)
+        for name in ("en_a01.htm", "en_ba01.htm", "es_a02.htm"):
+            with open(os.path.join(folder, name), "w") as fp:
+                fp.write("<html><body><p>text</p></body></html>")
+        paths = SimpleNamespace(
+            bases_translation_path=os.path.join(self.tmpdir.name, "bases", "translation")
+        )
+        self.issue_files = IssueFiles("acron", "v1n1", paths)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_listing_does_not_parse_html(self):
+        with patch("scielo_classic_website.models.issue_files.HTMLContent") as mock:
+            files = self.issue_files.bases_translation_files
+            self.assertEqual(3, len(files))
+            mock.create.assert_not_called()
+            self.assertFalse(files[0].has_replacements)
+
+    def test_replacements_is_computed_on_access(self):
+        files = sorted(self.issue_files.bases_translation_files, key=lambda x: x["name"])
+        self.assertEqual({}, files[0]["replacements"])
+        self.assertEqual({}, files[1].get("replacements"))
+        self.assertEqual("after", files[1]["part"])
+
+    def test_replacements_is_part_of_copies_and_serialization(self):
+        files = self.issue_files.bases_translation_files
+        self.assertIn("replacements", files[0])
+        self.assertEqual({}, dict(files[0])["replacements"])
+        self.assertEqual({}, json.loads(json.dumps(files[1]))["replacements"])
+        self.assertIn("replacements", dict(files[2].items()))
+
+    def test_replacements_error_on_access_is_registered(self):
+        with patch(
+            "scielo_classic_website.models.issue_files.get_html_replacements",
+            side_effect=ValueError("bad html"),
+        ):
+            item = self.issue_files.bases_translation_files[0]
+            self.assertEqual({}, item["replacements"])
+        self.assertEqual(
+            [{"path": item["path"], "message": "bad html", "type": "ValueError"}],
+            self.issue_files.exceptions["bases_translation_files"],
+        )
+
+    def test_compute_replacements(self):
+        files = self.issue_files.compute_replacements(max_workers=2)
+        for item in files:
+            self.assertTrue(item.has_replacements)
+            self.assertEqual({}, item["replacements"])
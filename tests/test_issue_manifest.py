@@ -0,0 +1,105 @@
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from scielo_classic_website.models.issue_files import IssueFiles
+from scielo_classic_website.models.issue_folder import IssueFolder
+from scielo_classic_website.utils.asset_digests import AssetDigests
+from scielo_classic_website.utils.file_content import FileContent
+from scielo_classic_website.utils.issue_manifest import IssueManifestStore
+
+
+class IssueManifestTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = self.tmpdir.name
+        self.pdf_folder = os.path.join(self.base, "bases", "pdf", "acron", "v1n1")
+        self.xml_folder = os.path.join(self.base, "bases", "xml", "acron", "v1n1")
+        self.write(self.pdf_folder, "a01.pdf", b"pdf")
+        self.write(self.pdf_folder, "a02.pdf", b"pdf 2")
+        self.write(self.xml_folder, "a01.xml", b"<article/>")
+        self.paths = SimpleNamespace(
+            bases_pdf_path=os.path.join(self.base, "bases", "pdf"),
+            bases_xml_path=os.path.join(self.base, "bases", "xml"),
+            bases_translation_path=os.path.join(self.base, "bases", "translation"),
+            htdocs_img_revistas_path=os.path.join(self.base, "htdocs", "img", "revistas"),
+        )
+        self.store = IssueManifestStore(os.path.join(self.base, "manifests"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, folder, name, content):
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), "wb") as fp:
+            fp.write(content)
+
+    def sync(self, **kwargs):
+        changes = IssueFiles("acron", "v1n1", self.paths).changes(self.store, **kwargs)
+        self.store.save(changes["manifest"])
+        return changes
+
+    def names(self, items):
+        return sorted(item["name"] for item in items)
+
+    def test_first_run_adds_all_files(self):
+        changes = self.sync()
+        self.assertEqual(["a01.pdf", "a01.xml", "a02.pdf"], self.names(changes["added"]))
+        self.assertFalse(changes["unchanged"])
+
+    def test_untouched_issue_is_not_listed(self):
+        self.sync()
+        with patch.object(IssueFiles, "files") as mock:
+            changes = self.sync()
+            self.assertFalse(mock.__iter__.called)
+        self.assertTrue(changes["unchanged"])
+
+    def test_added_changed_removed(self):
+        self.sync()
+        time.sleep(0.01)
+        self.write(self.pdf_folder, "a03.pdf", b"new")
+        self.write(self.pdf_folder, "a01.pdf", b"pdf changed")
+        os.remove(os.path.join(self.xml_folder, "a01.xml"))
+
+        changes = self.sync()
+        self.assertEqual(["a03.pdf"], self.names(changes["added"]))
+        self.assertEqual(["a01.pdf"], self.names(changes["changed"]))
+        self.assertEqual(["/xml/acron/v1n1/a01.xml"], changes["removed"])
+
+    def test_overwritten_file_requires_full_check(self):
+        self.sync()
+        time.sleep(0.01)
+        with open(os.path.join(self.pdf_folder, "a02.pdf"), "r+b") as fp:
+            fp.write(b"PDF 2")
+        self.assertTrue(self.sync()["unchanged"])
+        self.assertEqual(["a02.pdf"], self.names(self.sync(quick=False)["changed"]))
+
+    def test_digests(self):
+        self.sync(digests=AssetDigests())
+        manifest = self.store.load("acron", "v1n1")
+        self.assertEqual(64, len(manifest["files"]["/pdf/acron/v1n1/a01.pdf"]["digest"]))
+
+        # mesmo conteúdo, data diferente
+        time.sleep(0.01)
+        self.write(self.pdf_folder, "a01.pdf", b"pdf")
+        changes = self.sync(quick=False, digests=AssetDigests())
+        self.assertEqual([], changes["changed"])
+
+    def test_issue_folder(self):
+        folder = IssueFolder("acron", "v1n1", self.paths, read_content=True)
+        changes = folder.changes(self.store)
+        self.assertEqual(3, len(changes["added"]))
+        self.assertIn("content", changes["added"][0])
+        self.store.save(changes["manifest"])
+
+        # somente o conteúdo dos arquivos novos e alterados é lido
+        time.sleep(0.01)
+        self.write(self.pdf_folder, "a02.pdf", b"pdf 2 changed")
+        with patch.object(FileContent, "read", return_value=b"x") as mock:
+            changes = folder.changes(self.store, quick=False)
+        self.assertEqual(["a02.pdf"], self.names(changes["changed"]))
+        self.assertEqual(b"x", changes["changed"][0]["content"])
+        mock.assert_called_once()
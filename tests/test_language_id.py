@@ -0,0 +1,91 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.spsxml.language_id import LanguageIdentifier
+from scielo_classic_website.spsxml.sps_xml_pipes import XMLCheckArticleLanguagePipe
+
+TEXTS = [
+    "O objetivo deste estudo foi avaliar a prevalência de doenças crônicas em idosos.",
+    "El objetivo de este estudio fue evaluar la prevalencia de enfermedades crónicas.",
+    "The aim of this study was to evaluate the prevalence of chronic diseases.",
+    "L'objectif de cette étude était d'évaluer la prévalence des maladies chroniques.",
+]
+
+
+class LanguageIdentifierTest(TestCase):
+    def setUp(self):
+        self.identifier = LanguageIdentifier()
+
+    def test_detect(self):
+        self.assertEqual(["pt", "es", "en", "fr"], [self.identifier.detect(t) for t in TEXTS])
+
+    def test_detect_is_reproducible(self):
+        expected = [LanguageIdentifier().detect(text) for text in TEXTS * 3]
+        self.assertEqual(expected, [LanguageIdentifier().detect(text) for text in TEXTS * 3])
+
+    def test_detect_only_candidate_languages(self):
+        identifier = LanguageIdentifier(languages=("pt", "en"))
+        self.assertIn(identifier.detect(TEXTS[1]), ("pt", "en"))
+
+    def test_detect_empty_text(self):
+        self.assertIsNone(self.identifier.detect(" "))
+        self.assertIsNone(self.identifier.detect("123"))
+
+    def test_cache(self):
+        self.identifier.detect(TEXTS[0])
+        self.identifier.detect(TEXTS[0])
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1}, self.identifier.stats)
+
+    def test_cache_maxsize(self):
+        identifier = LanguageIdentifier(maxsize=2)
+        for text in TEXTS:
+            identifier.detect(text)
+        self.assertEqual(2, identifier.stats["size"])
+
+    def test_detect_many(self):
+        result = self.identifier.detect_many([TEXTS[0], TEXTS[2], TEXTS[0], ""])
+        self.assertEqual(["pt", "en", "pt", None], result)
+        self.assertEqual(2, self.identifier.stats["misses"])
+
+
+class Raw:
+    article_titles = []
+    abstracts = []
+
+
+class XMLCheckArticleLanguagePipeTest(TestCase):
+    def test_completes_missing_sub_article_language(self):
+        xml = etree.fromstring(
+            '<article xml:lang="pt">'
+            f"<front><article-meta><p>{TEXTS[0]}</p></article-meta></front>"
+            f'<sub-article article-type="translation"><p>{TEXTS[2]}</p></sub-article>'
+            f'<sub-article article-type="translation" xml:lang="fr"><p>{TEXTS[1]}</p></sub-article>'
+            "</article>"
+        )
+        XMLCheckArticleLanguagePipe().transform((Raw(), xml))
+        self.assertEqual(
+            ["pt", "en", "fr"],
+            xml.xpath("@xml:lang | .//sub-article/@xml:lang"),
+        )
+
+    def test_completes_missing_languages_when_titles_decide(self):
+        class RawWithLanguages:
+            article_titles = [{"language": "pt"}]
+            abstracts = [{"language": "pt"}]
+
+        xml = etree.fromstring(
+            '<article xml:lang="pt">'
+            f"<front><article-meta><p>{TEXTS[0]}</p>"
+            f"<trans-abstract><p>{TEXTS[2]}</p></trans-abstract>"
+            "</article-meta></front>"
+            f'<sub-article article-type="translation"><p>{TEXTS[2]}</p></sub-article>'
+            "</article>"
+        )
+        XMLCheckArticleLanguagePipe().transform((RawWithLanguages(), xml))
+        self.assertEqual(
+            ["pt", "en", "en"],
+            xml.xpath(
+                "@xml:lang | .//trans-abstract/@xml:lang | .//sub-article/@xml:lang"
+            ),
+        )
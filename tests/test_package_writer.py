@@ -0,0 +1,130 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+from unittest import TestCase
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from scielo_classic_website.utils.files_utils import create_zip_file
+from scielo_classic_website.utils.package_writer import PackageWriter, get_compression
+
+CONTENTS = {
+    "a01.xml": b"<article>" + b"<p>text</p>" * 1000 + b"</article>",
+    "a01.pdf": os.urandom(5000),
+    "a01f1.jpg": os.urandom(3000),
+    "a01f2.tif": os.urandom(2000),
+    "empty.htm": b"",
+}
+
+
+class NonSeekableStream(io.RawIOBase):
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data.extend(data)
+        return len(data)
+
+
+class GetCompressionTest(TestCase):
+    def test_get_compression(self):
+        for name, expected in (
+            ("a01.xml", ZIP_DEFLATED),
+            ("a01.htm", ZIP_DEFLATED),
+            ("a01f1.svg", ZIP_DEFLATED),
+            ("a01.PDF", ZIP_STORED),
+            ("a01f1.jpg", ZIP_STORED),
+            ("a01f1.png", ZIP_STORED),
+            ("a01f1.tiff", ZIP_STORED),
+            ("video.mp4", ZIP_STORED),
+            ("data.tar.gz", ZIP_STORED),
+            ("noextension", ZIP_DEFLATED),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(expected, get_compression(name))
+
+
+class PackageWriterTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name, content in CONTENTS.items():
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "wb") as fp:
+                fp.write(content)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_zip(self):
+        zip_path = os.path.join(self.tmpdir.name, "package.zip")
+        with PackageWriter(zip_path, max_workers=2) as package:
+            package.add(self.paths[0])
+            package.add_files(self.paths[1:])
+        with ZipFile(zip_path) as zf:
+            self.assertEqual(list(CONTENTS), zf.namelist())
+            for name, content in CONTENTS.items():
+                self.assertEqual(content, zf.read(name))
+            self.assertEqual(ZIP_DEFLATED, zf.getinfo("a01.xml").compress_type)
+            self.assertEqual(ZIP_STORED, zf.getinfo("a01.pdf").compress_type)
+            self.assertEqual(ZIP_STORED, zf.getinfo("a01f2.tif").compress_type)
+
+    def test_manifest(self):
+        zip_path = os.path.join(self.tmpdir.name, "package.zip")
+        with PackageWriter(zip_path, manifest_name="manifest.json") as package:
+            package.add_files(self.paths)
+            package.add_bytes("extra.xml", b"<a/>")
+        self.assertEqual(
+            {
+                "name": "a01.pdf",
+                "size": 5000,
+                "compression": "stored",
+                "checksum": hashlib.sha256(CONTENTS["a01.pdf"]).hexdigest(),
+            },
+            package.manifest[1],
+        )
+        with ZipFile(zip_path) as zf:
+            manifest = json.loads(zf.read("manifest.json"))
+            self.assertEqual(b"<a/>", zf.read("extra.xml"))
+        self.assertEqual("sha256", manifest["algorithm"])
+        self.assertEqual(package.manifest, manifest["files"])
+
+    def test_non_seekable_stream(self):
+        stream = NonSeekableStream()
+        with PackageWriter(stream) as package:
+            package.add_files((path, "x/" + os.path.basename(path)) for path in self.paths)
+        with ZipFile(io.BytesIO(bytes(stream.data))) as zf:
+            self.assertEqual(CONTENTS["a01.pdf"], zf.read("x/a01.pdf"))
+
+    def test_tar(self):
+        stream = io.BytesIO()
+        with PackageWriter(stream, format="tar", max_workers=1) as package:
+            package.add_files(self.paths)
+            package.add_bytes("extra.xml", b"<a/>")
+        stream.seek(0)
+        with tarfile.open(fileobj=stream) as tar:
+            self.assertEqual(list(CONTENTS) + ["extra.xml"], tar.getnames())
+            self.assertEqual(CONTENTS["a01.xml"], tar.extractfile("a01.xml").read())
+        self.assertIsNone(package.manifest[0]["compression"])
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            PackageWriter(io.BytesIO(), format="rar")
+
+    def test_create_zip_file(self):
+        zip_path = create_zip_file(self.paths, "package.zip", self.tmpdir.name)
+        with ZipFile(zip_path) as zf:
+            self.assertEqual(sorted(CONTENTS), sorted(zf.namelist()))
+            self.assertEqual(CONTENTS["a01f1.jpg"], zf.read("a01f1.jpg"))
+
+    def test_without_checksum(self):
+        with PackageWriter(io.BytesIO(), algorithm=None) as package:
+            package.add(self.paths[0])
+            package.add_files(self.paths[1:])
+        self.assertEqual([None] * 5, [item["checksum"] for item in package.manifest])
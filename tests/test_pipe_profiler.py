@@ -0,0 +1,100 @@
+import json
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import plumber
+from lxml import etree
+
+from scielo_classic_website.spsxml.pipe_profiler import PipeProfiler
+
+
+class AddNodePipe(plumber.Pipe):
+    def transform(self, data):
+        raw, xml = data
+        etree.SubElement(xml, "p")
+        return data
+
+
+class NestedPipe(plumber.Pipe):
+    def transform(self, data):
+        return next(plumber.Pipeline(AddNodePipe()).run(data, rewrap=True))
+
+
+class FailPipe(plumber.Pipe):
+    def transform(self, data):
+        raise ValueError("fail")
+
+
+def run(*pipes):
+    ppl = plumber.Pipeline(*pipes)
+    return next(ppl.run((None, etree.Element("body")), rewrap=True))
+
+
+class TestPipeProfiler(TestCase):
+    def test_disabled_does_not_patch_plumber(self):
+        original = plumber.Filter.__iter__
+        profiler = PipeProfiler()
+        with profiler:
+            self.assertIsNot(original, plumber.Filter.__iter__)
+        self.assertIs(original, plumber.Filter.__iter__)
+        run(AddNodePipe())
+        self.assertEqual([], profiler.stats)
+
+    def test_records_calls_nodes_and_labels(self):
+        profiler = PipeProfiler(count_nodes=True)
+        with profiler:
+            with profiler.context(document="doc1", step="step1"):
+                run(AddNodePipe(), AddNodePipe())
+        stats = profiler.stats
+        self.assertEqual(1, len(stats))
+        self.assertEqual("doc1", stats[0]["document"])
+        self.assertEqual("step1", stats[0]["step"])
+        self.assertEqual("AddNodePipe", stats[0]["pipe"])
+        self.assertEqual(2, stats[0]["calls"])
+        self.assertEqual(2, stats[0]["nodes_delta"])
+
+    def test_does_not_count_nodes_by_default(self):
+        profiler = PipeProfiler()
+        with patch("scielo_classic_website.spsxml.pipe_profiler._count_nodes") as mock:
+            with profiler:
+                run(AddNodePipe())
+        mock.assert_not_called()
+        self.assertEqual(0, profiler.stats[0]["nodes_delta"])
+
+    def test_counting_nodes_is_not_charged_to_pipes(self):
+        def slow_count_nodes(data):
+            time.sleep(0.05)
+            return sum(1 for _ in data[1].iter())
+
+        profiler = PipeProfiler(count_nodes=True)
+        with patch(
+            "scielo_classic_website.spsxml.pipe_profiler._count_nodes",
+            side_effect=slow_count_nodes,
+        ):
+            with profiler:
+                run(NestedPipe())
+        stats = {item["pipe"]: item for item in profiler.stats}
+        self.assertEqual(1, stats["NestedPipe;AddNodePipe"]["nodes_delta"])
+        self.assertLess(stats["NestedPipe"]["wall"], 0.05)
+        self.assertGreaterEqual(stats["NestedPipe"]["cpu"], 0)
+
+    def test_records_exceptions(self):
+        profiler = PipeProfiler()
+        with profiler:
+            with self.assertRaises(ValueError):
+                run(FailPipe())
+        self.assertEqual(1, profiler.stats[0]["exceptions"])
+
+    def test_merge_summary_and_exports(self):
+        profiler = PipeProfiler()
+        with profiler:
+            with profiler.context(document="doc1", step="step1"):
+                run(AddNodePipe())
+        other = PipeProfiler()
+        other.merge(json.loads(profiler.to_json()))
+        other.merge(profiler.stats)
+        summary = other.summary(group_by=("pipe",))
+        self.assertEqual([("AddNodePipe", 2)], [(i["pipe"], i["calls"]) for i in summary])
+        line = other.to_flamegraph()
+        self.assertTrue(line.startswith("doc1;step1;AddNodePipe "))
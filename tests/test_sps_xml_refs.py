@@ -0,0 +1,89 @@
+import threading
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.isisdb.c_record import ReferenceRecord
+from scielo_classic_website.spsxml.sps_xml_refs import (
+    XMLArticleMetaCitationsPipe,
+    get_xml_citation,
+)
+
+
+def citation_record(index):
+    return ReferenceRecord(
+        {
+            "v701": [{"_": str(index)}],
+            "v706": [{"_": "c"}],
+            "v071": [{"_": "journal"}],
+            "v064": [{"_": "2010"}],
+            "v012": [{"_": f"Title {index}"}],
+            "v030": [{"_": "Critical Perspectives on International Business"}],
+            "v031": [{"_": "6"}],
+            "v032": [{"_": "2/3"}],
+            "v010": [{"r": "ND", "s": "Alcadipani", "n": "R.", "_": ""}],
+        }
+    )
+
+
+class Raw:
+    def __init__(self, citations):
+        self.citations = citations
+        self.exceptions = []
+
+    def add_exception(self, action, exception_type, message, detail):
+        self.exceptions.append(detail["i"])
+
+
+def article(total):
+    xml = etree.Element("article")
+    reflist = etree.SubElement(etree.SubElement(xml, "back"), "ref-list")
+    for i in range(1, total + 1):
+        etree.SubElement(reflist, "ref", id=f"B{i}")
+    return xml
+
+
+class XMLArticleMetaCitationsPipeTest(TestCase):
+    def transform(self, total=5, **kwargs):
+        citations = [citation_record(i) for i in range(1, total + 1)]
+        # registro inválido
+        citations[2]._record["v010"] = "invalid"
+        raw = Raw(citations)
+        xml = article(total)
+        pipe = XMLArticleMetaCitationsPipe(**kwargs)
+        pipe.transform((raw, xml))
+        return pipe, raw, xml
+
+    def test_transform(self):
+        pipe, raw, xml = self.transform()
+        self.assertEqual([2], raw.exceptions)
+        refs = xml.findall(".//ref")
+        self.assertEqual("B1", refs[0].get("id"))
+        self.assertEqual("Title 1", refs[0].findtext("element-citation/article-title"))
+        self.assertIsNone(refs[2].find("element-citation"))
+
+    def test_modes_produce_the_same_result(self):
+        expected = etree.tostring(self.transform(mode="sequential")[2])
+        for mode in ("batch", "threads"):
+            with self.subTest(mode=mode):
+                pipe, raw, xml = self.transform(mode=mode, max_workers=2)
+                self.assertEqual([2], raw.exceptions)
+                self.assertEqual(expected, etree.tostring(xml))
+
+    def test_timings(self):
+        pipe, raw, xml = self.transform(total=250)
+        self.assertEqual([100, 200, 250], [total for total, elapsed in pipe.timings])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            XMLArticleMetaCitationsPipe(mode="x")
+
+
+class GetXMLCitationTest(TestCase):
+    def test_one_instance_per_thread(self):
+        items = []
+        thread = threading.Thread(target=lambda: items.append(get_xml_citation()))
+        thread.start()
+        thread.join()
+        self.assertIs(get_xml_citation(), get_xml_citation())
+        self.assertIsNot(get_xml_citation(), items[0])
@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.spsxml.pipe_profiler import PipeProfiler
+from scielo_classic_website.spsxml.sps_xml_body_pipes import (
+    FontSymbolPipe,
+    OlPipe,
+    RenameElementsPipe,
+    TagsHPipe,
+    UlPipe,
+)
+from scielo_classic_website.spsxml.tag_dispatcher import TagDispatcherPipe
+from scielo_classic_website.spsxml import tag_dispatcher
+
+XML = (
+    "<body>"
+    "<ul><li>a</li><ol><li>x</li><li><b>y</b></li></ol><dir><li>d</li></dir>"
+    '<h1 class="c">H</h1><b></b></ul>'
+    "<ol><ol>inner<li>z</li></ol><ul><li>q</li></ul><h2>t</h2>"
+    '<font face="Symbol">p</font></ol>'
+    '<dir>dd<li>e</li></dir><ul list="x"><i>it</i><br/><em>em</em></ul>'
+    '<h3 id="h">T3</h3><font face="symbol">a</font>'
+    "</body>"
+)
+
+
+# resultado das implementações anteriores (XPath, uma varredura por pipe)
+# de FontSymbolPipe, RenameElementsPipe, OlPipe, UlPipe e TagsHPipe
+EXPECTED = (
+    '<body><list list-type="bullet"><list-item>a</list-item>'
+    '<list-item list-type="order"><list-item>x</list-item>'
+    "<list-item><bold>y</bold></list-item></list-item>"
+    '<list list-type="bullet"><list-item>d</list-item></list>'
+    '<list-item class="c">H</list-item><bold/></list>'
+    '<list list-type="order"><list list-type="order">inner'
+    "<list-item>z</list-item></list><list-item><list-item>q</list-item>"
+    '</list-item><list-item>t</list-item><list-item face="Symbol">p</list-item>'
+    '</list><list list-type="bullet">dd<list-item>e</list-item></list>'
+    '<list list-type="bullet"><list-item>it</list-item><break/>'
+    "<list-item>em</list-item></list>"
+    '<title content-type="h3">T3</title>'
+    '<font-face-symbol face="symbol">a</font-face-symbol></body>'
+)
+
+
+def pipes():
+    return (FontSymbolPipe(), RenameElementsPipe(), OlPipe(), UlPipe(), TagsHPipe())
+
+
+class TestTagDispatcherPipe(TestCase):
+    def test_single_traversal_result_is_identical_to_sequential_pipes(self):
+        result = etree.fromstring(XML)
+        TagDispatcherPipe(*pipes()).transform((None, result))
+        self.assertEqual(EXPECTED, etree.tostring(result, encoding="unicode"))
+
+    def test_each_pipe_alone_keeps_previous_result(self):
+        result = etree.fromstring(XML)
+        for pipe in pipes():
+            pipe.transform((None, result))
+        self.assertEqual(EXPECTED, etree.tostring(result, encoding="unicode"))
+
+    def test_nested_lists(self):
+        xml = etree.fromstring("<body><ul><li>a</li><ol><li>b</li></ol></ul></body>")
+        TagDispatcherPipe(*pipes()).transform((None, xml))
+        self.assertEqual(
+            b'<body><list list-type="bullet"><list-item>a</list-item>'
+            b'<list-item list-type="order"><list-item>b</list-item></list-item>'
+            b"</list></body>",
+            etree.tostring(xml),
+        )
+
+    def test_traversals_are_reported_to_profiler(self):
+        profiler = PipeProfiler()
+        original = tag_dispatcher.PIPE_PROFILER
+        tag_dispatcher.PIPE_PROFILER = profiler
+        try:
+            with profiler:
+                with profiler.context(step="step_40"):
+                    TagDispatcherPipe(*pipes()).transform((None, etree.fromstring(XML)))
+        finally:
+            tag_dispatcher.PIPE_PROFILER = original
+        summary = profiler.summary(group_by=("step",))
+        self.assertEqual(1, summary[0]["traversals"])
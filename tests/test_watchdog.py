@@ -0,0 +1,121 @@
+import signal
+import sys
+import time
+from unittest import TestCase, mock
+
+import plumber
+
+from scielo_classic_website.exceptions import DocumentBudgetExceeded
+from scielo_classic_website.utils import watchdog as watchdog_module
+from scielo_classic_website.utils.watchdog import Watchdog, get_rss
+
+
+def _busy(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+class SlowPipe(plumber.Pipe):
+    def transform(self, data):
+        _busy(5)
+        return data
+
+
+def convert_html_to_xml_step_99_slow():
+    return SlowPipe().transform(None)
+
+
+class WatchdogTest(TestCase):
+    def test_time_limit(self):
+        with self.assertRaises(DocumentBudgetExceeded) as ctx:
+            with Watchdog(time_limit=0.1):
+                _busy(5)
+        self.assertEqual("time", ctx.exception.budget)
+        self.assertGreater(ctx.exception.value, 0.1)
+
+    def test_time_limit_reports_stage_and_pipe(self):
+        with self.assertRaises(DocumentBudgetExceeded) as ctx:
+            with Watchdog(time_limit=0.1):
+                convert_html_to_xml_step_99_slow()
+        self.assertEqual(
+            "convert_html_to_xml_step_99_slow > SlowPipe", ctx.exception.stage
+        )
+        self.assertIn("SlowPipe", str(ctx.exception))
+
+    def test_not_caught_by_except_exception(self):
+        with self.assertRaises(DocumentBudgetExceeded):
+            with Watchdog(time_limit=0.1):
+                try:
+                    _busy(5)
+                except Exception:
+                    pass
+
+    def test_memory_limit(self):
+        if get_rss() is None:
+            self.skipTest("RSS unavailable")
+        items = []
+        with self.assertRaises(DocumentBudgetExceeded) as ctx:
+            with Watchdog(memory_limit=20 * 1024 * 1024):
+                for i in range(200):
+                    items.append(bytearray(1024 * 1024))
+                    _busy(0.005)
+        del items
+        self.assertEqual("memory", ctx.exception.budget)
+
+    def test_within_limits(self):
+        with Watchdog(time_limit=5, memory_limit=100 * 1024 * 1024):
+            _busy(0.1)
+
+    def test_restores_signal_handler(self):
+        previous = signal.getsignal(signal.SIGALRM)
+        with self.assertRaises(DocumentBudgetExceeded):
+            with Watchdog(time_limit=0.1):
+                _busy(5)
+        self.assertEqual(previous, signal.getsignal(signal.SIGALRM))
+        self.assertEqual((0.0, 0.0), signal.getitimer(signal.ITIMER_REAL))
+
+    def test_disabled(self):
+        watchdog = Watchdog()
+        self.assertFalse(watchdog.enabled)
+        with watchdog:
+            _busy(0.1)
+
+    def test_budget_is_per_document(self):
+        watchdog = Watchdog(time_limit=0.3)
+        with watchdog:
+            _busy(0.2)
+        with self.assertRaises(DocumentBudgetExceeded) as ctx:
+            with watchdog:
+                _busy(5)
+        self.assertLess(ctx.exception.value, 0.5)
+
+    def test_grant(self):
+        watchdog = Watchdog(time_limit=0.1)
+        with self.assertRaises(DocumentBudgetExceeded):
+            with watchdog:
+                _busy(5)
+        watchdog.grant(0.3)
+        with watchdog:
+            _busy(0.1)
+        with self.assertRaises(DocumentBudgetExceeded):
+            with watchdog:
+                _busy(5)
+        self.assertLess(watchdog.elapsed, 1)
+
+    def test_tick_during_exit_is_ignored(self):
+        watchdog = Watchdog(time_limit=0.1, interval=60)
+        setitimer = signal.setitimer
+
+        def tick_then_setitimer(which, seconds, *args):
+            if seconds == 0:
+                # sinal tratado no início de __exit__, com o limite excedido
+                watchdog._tick(signal.SIGALRM, sys._getframe(1))
+            return setitimer(which, seconds, *args)
+
+        with mock.patch.object(
+            watchdog_module.signal, "setitimer", tick_then_setitimer
+        ):
+            with watchdog:
+                watchdog._start -= 1
+        self.assertEqual((0.0, 0.0), signal.getitimer(signal.ITIMER_REAL))
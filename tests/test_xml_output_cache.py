@@ -0,0 +1,227 @@
+import copy
+import gzip
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from scielo_classic_website.models import batch_converter
+from scielo_classic_website.models.batch_converter import (
+    BatchConverter,
+    convert_document,
+)
+from scielo_classic_website.utils.xml_output_cache import (
+    XMLOutputCache,
+    get_document_key,
+    get_embedded_html,
+)
+
+JOURNAL = {
+    "v068": [{"_": "jacron"}],
+    "v100": [{"_": "Título do Periódico"}],
+    "v150": [{"_": "Título Abreviado do Periódico"}],
+    "v435": [{"_": "1234-5678", "t": "PRINT"}],
+    "v310": [{"_": "BR"}],
+    "v320": [{"_": "SP"}],
+    "v490": [{"_": "São Paulo"}],
+    "v480": [{"_": "XXX Society"}],
+}
+
+EMBEDDED = {
+    "/jacron/v49n3/a01tab1.htm": "<p>Tabela <a href='/jacron/v49n3/a01tab2.htm'>2</a></p>",
+    "/jacron/v49n3/a01tab2.htm": "<p>Tabela 2</p>",
+}
+
+
+def html_reader(file_path, encoding, journal_acron_folder):
+    return EMBEDDED[file_path]
+
+
+def _get_item(i):
+    pid = f"S1234-5678199900030{i:04d}"
+    record = {
+        "v880": [{"_": pid}],
+        "v702": [{"_": "jacron/v49n3/a01.htm"}],
+        "v040": [{"_": "pt"}],
+        "v012": [{"_": f"Título {i}", "l": "pt"}],
+    }
+    return {
+        "issue_id": pid[1:18],
+        "doc_id": pid,
+        "issue": {
+            "v706": [{"_": "i"}],
+            "v031": [{"_": "49"}],
+            "v032": [{"_": "3"}],
+            "v065": [{"_": "19990900"}],
+        },
+        "article": [
+            dict(record, v706=[{"_": "o"}]),
+            dict(record, v706=[{"_": "f"}]),
+            dict(record, v706=[{"_": "h"}]),
+            {
+                "v706": [{"_": "p"}],
+                "v704": [
+                    {
+                        "_": f"<p>Texto {i} "
+                        "<a href='/jacron/v49n3/a01tab1.htm'>Tabela 1</a></p>"
+                    }
+                ],
+            },
+        ],
+    }
+
+
+class GetDocumentKeyTest(TestCase):
+    def setUp(self):
+        self.item = _get_item(1)
+        self.key = get_document_key(self.item, JOURNAL)
+
+    def test_same_inputs_same_key(self):
+        self.assertEqual(self.key, get_document_key(copy.deepcopy(self.item), JOURNAL))
+
+    def test_paragraph_changes_key(self):
+        self.item["article"][3]["v704"][0]["_"] += "<p>novo</p>"
+        self.assertNotEqual(self.key, get_document_key(self.item, JOURNAL))
+
+    def test_paragraph_records_change_key(self):
+        item = _get_item(1)
+        item["paragraph"] = [item["article"].pop()]
+        key = get_document_key(item, JOURNAL)
+        item["paragraph"][0]["v704"][0]["_"] += "<p>novo</p>"
+        self.assertNotEqual(key, get_document_key(item, JOURNAL))
+
+    def test_paragraph_records_are_ignored_if_article_has_p_records(self):
+        self.item["paragraph"] = [{"v704": [{"_": "<p>outro</p>"}]}]
+        self.assertEqual(self.key, get_document_key(self.item, JOURNAL))
+
+    def test_issue_changes_key(self):
+        self.item["issue"]["v032"] = [{"_": "4"}]
+        self.assertNotEqual(self.key, get_document_key(self.item, JOURNAL))
+
+    def test_journal_changes_key(self):
+        journal = dict(JOURNAL, v100=[{"_": "Outro"}])
+        self.assertNotEqual(self.key, get_document_key(self.item, journal))
+
+    def test_translations_change_key(self):
+        self.item["translations"] = {"en": {"before references": "<p>Text</p>"}}
+        self.assertNotEqual(self.key, get_document_key(self.item, JOURNAL))
+
+    def test_params_change_key(self):
+        self.assertNotEqual(
+            self.key,
+            get_document_key(self.item, JOURNAL, {"specific-use": "sps-1.9"}),
+        )
+
+    def test_unused_record_types_do_not_change_key(self):
+        self.item["article"][2]["v012"] = [{"_": "Outro", "l": "pt"}]
+        self.assertEqual(self.key, get_document_key(self.item, JOURNAL))
+
+    def test_embedded_html_content_changes_key(self):
+        key = get_document_key(self.item, JOURNAL, html_reader=html_reader)
+        with mock.patch.dict(EMBEDDED, {"/jacron/v49n3/a01tab2.htm": "<p>Alterada</p>"}):
+            self.assertNotEqual(
+                key, get_document_key(self.item, JOURNAL, html_reader=html_reader)
+            )
+
+
+class GetEmbeddedHTMLTest(TestCase):
+    def test_referenced_files_recursively(self):
+        result = get_embedded_html(
+            ["<a href='/jacron/v49n3/a01tab1.htm#t1'>1</a> <a href='#x'>x</a>"],
+            "jacron",
+            html_reader,
+        )
+        self.assertEqual(sorted(EMBEDDED), sorted(result))
+        self.assertTrue(all(result.values()))
+
+    def test_without_reader(self):
+        result = get_embedded_html(
+            ["<a href='/jacron/v49n3/a01tab1.htm'>1</a>"], "jacron"
+        )
+        self.assertEqual({"/jacron/v49n3/a01tab1.htm": None}, result)
+
+
+class XMLOutputCacheTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = XMLOutputCache(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get("abcdef"))
+        exceptions = [{"action": "a", "type": "t", "message": "m", "detail": None}]
+        self.cache.set("abcdef", "pid", "<article>ç</article>".encode("utf-8"), exceptions)
+        self.assertEqual(
+            ("<article>ç</article>".encode("utf-8"), exceptions),
+            self.cache.get("abcdef"),
+        )
+        self.assertEqual({"hits": 1, "misses": 1, "stores": 1}, self.cache.stats)
+
+    def test_corrupted_item_is_a_miss(self):
+        self.cache.set("abcdef", "pid", "<article/>", None)
+        with open(os.path.join(self.tmpdir.name, "ab", "abcdef.json.gz"), "wb") as fp:
+            fp.write(gzip.compress(b"{")[:10])
+        self.assertIsNone(self.cache.get("abcdef"))
+
+    def test_requires_folder(self):
+        with mock.patch(
+            "scielo_classic_website.utils.xml_output_cache.XML_CACHE_PATH", None
+        ):
+            with self.assertRaises(ValueError):
+                XMLOutputCache()
+
+
+class BatchConverterCacheTest(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.items = [_get_item(i) for i in range(4)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_convert_document_hit_does_not_run_pipes(self):
+        cache = XMLOutputCache(self.tmpdir.name)
+        expected = convert_document(self.items[0], JOURNAL, cache=cache)
+        with mock.patch.object(
+            batch_converter, "Document", side_effect=AssertionError("converted")
+        ):
+            result = convert_document(self.items[0], JOURNAL, cache=cache)
+        self.assertEqual(expected, result)
+        self.assertEqual({"hits": 1, "misses": 1, "stores": 1}, cache.stats)
+
+    def test_batch_stats_from_all_processes(self):
+        expected = [convert_document(item, JOURNAL) for item in self.items]
+        for hits in (0, 4):
+            converter = BatchConverter(
+                journal=JOURNAL, max_workers=2, chunksize=1, cache=self.tmpdir.name
+            )
+            self.assertEqual(expected, list(converter.convert(iter(self.items))))
+            self.assertEqual(hits, converter.cache.hits)
+            self.assertEqual(4 - hits, converter.cache.misses)
+
+    def test_inputs_changed_during_conversion_are_not_stored(self):
+        cache = XMLOutputCache(self.tmpdir.name)
+        contents = iter(range(1000))
+
+        def changing_reader(file_path, encoding, journal_acron_folder):
+            return f"<p>Tabela {next(contents)}</p>"
+
+        result = convert_document(
+            self.items[0], JOURNAL, cache=cache, html_reader=changing_reader
+        )
+        self.assertIsNotNone(result.xml)
+        self.assertEqual(0, cache.stores)
+
+    def test_budget_exceeded_results_are_not_stored(self):
+        cache = XMLOutputCache(self.tmpdir.name)
+        with mock.patch.object(
+            batch_converter, "_generate_full_xml", side_effect=_exceeded
+        ):
+            convert_document(self.items[0], JOURNAL, cache=cache)
+        self.assertEqual(0, cache.stores)
+
+
+def _exceeded(document, watchdog):
+    document.add_exception("Generate XML", "DocumentBudgetExceeded", "", {})
+    return b"<article/>"
@@ -0,0 +1,54 @@
+import threading
+from unittest import TestCase
+
+from lxml import etree
+
+from scielo_classic_website.spsxml.xpaths import XPathRegistry
+
+XML = (
+    '<article xmlns:xlink="http://www.w3.org/1999/xlink">'
+    '<p><xref rid="B1"/><xref rid="B2"/></p>'
+    "<ref-list><ref id=\"B1\"/><ref id=\"it's\"/></ref-list>"
+    '<sub-article xml:lang="en"/>'
+    "</article>"
+)
+
+
+class XPathRegistryTest(TestCase):
+    def setUp(self):
+        self.registry = XPathRegistry()
+        self.xml = etree.fromstring(XML)
+
+    def test_compiles_each_expression_once(self):
+        for rid in ("B1", "B2", "B1"):
+            result = self.registry(self.xml, ".//xref[@rid=$rid]", rid=rid)
+            self.assertEqual([rid], [node.get("rid") for node in result])
+        self.assertEqual(1, self.registry.compilations)
+        self.assertEqual(3, self.registry.evaluations)
+
+    def test_variable_with_quote(self):
+        result = self.registry(self.xml, ".//ref[@id=$ref_id]", ref_id="it's")
+        self.assertEqual(1, len(result))
+
+    def test_namespaces(self):
+        namespaces = {"xml": "http://www.w3.org/XML/1998/namespace"}
+        result = self.registry(
+            self.xml, ".//*[@xml:lang=$lang]", namespaces=namespaces, lang="en"
+        )
+        self.assertEqual(["sub-article"], [node.tag for node in result])
+        self.registry(self.xml, ".//*[@xml:lang=$lang]", lang="en", namespaces=namespaces)
+        self.assertEqual(1, self.registry.compilations)
+
+    def test_one_compilation_per_thread(self):
+        self.registry(self.xml, ".//ref")
+        thread = threading.Thread(target=self.registry, args=(self.xml, ".//ref"))
+        thread.start()
+        thread.join()
+        self.assertEqual(2, self.registry.compilations)
+
+    def test_reset_counters(self):
+        self.registry(self.xml, ".//ref")
+        self.registry.reset_counters()
+        self.registry(self.xml, ".//ref")
+        self.assertEqual(0, self.registry.compilations)
+        self.assertEqual(1, self.registry.evaluations)